@@ -1,7 +1,6 @@
+import argparse
 import pandas as pd
 import numpy as np
-import glob
-import os
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
@@ -12,531 +11,595 @@ from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
 import warnings
 warnings.filterwarnings('ignore')
 
-# Set style
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (14, 6)
-
-print(f"\n{'='*80}")
-print("PHASE 2: EXPERT-LEVEL ENHANCEMENTS")
-print("Correcting forecast, adding root cause analysis, segment analysis, etc.")
-print(f"{'='*80}\n")
-
-# ============================================================================
-# RE-LOAD DATA (from previous analysis)
-# ============================================================================
-
-def load_and_combine_csv(folder_path, dataset_name):
-    files = glob.glob(os.path.join(folder_path, "*.csv"))
-    df_list = []
-    for file in files:
-        try:
-            df = pd.read_csv(file)
-            df_list.append(df)
-        except Exception as e:
-            pass
-    combined_df = pd.concat(df_list, ignore_index=True)
-    return combined_df
-
-print("Loading datasets...")
-enroll_df = load_and_combine_csv("enrolment", "Enrolment")
-demo_df = load_and_combine_csv("demographic", "Demographic")
-bio_df = load_and_combine_csv("biometric", "Biometric")
-
-# Standardize and prepare
-enroll_df['date'] = pd.to_datetime(enroll_df['date'], errors='coerce')
-demo_df['date'] = pd.to_datetime(demo_df['date'], errors='coerce')
-bio_df['date'] = pd.to_datetime(bio_df['date'], errors='coerce')
-
-enroll_df = enroll_df.dropna(subset=['date'])
-demo_df = demo_df.dropna(subset=['date'])
-bio_df = bio_df.dropna(subset=['date'])
-
-enroll_df['year_month'] = enroll_df['date'].dt.to_period('M')
-demo_df['year_month'] = demo_df['date'].dt.to_period('M')
-bio_df['year_month'] = bio_df['date'].dt.to_period('M')
-
-# Aggregate
-enroll_grain = enroll_df.groupby(['state', 'district', 'year_month'], as_index=False).agg({
-    'age_0_5': 'sum', 'age_5_17': 'sum', 'age_18_greater': 'sum'
-})
-enroll_grain.rename(columns={'age_0_5': 'enrol_0_5', 'age_5_17': 'enrol_5_17', 'age_18_greater': 'enrol_18+'}, inplace=True)
-enroll_grain['total_enrolments'] = enroll_grain[['enrol_0_5', 'enrol_5_17', 'enrol_18+']].sum(axis=1)
-
-demo_grain = demo_df.groupby(['state', 'district', 'year_month'], as_index=False).agg({
-    'demo_age_5_17': 'sum', 'demo_age_17_': 'sum'
-})
-demo_grain.rename(columns={'demo_age_5_17': 'demo_5_17', 'demo_age_17_': 'demo_17+'}, inplace=True)
-demo_grain['total_demo_updates'] = demo_grain[['demo_5_17', 'demo_17+']].sum(axis=1)
-
-bio_grain = bio_df.groupby(['state', 'district', 'year_month'], as_index=False).agg({
-    'bio_age_5_17': 'sum', 'bio_age_17_': 'sum'
-})
-bio_grain.rename(columns={'bio_age_5_17': 'bio_5_17', 'bio_age_17_': 'bio_17+'}, inplace=True)
-bio_grain['total_bio_updates'] = bio_grain[['bio_5_17', 'bio_17+']].sum(axis=1)
-
-# Merge
-merged_df = enroll_grain[['state', 'district', 'year_month', 'total_enrolments', 'enrol_0_5', 'enrol_5_17', 'enrol_18+']].copy()
-merged_df = merged_df.merge(demo_grain[['state', 'district', 'year_month', 'total_demo_updates', 'demo_5_17', 'demo_17+']], 
-                            on=['state', 'district', 'year_month'], how='left')
-merged_df = merged_df.merge(bio_grain[['state', 'district', 'year_month', 'total_bio_updates', 'bio_5_17', 'bio_17+']], 
-                            on=['state', 'district', 'year_month'], how='left')
-merged_df = merged_df.fillna(0)
-merged_df['total_updates'] = merged_df['total_demo_updates'] + merged_df['total_bio_updates']
-
-# Calculate metrics
-merged_df['UER'] = merged_df.apply(lambda row: row['total_updates'] / row['total_enrolments'] if row['total_enrolments'] > 0 else 0, axis=1)
-merged_df['BSI'] = merged_df.apply(lambda row: row['total_bio_updates'] / row['total_updates'] if row['total_updates'] > 0 else 0, axis=1)
-
-print("✓ Data loaded and prepared\n")
-
-# ============================================================================
-# ENHANCEMENT 1: CORRECTED FORECAST (SARIMA-like approach)
-# ============================================================================
-
-print(f"{'='*80}")
-print("ENHANCEMENT 1: CORRECTED FORECAST (Seasonal Analysis)")
-print(f"{'='*80}\n")
-
-monthly_totals = merged_df.groupby('year_month').agg({
-    'total_bio_updates': 'sum',
-    'total_enrolments': 'sum',
-    'total_demo_updates': 'sum'
-}).reset_index()
-
-monthly_totals['month_num'] = range(len(monthly_totals))
-monthly_totals['year_month_dt'] = monthly_totals['year_month'].dt.to_timestamp()
-
-# Decompose time series
-ts_data = monthly_totals.set_index('year_month_dt')['total_bio_updates']
-
-try:
-    decomposition = seasonal_decompose(ts_data, model='additive', period=4)
-    
-    print("Time Series Decomposition:")
-    print(f"  Trend component: Shows underlying direction (up/down/flat)")
-    print(f"  Seasonal component: Recurring patterns (peaks/troughs)")
-    print(f"  Residual component: Unexplained variation")
-    
-    # Plot decomposition
-    fig, axes = plt.subplots(4, 1, figsize=(14, 10))
-    
-    ts_data.plot(ax=axes[0], title='Original Time Series', color='#2E86AB')
-    decomposition.trend.plot(ax=axes[1], title='Trend Component', color='#06A77D')
-    decomposition.seasonal.plot(ax=axes[2], title='Seasonal Component', color='#F18F01')
-    decomposition.resid.plot(ax=axes[3], title='Residual Component', color='#D62828')
-    
-    for ax in axes:
-        ax.grid(True, alpha=0.3)
-    
+from aadhaar_data import (DEFAULT_CACHE_DIR, DEFAULT_CHUNK_SIZE, clear_shard_cache, create_analysis_grain,
+                          load_and_combine_csv, stream_analysis_grain)
+from aggregate_store import DEFAULT_STORE_DIR, refresh_aggregate_store
+from anomaly_detection import flag_anomalies
+from cost_simulation import simulate_cost_benefit
+from forecast_store import DEFAULT_FORECAST_STORE, update_forecast_store
+from operational_cube import OperationalCube
+from operational_metrics import compute_operational_metrics
+from root_cause import score_root_causes
+from seasonal_decomposition import DEFAULT_DECOMPOSITION_CACHE, decompose_districts
+from streaming_moments import CORRELATION_FEATURES, update_district_moments
+from transaction_store import DEFAULT_TRANSACTION_STORE, load_transaction_store
+
+# Pool workers started with spawn import this script; only the main process runs the analysis
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="UIDAI Phase 2 expert enhancements")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes used to read CSV shards (default: all cores, 1 = serial)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"Columnar cache for parsed shards (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--no-cache', action='store_true', help="Parse every shard from CSV without the cache")
+    parser.add_argument('--rebuild-cache', action='store_true', help="Clear the shard cache and rebuild it")
+    grain_source = parser.add_mutually_exclusive_group()
+    grain_source.add_argument('--incremental', action='store_true',
+                              help="Build the district-month grain from the aggregate store, reading only new shards")
+    grain_source.add_argument('--stream', action='store_true',
+                              help="Build the district-month grain chunk by chunk with bounded memory")
+    grain_source.add_argument('--transaction-store', metavar='DIR', nargs='?', const=DEFAULT_TRANSACTION_STORE,
+                              help="Read raw rows from the memory-mapped transaction store, building it on first use "
+                                   f"(default DIR: {DEFAULT_TRANSACTION_STORE})")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows per chunk for --stream (default: {DEFAULT_CHUNK_SIZE:,})")
+    parser.add_argument('--decomposition-cache', default=DEFAULT_DECOMPOSITION_CACHE,
+                        help=f"Cache for per-district seasonal decompositions (default: {DEFAULT_DECOMPOSITION_CACHE})")
+    parser.add_argument('--forecast-store', metavar='DIR', nargs='?', const=DEFAULT_FORECAST_STORE,
+                        help="Also forecast every district with the persisted trend + month-of-year model store, "
+                             f"absorbing only new months on each run (default DIR: {DEFAULT_FORECAST_STORE})")
+    parser.add_argument('--draws', type=int, default=10000,
+                        help="Monte Carlo draws for the cost-benefit simulation (default: 10000)")
+    parser.add_argument('--store-dir', default=DEFAULT_STORE_DIR,
+                        help=f"Aggregate store location for --incremental, which also keeps the district moments "
+                             f"(default: {DEFAULT_STORE_DIR})")
+    args = parser.parse_args()
+
+    if args.rebuild_cache:
+        clear_shard_cache(args.cache_dir)
+    cache_dir = None if args.no_cache else args.cache_dir
+
+    transaction_store = None
+    if args.transaction_store:
+        transaction_store = load_transaction_store(
+            args.transaction_store, {'enrolment': 'enrolment', 'demographic': 'demographic', 'biometric': 'biometric'},
+            workers=args.workers, cache_dir=cache_dir)
+
+    # Set style
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (14, 6)
+
+    print(f"\n{'='*80}")
+    print("PHASE 2: EXPERT-LEVEL ENHANCEMENTS")
+    print("Correcting forecast, adding root cause analysis, segment analysis, etc.")
+    print(f"{'='*80}\n")
+
+    # ============================================================================
+    # RE-LOAD DATA (from previous analysis)
+    # ============================================================================
+
+    def load_grain(folder_path, dataset_name, value_cols):
+        """
+        District-month grain for a dataset (aggregate store with --incremental, chunked reads
+        with --stream, integer-code group-bys with --transaction-store)
+        """
+        if args.incremental:
+            return refresh_aggregate_store(folder_path, dataset_name, store_dir=args.store_dir,
+                                           workers=args.workers, cache_dir=cache_dir)
+        if args.stream:
+            return stream_analysis_grain(folder_path, dataset_name, chunk_size=args.chunk_size)
+        if transaction_store is not None:
+            return transaction_store.grain(dataset_name.lower(), value_cols)
+        df = load_and_combine_csv(folder_path, dataset_name, workers=args.workers, cache_dir=cache_dir)
+        return create_analysis_grain(df, value_cols)
+
+    print("Loading datasets...")
+
+    # Aggregate to the common grain (District + Month)
+    enroll_grain = load_grain("enrolment", "Enrolment", ['age_0_5', 'age_5_17', 'age_18_greater'])
+    enroll_grain.rename(columns={'age_0_5': 'enrol_0_5', 'age_5_17': 'enrol_5_17', 'age_18_greater': 'enrol_18+'}, inplace=True)
+    enroll_grain['total_enrolments'] = enroll_grain[['enrol_0_5', 'enrol_5_17', 'enrol_18+']].sum(axis=1)
+
+    demo_grain = load_grain("demographic", "Demographic", ['demo_age_5_17', 'demo_age_17_'])
+    demo_grain.rename(columns={'demo_age_5_17': 'demo_5_17', 'demo_age_17_': 'demo_17+'}, inplace=True)
+    demo_grain['total_demo_updates'] = demo_grain[['demo_5_17', 'demo_17+']].sum(axis=1)
+
+    bio_grain = load_grain("biometric", "Biometric", ['bio_age_5_17', 'bio_age_17_'])
+    bio_grain.rename(columns={'bio_age_5_17': 'bio_5_17', 'bio_age_17_': 'bio_17+'}, inplace=True)
+    bio_grain['total_bio_updates'] = bio_grain[['bio_5_17', 'bio_17+']].sum(axis=1)
+
+    # Scatter the three grains into one cube; every populated district-month is kept
+    cube = OperationalCube.from_grains({'enrolment': enroll_grain, 'demographic': demo_grain, 'biometric': bio_grain})
+    merged_df = cube.to_frame(['total_enrolments', 'enrol_0_5', 'enrol_5_17', 'enrol_18+',
+                               'total_demo_updates', 'demo_5_17', 'demo_17+',
+                               'total_bio_updates', 'bio_5_17', 'bio_17+', 'total_updates'])
+
+    # Calculate metrics (UER, BSI and state-normalized DDI)
+    merged_df = compute_operational_metrics(merged_df)
+
+    print("✓ Data loaded and prepared\n")
+
+    # ============================================================================
+    # ENHANCEMENT 1: CORRECTED FORECAST (SARIMA-like approach)
+    # ============================================================================
+
+    print(f"{'='*80}")
+    print("ENHANCEMENT 1: CORRECTED FORECAST (Seasonal Analysis)")
+    print(f"{'='*80}\n")
+
+    monthly_totals = cube.by_month(['total_bio_updates', 'total_enrolments', 'total_demo_updates']).reset_index()
+
+    monthly_totals['month_num'] = range(len(monthly_totals))
+    monthly_totals['year_month_dt'] = monthly_totals['year_month'].dt.to_timestamp()
+
+    # Decompose time series
+    ts_data = monthly_totals.set_index('year_month_dt')['total_bio_updates']
+
+    try:
+        decomposition = seasonal_decompose(ts_data, model='additive', period=4)
+
+        print("Time Series Decomposition:")
+        print(f"  Trend component: Shows underlying direction (up/down/flat)")
+        print(f"  Seasonal component: Recurring patterns (peaks/troughs)")
+        print(f"  Residual component: Unexplained variation")
+
+        # Plot decomposition
+        fig, axes = plt.subplots(4, 1, figsize=(14, 10))
+
+        ts_data.plot(ax=axes[0], title='Original Time Series', color='#2E86AB')
+        decomposition.trend.plot(ax=axes[1], title='Trend Component', color='#06A77D')
+        decomposition.seasonal.plot(ax=axes[2], title='Seasonal Component', color='#F18F01')
+        decomposition.resid.plot(ax=axes[3], title='Residual Component', color='#D62828')
+
+        for ax in axes:
+            ax.grid(True, alpha=0.3)
+
+        plt.tight_layout()
+        plt.savefig('PHASE2_01_ts_decomposition.png', dpi=300, bbox_inches='tight')
+        print(f"\n✓ Saved: PHASE2_01_ts_decomposition.png")
+        plt.close()
+
+        # Extract trend
+        trend = decomposition.trend.dropna()
+        seasonal = decomposition.seasonal.dropna()
+
+        print(f"\nTrend Analysis:")
+        print(f"  Start: {trend.iloc[0]:.0f} bio updates")
+        print(f"  End: {trend.iloc[-1]:.0f} bio updates")
+        print(f"  Direction: {'Increasing' if trend.iloc[-1] > trend.iloc[0] else 'Decreasing'}")
+        print(f"  Change: {((trend.iloc[-1] - trend.iloc[0]) / trend.iloc[0] * 100):.1f}%")
+
+        print(f"\nSeasonal Pattern:")
+        print(f"  Seasonal std: {seasonal.std():.0f}")
+        print(f"  Seasonal range: {seasonal.min():.0f} to {seasonal.max():.0f}")
+
+        # Corrected forecast
+        print(f"\n⭐ CORRECTED FORECAST (using trend + seasonal):")
+        trend_last = trend.iloc[-1]
+        seasonal_avg = seasonal.mean()
+
+        print(f"  Month +1 forecast: {trend_last + seasonal_avg:.0f} bio updates")
+        print(f"  Month +2 forecast: {trend_last + seasonal_avg:.0f} bio updates (with confidence band)")
+        print(f"  Month +3 forecast: {trend_last + seasonal_avg:.0f} bio updates")
+        print(f"\n  Confidence: 80% CI = ±{seasonal.std() * 1.28:.0f} updates")
+
+    except Exception as e:
+        print(f"  (Decomposition failed, using trend only: {e})")
+
+    # Same decomposition for every district's series (process pool + result cache)
+    print(f"\nPer-district decomposition:")
+    district_components, district_decomposition = decompose_districts(
+        cube, 'total_bio_updates', period=4, workers=args.workers,
+        cache_dir=None if args.no_cache else args.decomposition_cache)
+    seasonal_districts = district_decomposition[district_decomposition['method'] == 'seasonal_decompose']
+    print(f"\nMost seasonal districts (share of detrended variance that is seasonal):")
+    print(seasonal_districts.sort_values('seasonal_strength', ascending=False)
+          [['state', 'district', 'trend_start', 'trend_end', 'seasonal_amplitude', 'seasonal_strength']].head(10).to_string(index=False))
+    district_decomposition.to_csv('PHASE2_district_decomposition.csv', index=False)
+    print(f"✓ Saved: PHASE2_district_decomposition.csv ({len(district_decomposition)} districts)")
+
+    # Trend + seasonal forecast per district, kept as running least-squares statistics
+    if args.forecast_store:
+        print(f"\nPer-district trend + seasonal forecasts:")
+        seasonal_store = update_forecast_store(cube, 'total_bio_updates', args.forecast_store, seasonal=True)
+        district_seasonal_forecasts = seasonal_store.forecast(horizon=3)
+        print(district_seasonal_forecasts[district_seasonal_forecasts['horizon'] == 1]
+              .sort_values('forecast', ascending=False)[['state', 'district', 'year_month', 'last_actual', 'forecast']]
+              .head(10).to_string(index=False))
+        district_seasonal_forecasts.to_csv('PHASE2_district_forecasts.csv', index=False)
+        print(f"✓ Saved: PHASE2_district_forecasts.csv")
+
+    # ============================================================================
+    # ENHANCEMENT 2: SEGMENT ANALYSIS
+    # ============================================================================
+
+    print(f"\n{'='*80}")
+    print("ENHANCEMENT 2: SEGMENT ANALYSIS")
+    print(f"{'='*80}\n")
+
+    # By Age Group
+    print("SEGMENT 1: Age Group Analysis")
+    print("-" * 80)
+
+    enrol_age_agg = merged_df[['enrol_0_5', 'enrol_5_17', 'enrol_18+']].sum()
+    merged_df['enrol_total'] = merged_df[['enrol_0_5', 'enrol_5_17', 'enrol_18+']].sum(axis=1)
+
+    # Calculate UER by age group
+    merged_df['UER_age_0_5'] = merged_df['enrol_0_5'] * (merged_df['total_updates'] / merged_df['enrol_total']) if merged_df['enrol_total'].sum() > 0 else 0
+    merged_df['UER_age_5_17'] = merged_df['enrol_5_17'] * (merged_df['total_updates'] / merged_df['enrol_total']) if merged_df['enrol_total'].sum() > 0 else 0
+    merged_df['UER_age_18plus'] = merged_df['enrol_18+'] * (merged_df['total_updates'] / merged_df['enrol_total']) if merged_df['enrol_total'].sum() > 0 else 0
+
+    age_segment = pd.DataFrame({
+        'Age Group': ['0-5 years', '5-17 years', '18+ years'],
+        'Total Enrolments': [enrol_age_agg['enrol_0_5'], enrol_age_agg['enrol_5_17'], enrol_age_agg['enrol_18+']],
+        'Share %': [
+            enrol_age_agg['enrol_0_5'] / enrol_age_agg.sum() * 100,
+            enrol_age_agg['enrol_5_17'] / enrol_age_agg.sum() * 100,
+            enrol_age_agg['enrol_18+'] / enrol_age_agg.sum() * 100,
+        ]
+    })
+
+    print(age_segment.to_string(index=False))
+
+    # By Urban/Rural proxy (using total_updates as proxy for infrastructure)
+    print("\n\nSEGMENT 2: State-Level Stress Distribution")
+    print("-" * 80)
+
+    state_stress = merged_df.groupby('state', observed=True).agg({
+        'UER': 'mean',
+        'BSI': 'mean',
+        'total_enrolments': 'sum',
+        'total_updates': 'sum'
+    }).reset_index().sort_values('UER', ascending=False)
+
+    print("\nTop 10 states by average UER:")
+    print(state_stress[['state', 'UER', 'BSI', 'total_enrolments']].head(10).to_string(index=False))
+
+    # Chart: State-level stress
+    fig, ax = plt.subplots(figsize=(14, 8))
+    top_states = state_stress.head(15).sort_values('UER', ascending=True)
+    ax.barh(range(len(top_states)), top_states['UER'], color='#D62828')
+    ax.set_yticks(range(len(top_states)))
+    ax.set_yticklabels(top_states['state'])
+    ax.set_title('State-Level Operational Stress (Top 15 by UER)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Average UER (Update-to-Enrolment Ratio)', fontsize=12)
+    ax.grid(True, alpha=0.3, axis='x')
     plt.tight_layout()
-    plt.savefig('PHASE2_01_ts_decomposition.png', dpi=300, bbox_inches='tight')
-    print(f"\n✓ Saved: PHASE2_01_ts_decomposition.png")
+    plt.savefig('PHASE2_02_state_stress.png', dpi=300, bbox_inches='tight')
+    print(f"\n✓ Saved: PHASE2_02_state_stress.png")
     plt.close()
-    
-    # Extract trend
-    trend = decomposition.trend.dropna()
-    seasonal = decomposition.seasonal.dropna()
-    
-    print(f"\nTrend Analysis:")
-    print(f"  Start: {trend.iloc[0]:.0f} bio updates")
-    print(f"  End: {trend.iloc[-1]:.0f} bio updates")
-    print(f"  Direction: {'Increasing' if trend.iloc[-1] > trend.iloc[0] else 'Decreasing'}")
-    print(f"  Change: {((trend.iloc[-1] - trend.iloc[0]) / trend.iloc[0] * 100):.1f}%")
-    
-    print(f"\nSeasonal Pattern:")
-    print(f"  Seasonal std: {seasonal.std():.0f}")
-    print(f"  Seasonal range: {seasonal.min():.0f} to {seasonal.max():.0f}")
-    
-    # Corrected forecast
-    print(f"\n⭐ CORRECTED FORECAST (using trend + seasonal):")
-    trend_last = trend.iloc[-1]
-    seasonal_avg = seasonal.mean()
-    
-    print(f"  Month +1 forecast: {trend_last + seasonal_avg:.0f} bio updates")
-    print(f"  Month +2 forecast: {trend_last + seasonal_avg:.0f} bio updates (with confidence band)")
-    print(f"  Month +3 forecast: {trend_last + seasonal_avg:.0f} bio updates")
-    print(f"\n  Confidence: 80% CI = ±{seasonal.std() * 1.28:.0f} updates")
-    
-except Exception as e:
-    print(f"  (Decomposition failed, using trend only: {e})")
-
-# ============================================================================
-# ENHANCEMENT 2: SEGMENT ANALYSIS
-# ============================================================================
-
-print(f"\n{'='*80}")
-print("ENHANCEMENT 2: SEGMENT ANALYSIS")
-print(f"{'='*80}\n")
-
-# By Age Group
-print("SEGMENT 1: Age Group Analysis")
-print("-" * 80)
-
-enrol_age_agg = merged_df[['enrol_0_5', 'enrol_5_17', 'enrol_18+']].sum()
-merged_df['enrol_total'] = merged_df[['enrol_0_5', 'enrol_5_17', 'enrol_18+']].sum(axis=1)
-
-# Calculate UER by age group
-merged_df['UER_age_0_5'] = merged_df['enrol_0_5'] * (merged_df['total_updates'] / merged_df['enrol_total']) if merged_df['enrol_total'].sum() > 0 else 0
-merged_df['UER_age_5_17'] = merged_df['enrol_5_17'] * (merged_df['total_updates'] / merged_df['enrol_total']) if merged_df['enrol_total'].sum() > 0 else 0
-merged_df['UER_age_18plus'] = merged_df['enrol_18+'] * (merged_df['total_updates'] / merged_df['enrol_total']) if merged_df['enrol_total'].sum() > 0 else 0
-
-age_segment = pd.DataFrame({
-    'Age Group': ['0-5 years', '5-17 years', '18+ years'],
-    'Total Enrolments': [enrol_age_agg['enrol_0_5'], enrol_age_agg['enrol_5_17'], enrol_age_agg['enrol_18+']],
-    'Share %': [
-        enrol_age_agg['enrol_0_5'] / enrol_age_agg.sum() * 100,
-        enrol_age_agg['enrol_5_17'] / enrol_age_agg.sum() * 100,
-        enrol_age_agg['enrol_18+'] / enrol_age_agg.sum() * 100,
-    ]
-})
-
-print(age_segment.to_string(index=False))
-
-# By Urban/Rural proxy (using total_updates as proxy for infrastructure)
-print("\n\nSEGMENT 2: State-Level Stress Distribution")
-print("-" * 80)
-
-state_stress = merged_df.groupby('state').agg({
-    'UER': 'mean',
-    'BSI': 'mean',
-    'total_enrolments': 'sum',
-    'total_updates': 'sum'
-}).reset_index().sort_values('UER', ascending=False)
-
-print("\nTop 10 states by average UER:")
-print(state_stress[['state', 'UER', 'BSI', 'total_enrolments']].head(10).to_string(index=False))
-
-# Chart: State-level stress
-fig, ax = plt.subplots(figsize=(14, 8))
-top_states = state_stress.head(15).sort_values('UER', ascending=True)
-ax.barh(range(len(top_states)), top_states['UER'], color='#D62828')
-ax.set_yticks(range(len(top_states)))
-ax.set_yticklabels(top_states['state'])
-ax.set_title('State-Level Operational Stress (Top 15 by UER)', fontsize=14, fontweight='bold')
-ax.set_xlabel('Average UER (Update-to-Enrolment Ratio)', fontsize=12)
-ax.grid(True, alpha=0.3, axis='x')
-plt.tight_layout()
-plt.savefig('PHASE2_02_state_stress.png', dpi=300, bbox_inches='tight')
-print(f"\n✓ Saved: PHASE2_02_state_stress.png")
-plt.close()
-
-# By Time (Month)
-print("\n\nSEGMENT 3: Temporal Trend Analysis")
-print("-" * 80)
-
-monthly_stress = merged_df.groupby('year_month').agg({
-    'UER': 'mean',
-    'BSI': 'mean',
-    'total_enrolments': 'sum'
-}).reset_index()
-
-print("\nMonthly UER trend (is stress increasing or decreasing?):")
-print(monthly_stress[['year_month', 'UER', 'BSI']].to_string(index=False))
-
-# Trend
-early_uer = monthly_stress['UER'].iloc[:3].mean()
-late_uer = monthly_stress['UER'].iloc[-3:].mean()
-trend_direction = 'INCREASING ⚠️' if late_uer > early_uer else 'DECREASING ✓'
-print(f"\nEarly year avg UER: {early_uer:.1f}x")
-print(f"Late year avg UER: {late_uer:.1f}x")
-print(f"Trend: {trend_direction}")
-
-# ============================================================================
-# ENHANCEMENT 3: CORRELATION ANALYSIS
-# ============================================================================
-
-print(f"\n{'='*80}")
-print("ENHANCEMENT 3: CORRELATION ANALYSIS")
-print(f"{'='*80}\n")
-
-# Create district-level features
-district_features = merged_df.groupby('district').agg({
-    'UER': 'mean',
-    'BSI': 'mean',
-    'total_enrolments': 'sum',
-    'total_updates': 'sum',
-    'total_bio_updates': 'sum',
-    'total_demo_updates': 'sum',
-    'enrol_0_5': 'mean',
-    'enrol_5_17': 'mean',
-    'enrol_18+': 'mean',
-    'bio_5_17': 'mean',
-    'bio_17+': 'mean',
-    'demo_5_17': 'mean',
-    'demo_17+': 'mean'
-}).reset_index()
-
-# Add features for correlation
-district_features['bio_share'] = district_features['total_bio_updates'] / (district_features['total_bio_updates'] + district_features['total_demo_updates'] + 1)
-district_features['adult_enrol_share'] = district_features['enrol_18+'] / (district_features['enrol_0_5'] + district_features['enrol_5_17'] + district_features['enrol_18+'] + 1)
-district_features['adult_bio_share'] = district_features['bio_17+'] / (district_features['bio_5_17'] + district_features['bio_17+'] + 1)
-
-print("Correlation Analysis: Which district characteristics correlate with high UER?")
-print("-" * 80)
-
-corr_cols = ['UER', 'bio_share', 'adult_enrol_share', 'adult_bio_share', 'BSI', 'total_enrolments']
-corr_matrix = district_features[corr_cols].corr()
-
-print("\nCorrelation with UER:")
-uer_corr = corr_matrix['UER'].sort_values(ascending=False)
-print(uer_corr.to_string())
-
-# Heatmap
-fig, ax = plt.subplots(figsize=(10, 8))
-sns.heatmap(corr_matrix, annot=True, fmt='.2f', cmap='RdBu_r', center=0, ax=ax, 
-            cbar_kws={'label': 'Correlation'})
-ax.set_title('Correlation Matrix: District Features vs Stress Metrics', fontsize=14, fontweight='bold')
-plt.tight_layout()
-plt.savefig('PHASE2_03_correlation_matrix.png', dpi=300, bbox_inches='tight')
-print(f"\n✓ Saved: PHASE2_03_correlation_matrix.png")
-plt.close()
-
-print("\n⭐ KEY INSIGHT from correlation:")
-if abs(corr_matrix.loc['UER', 'bio_share']) > 0.3:
-    print(f"  HIGH-STRESS districts have HIGHER biometric share (r={corr_matrix.loc['UER', 'bio_share']:.2f})")
-    print("  → Implication: Device infrastructure is the bottleneck, not data systems")
-if abs(corr_matrix.loc['UER', 'adult_enrol_share']) > 0.3:
-    print(f"  Districts with MORE adult enrolments have HIGHER UER (r={corr_matrix.loc['UER', 'adult_enrol_share']:.2f})")
-    print("  → Implication: Adults require more updates than children")
-
-# ============================================================================
-# ENHANCEMENT 4: ANOMALY DETECTION (ELEVATED CASES)
-# ============================================================================
-
-print(f"\n{'='*80}")
-print("ENHANCEMENT 4: ANOMALY/ELEVATED DETECTION")
-print(f"{'='*80}\n")
-
-# Z-score with threshold
-merged_df['rolling_mean'] = merged_df.groupby('district')['total_bio_updates'].transform(
-    lambda x: x.rolling(window=3, min_periods=1).mean()
-)
-merged_df['rolling_std'] = merged_df.groupby('district')['total_bio_updates'].transform(
-    lambda x: x.rolling(window=3, min_periods=1).std()
-)
-merged_df['bio_zscore'] = merged_df.apply(
-    lambda row: (row['total_bio_updates'] - row['rolling_mean']) / (row['rolling_std'] + 1) if row['rolling_std'] > 0 else 0,
-    axis=1
-)
-
-# Elevated (Z > 1.5) and Anomaly (Z > 2.0)
-elevated = merged_df[merged_df['bio_zscore'] > 1.5].copy()
-anomalies = merged_df[merged_df['bio_zscore'] > 2.0].copy()
-
-print(f"Elevated cases (Z > 1.5): {len(elevated)}")
-print(f"Anomalies (Z > 2.0): {len(anomalies)}")
-
-# Populate anomaly table with elevated cases
-if len(elevated) > 0:
-    anomaly_table = elevated[['state', 'district', 'year_month', 'total_enrolments', 'total_demo_updates', 
-                             'total_bio_updates', 'bio_zscore']].head(50).copy()
-    anomaly_table['category'] = anomaly_table['bio_zscore'].apply(
-        lambda z: 'Anomaly' if z > 2.0 else 'Elevated'
-    )
-    anomaly_table['explanation'] = anomaly_table.apply(
-        lambda row: f"Bio updates {row['total_bio_updates']/row['total_enrolments']/20:.1f}x typical (Z={row['bio_zscore']:.1f})",
-        axis=1
-    )
-    anomaly_table = anomaly_table[['state', 'district', 'year_month', 'total_enrolments', 'total_bio_updates', 'bio_zscore', 'category', 'explanation']]
-else:
-    anomaly_table = pd.DataFrame(columns=['state', 'district', 'year_month', 'total_enrolments', 'total_bio_updates', 'bio_zscore', 'category', 'explanation'])
-
-anomaly_table.to_csv('PHASE2_anomaly_table.csv', index=False)
-print(f"\n✓ Saved: PHASE2_anomaly_table.csv ({len(anomaly_table)} records)")
-
-if len(anomaly_table) > 0:
-    print("\nTop elevated cases:")
-    print(anomaly_table.head(10)[['district', 'year_month', 'bio_zscore', 'category']].to_string(index=False))
-
-# ============================================================================
-# ENHANCEMENT 5: ROOT CAUSE ANALYSIS (Hypothesis Testing)
-# ============================================================================
-
-print(f"\n{'='*80}")
-print("ENHANCEMENT 5: ROOT CAUSE ANALYSIS")
-print(f"{'='*80}\n")
-
-# For top stressed district
-top_stressed_district = 'Uttar Bastar Kanker'
-if top_stressed_district in merged_df['district'].values:
-    stressed_data = merged_df[merged_df['district'] == top_stressed_district].sort_values('year_month')
-    
-    print(f"Deep dive: {top_stressed_district}")
+
+    # By Time (Month)
+    print("\n\nSEGMENT 3: Temporal Trend Analysis")
+    print("-" * 80)
+
+    monthly_stress = merged_df.groupby('year_month').agg({
+        'UER': 'mean',
+        'BSI': 'mean',
+        'total_enrolments': 'sum'
+    }).reset_index()
+
+    print("\nMonthly UER trend (is stress increasing or decreasing?):")
+    print(monthly_stress[['year_month', 'UER', 'BSI']].to_string(index=False))
+
+    # Trend
+    early_uer = monthly_stress['UER'].iloc[:3].mean()
+    late_uer = monthly_stress['UER'].iloc[-3:].mean()
+    trend_direction = 'INCREASING ⚠️' if late_uer > early_uer else 'DECREASING ✓'
+    print(f"\nEarly year avg UER: {early_uer:.1f}x")
+    print(f"Late year avg UER: {late_uer:.1f}x")
+    print(f"Trend: {trend_direction}")
+
+    # ============================================================================
+    # ENHANCEMENT 3: CORRELATION ANALYSIS
+    # ============================================================================
+
+    print(f"\n{'='*80}")
+    print("ENHANCEMENT 3: CORRELATION ANALYSIS")
+    print(f"{'='*80}\n")
+
+    corr_cols = CORRELATION_FEATURES
+    # Running per-(state, district) totals and the count / mean / co-moment accumulator of their features;
+    # with --incremental both persist next to the aggregate store and only new months are added
+    district_totals, feature_moments = update_district_moments(
+        merged_df, corr_cols, store_dir=args.store_dir if args.incremental else None)
+    district_features = district_totals.features()
+
+    print("\nCorrelation Analysis: Which district characteristics correlate with high UER?")
+    print("-" * 80)
+
+    corr_matrix = feature_moments.correlation()
+
+    print("\nCorrelation with UER:")
+    uer_corr = corr_matrix['UER'].sort_values(ascending=False)
+    print(uer_corr.to_string())
+
+    # Heatmap
+    fig, ax = plt.subplots(figsize=(10, 8))
+    sns.heatmap(corr_matrix, annot=True, fmt='.2f', cmap='RdBu_r', center=0, ax=ax, 
+                cbar_kws={'label': 'Correlation'})
+    ax.set_title('Correlation Matrix: District Features vs Stress Metrics', fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig('PHASE2_03_correlation_matrix.png', dpi=300, bbox_inches='tight')
+    print(f"\n✓ Saved: PHASE2_03_correlation_matrix.png")
+    plt.close()
+
+    print("\n⭐ KEY INSIGHT from correlation:")
+    if abs(corr_matrix.loc['UER', 'bio_share']) > 0.3:
+        print(f"  HIGH-STRESS districts have HIGHER biometric share (r={corr_matrix.loc['UER', 'bio_share']:.2f})")
+        print("  → Implication: Device infrastructure is the bottleneck, not data systems")
+    if abs(corr_matrix.loc['UER', 'adult_enrol_share']) > 0.3:
+        print(f"  Districts with MORE adult enrolments have HIGHER UER (r={corr_matrix.loc['UER', 'adult_enrol_share']:.2f})")
+        print("  → Implication: Adults require more updates than children")
+
+    # ============================================================================
+    # ENHANCEMENT 4: ANOMALY DETECTION (ELEVATED CASES)
+    # ============================================================================
+
+    print(f"\n{'='*80}")
+    print("ENHANCEMENT 4: ANOMALY/ELEVATED DETECTION")
+    print(f"{'='*80}\n")
+
+    # Rolling 3-month z-score of bio updates per (state, district)
+    flag_anomalies(merged_df, 'total_bio_updates', window=3, windows=(3,), anomaly_z=2.0, elevated_z=1.5)
+
+    # Elevated (Z > 1.5) and Anomaly (Z > 2.0)
+    elevated = merged_df[merged_df['is_elevated'] == 1].copy()
+    anomalies = merged_df[merged_df['bio_zscore'] > 2.0].copy()
+
+    print(f"Elevated cases (Z > 1.5): {len(elevated)}")
+    print(f"Anomalies (Z > 2.0): {len(anomalies)}")
+
+    # Populate anomaly table with elevated cases
+    if len(elevated) > 0:
+        anomaly_table = elevated[['state', 'district', 'year_month', 'total_enrolments', 'total_demo_updates', 
+                                 'total_bio_updates', 'bio_zscore']].head(50).copy()
+        anomaly_table['category'] = anomaly_table['bio_zscore'].apply(
+            lambda z: 'Anomaly' if z > 2.0 else 'Elevated'
+        )
+        anomaly_table['explanation'] = anomaly_table.apply(
+            lambda row: f"Bio updates {row['total_bio_updates']/row['total_enrolments']/20:.1f}x typical (Z={row['bio_zscore']:.1f})",
+            axis=1
+        )
+        anomaly_table = anomaly_table[['state', 'district', 'year_month', 'total_enrolments', 'total_bio_updates', 'bio_zscore', 'category', 'explanation']]
+    else:
+        anomaly_table = pd.DataFrame(columns=['state', 'district', 'year_month', 'total_enrolments', 'total_bio_updates', 'bio_zscore', 'category', 'explanation'])
+
+    anomaly_table.to_csv('PHASE2_anomaly_table.csv', index=False)
+    print(f"\n✓ Saved: PHASE2_anomaly_table.csv ({len(anomaly_table)} records)")
+
+    if len(anomaly_table) > 0:
+        print("\nTop elevated cases:")
+        print(anomaly_table.head(10)[['district', 'year_month', 'bio_zscore', 'category']].to_string(index=False))
+
+    # ============================================================================
+    # ENHANCEMENT 5: ROOT CAUSE ANALYSIS (Hypothesis Testing)
+    # ============================================================================
+
+    print(f"\n{'='*80}")
+    print("ENHANCEMENT 5: ROOT CAUSE ANALYSIS")
+    print(f"{'='*80}\n")
+
+    # Every hypothesis for every district, tested against the national baseline
+    root_causes, root_cause_baseline = score_root_causes(merged_df)
+    print(f"National baseline: adult enrolment share {root_cause_baseline['adult_enrol_share'] * 100:.1f}%, "
+          f"biometric share {root_cause_baseline['bio_share'] * 100:.1f}%, "
+          f"pooled UER std {root_cause_baseline['uer_std']:.1f}x")
+    for hypothesis in ['H1_adult_enrolment', 'H2_bio_intensity', 'H3_uer_volatility']:
+        print(f"  {hypothesis}: supported in {root_causes[hypothesis].sum()} districts")
+    print(f"\nDistricts with the strongest root-cause support:")
+    print(root_causes[['rank', 'state', 'district', 'mean_UER', 'adult_enrol_share', 'bio_share', 'uer_std',
+                       'H1_adult_enrolment', 'H2_bio_intensity', 'H3_uer_volatility', 'support', 'evidence']]
+          .head(15).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    root_causes.to_csv('PHASE2_root_cause_scores.csv', index=False)
+    print(f"✓ Saved: PHASE2_root_cause_scores.csv ({len(root_causes)} districts)")
+
+    # Deep dive into the best-supported district
+    if len(root_causes) > 0:
+        top = root_causes.iloc[0]
+        top_stressed_district = top['district']
+        stressed_data = merged_df[(merged_df['state'] == top['state'])
+                                  & (merged_df['district'] == top_stressed_district)].sort_values('year_month')
+
+        print(f"\nDeep dive: {top_stressed_district} ({top['state']})")
+        print("-" * 80)
+        print(stressed_data[['year_month', 'total_enrolments', 'total_bio_updates', 'total_demo_updates', 'UER']].to_string(index=False))
+
+        print(f"\nHypothesis Testing for High UER:")
+
+        print(f"\n  H1 - Adult Enrolment Volume: {top['adult_enrol_share'] * 100:.1f}% "
+              f"(vs national {root_cause_baseline['adult_enrol_share'] * 100:.1f}%, z={top['H1_z']:.1f}, q={top['H1_adult_enrolment_q']:.3g})")
+        if top['H1_adult_enrolment']:
+            print(f"       ✓ SUPPORTED: More adults = more complex cases = higher updates")
+
+        print(f"\n  H2 - Biometric Intensity: {top['bio_share'] * 100:.1f}% "
+              f"(vs national {root_cause_baseline['bio_share'] * 100:.1f}%, z={top['H2_z']:.1f}, q={top['H2_bio_intensity_q']:.3g})")
+        if top['H2_bio_intensity']:
+            print(f"       ✓ SUPPORTED: Very bio-heavy = device failures, retrain cycles")
+
+        print(f"\n  H3 - Operational Stability: UER std = {top['uer_std']:.0f}x "
+              f"(vs pooled {root_cause_baseline['uer_std']:.0f}x, q={top['H3_uer_volatility_q']:.3g})")
+        if top['H3_uer_volatility']:
+            print(f"       ✓ SUPPORTED: Highly volatile operations = infrastructure issues or staffing changes")
+
+    # ============================================================================
+    # ENHANCEMENT 6: COST-BENEFIT ANALYSIS
+    # ============================================================================
+
+    print(f"\n{'='*80}")
+    print("ENHANCEMENT 6: COST-BENEFIT ANALYSIS")
+    print(f"{'='*80}\n")
+
+    # Calculate potential savings
+    # Months without enrolments (UER 0 by the zero-denominator rule) are left out of the district mean
+    top_15_stressed = (merged_df['UER'].where(merged_df['total_enrolments'] > 0)
+                       .groupby([merged_df['state'], merged_df['district']], observed=True).mean().nlargest(15))
+    in_top_15 = pd.MultiIndex.from_frame(merged_df[['state', 'district']]).isin(top_15_stressed.index)
+    high_stress_enrol = merged_df.loc[in_top_15, 'total_enrolments'].sum()
+
+    print(f"Scenario: Deploy targeted support to top-15 high-stress districts")
+    print("-" * 80)
+    print(f"  Districts: {', '.join(f'{district} ({state})' for state, district in top_15_stressed.index[:5])}... (+10 more)")
+    print(f"  Current enrollments in these districts: {high_stress_enrol:.0f}")
+    print(f"  Current avg UER in these districts: {top_15_stressed.mean():.1f}x")
+
+    # Assumptions
+    current_updates = high_stress_enrol * top_15_stressed.mean()
+    target_uer = 30  # Reduce to national median
+    target_updates = high_stress_enrol * target_uer
+    updates_saved = current_updates - target_updates
+
+    print(f"\n  Current update load: {current_updates:.0f}")
+    print(f"  Target update load (UER 30x): {target_updates:.0f}")
+    print(f"  Updates that could be eliminated: {updates_saved:.0f}")
+
+    # Cost modeling
+    technician_salary_annual = 300000  # INR
+    updates_per_technician_annual = 50000
+    technicians_needed_current = current_updates / updates_per_technician_annual
+    technicians_needed_target = target_updates / updates_per_technician_annual
+    technician_cost_reduction = (technicians_needed_current - technicians_needed_target) * technician_salary_annual
+
+    device_depreciation = 5000  # INR per year per device
+    devices_needed_current = high_stress_enrol / 500
+    devices_needed_target = high_stress_enrol / 800
+    device_cost_reduction = (devices_needed_current - devices_needed_target) * device_depreciation
+
+    total_savings = technician_cost_reduction + device_cost_reduction
+
+    print(f"\n  Technicians needed currently: {technicians_needed_current:.0f}")
+    print(f"  Technicians needed at UER 30x: {technicians_needed_target:.0f}")
+    print(f"  Potential technician cost savings: ₹{technician_cost_reduction:,.0f} annually")
+
+    print(f"\n  Device cost savings: ₹{device_cost_reduction:,.0f} annually")
+    print(f"\n  💰 TOTAL ANNUAL SAVINGS: ₹{total_savings:,.0f}")
+
+    # Investment needed
+    intervention_cost = 50000  # Staff training, device maintenance contracts, monitoring
+    roi = (total_savings / intervention_cost) * 100
+    payback_months = (intervention_cost / total_savings) * 12 if total_savings > 0 else np.inf
+
+    print(f"\n  Investment needed (per intervention): ₹{intervention_cost:,}")
+    print(f"  ROI: {roi:.0f}% (if savings achieved)")
+    print(f"  Payback period: {payback_months:.1f} months")
+
+    # Create cost-benefit chart
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+
+    # Technician costs
+    categories = ['Current\n(High Stress)', 'Target\n(UER 30x)', 'Savings']
+    tech_costs = [technician_cost_reduction + technician_salary_annual * technicians_needed_target, 
+                  technician_salary_annual * technicians_needed_target, 
+                  technician_cost_reduction]
+
+    ax1.bar(categories, tech_costs, color=['#D62828', '#06A77D', '#2E86AB'])
+    ax1.set_ylabel('Annual Cost (₹)', fontsize=12)
+    ax1.set_title('Technician Cost Impact', fontsize=13, fontweight='bold')
+    ax1.grid(True, alpha=0.3, axis='y')
+
+    # Total savings
+    scenarios = ['No Intervention', 'Intervention\n(UER → 30x)']
+    net_costs = [technician_cost_reduction + device_cost_reduction + intervention_cost, intervention_cost]
+
+    ax2.bar(scenarios, net_costs, color=['#D62828', '#06A77D'])
+    ax2.set_ylabel('Annual Net Cost (₹)', fontsize=12)
+    ax2.set_title(f'Cost-Benefit: {roi:.0f}% ROI with {payback_months:.0f}mo Payback', fontsize=13, fontweight='bold')
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    plt.tight_layout()
+    plt.savefig('PHASE2_04_cost_benefit.png', dpi=300, bbox_inches='tight')
+    print(f"\n✓ Saved: PHASE2_04_cost_benefit.png")
+    plt.close()
+
+    # Uncertainty: the same model with its constants drawn from distributions, for every district
+    print(f"\nMonte Carlo cost-benefit ({args.draws:,} draws, every district):")
     print("-" * 80)
-    print(stressed_data[['year_month', 'total_enrolments', 'total_bio_updates', 'total_demo_updates', 'UER']].to_string(index=False))
-    
-    print(f"\nHypothesis Testing for High UER:")
-    
-    # Hypothesis 1: More adult enrollments?
-    adult_enrol_pct = stressed_data['enrol_18+'].sum() / stressed_data[['enrol_0_5', 'enrol_5_17', 'enrol_18+']].sum().sum() * 100
-    print(f"\n  H1 - Adult Enrolment Volume: {adult_enrol_pct:.1f}% (vs national 4.4%)")
-    if adult_enrol_pct > 10:
-        print(f"       ✓ SUPPORTED: More adults = more complex cases = higher updates")
-    
-    # Hypothesis 2: Biometric-heavy operations?
-    bio_pct = stressed_data['total_bio_updates'].sum() / (stressed_data['total_bio_updates'].sum() + stressed_data['total_demo_updates'].sum()) * 100
-    print(f"\n  H2 - Biometric Intensity: {bio_pct:.1f}% (vs national 63%)")
-    if bio_pct > 75:
-        print(f"       ✓ SUPPORTED: Very bio-heavy = device failures, retrain cycles")
-    
-    # Hypothesis 3: Seasonal volatility?
-    uer_std = stressed_data['UER'].std()
-    print(f"\n  H3 - Operational Stability: UER std = {uer_std:.0f}x (volatile={uer_std > 100})")
-    if uer_std > 100:
-        print(f"       ✓ SUPPORTED: Highly volatile operations = infrastructure issues or staffing changes")
-
-# ============================================================================
-# ENHANCEMENT 6: COST-BENEFIT ANALYSIS
-# ============================================================================
-
-print(f"\n{'='*80}")
-print("ENHANCEMENT 6: COST-BENEFIT ANALYSIS")
-print(f"{'='*80}\n")
-
-# Calculate potential savings
-top_15_stressed = merged_df.groupby('district')['UER'].mean().nlargest(15)
-high_stress_enrol = merged_df[merged_df['district'].isin(top_15_stressed.index)]['total_enrolments'].sum()
-
-print(f"Scenario: Deploy targeted support to top-15 high-stress districts")
-print("-" * 80)
-print(f"  Districts: {', '.join(top_15_stressed.index[:5])}... (+10 more)")
-print(f"  Current enrollments in these districts: {high_stress_enrol:.0f}")
-print(f"  Current avg UER in these districts: {top_15_stressed.mean():.1f}x")
-
-# Assumptions
-current_updates = high_stress_enrol * top_15_stressed.mean()
-target_uer = 30  # Reduce to national median
-target_updates = high_stress_enrol * target_uer
-updates_saved = current_updates - target_updates
-
-print(f"\n  Current update load: {current_updates:.0f}")
-print(f"  Target update load (UER 30x): {target_updates:.0f}")
-print(f"  Updates that could be eliminated: {updates_saved:.0f}")
-
-# Cost modeling
-technician_salary_annual = 300000  # INR
-updates_per_technician_annual = 50000
-technicians_needed_current = current_updates / updates_per_technician_annual
-technicians_needed_target = target_updates / updates_per_technician_annual
-technician_cost_reduction = (technicians_needed_current - technicians_needed_target) * technician_salary_annual
-
-device_depreciation = 5000  # INR per year per device
-devices_needed_current = high_stress_enrol / 500
-devices_needed_target = high_stress_enrol / 800
-device_cost_reduction = (devices_needed_current - devices_needed_target) * device_depreciation
-
-total_savings = technician_cost_reduction + device_cost_reduction
-
-print(f"\n  Technicians needed currently: {technicians_needed_current:.0f}")
-print(f"  Technicians needed at UER 30x: {technicians_needed_target:.0f}")
-print(f"  Potential technician cost savings: ₹{technician_cost_reduction:,.0f} annually")
-
-print(f"\n  Device cost savings: ₹{device_cost_reduction:,.0f} annually")
-print(f"\n  💰 TOTAL ANNUAL SAVINGS: ₹{total_savings:,.0f}")
-
-# Investment needed
-intervention_cost = 50000  # Staff training, device maintenance contracts, monitoring
-roi = (total_savings / intervention_cost) * 100
-payback_months = (intervention_cost / total_savings) * 12 if total_savings > 0 else np.inf
-
-print(f"\n  Investment needed (per intervention): ₹{intervention_cost:,}")
-print(f"  ROI: {roi:.0f}% (if savings achieved)")
-print(f"  Payback period: {payback_months:.1f} months")
-
-# Create cost-benefit chart
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-
-# Technician costs
-categories = ['Current\n(High Stress)', 'Target\n(UER 30x)', 'Savings']
-tech_costs = [technician_cost_reduction + technician_salary_annual * technicians_needed_target, 
-              technician_salary_annual * technicians_needed_target, 
-              technician_cost_reduction]
-
-ax1.bar(categories, tech_costs, color=['#D62828', '#06A77D', '#2E86AB'])
-ax1.set_ylabel('Annual Cost (₹)', fontsize=12)
-ax1.set_title('Technician Cost Impact', fontsize=13, fontweight='bold')
-ax1.grid(True, alpha=0.3, axis='y')
-
-# Total savings
-scenarios = ['No Intervention', 'Intervention\n(UER → 30x)']
-net_costs = [technician_cost_reduction + device_cost_reduction + intervention_cost, intervention_cost]
-
-ax2.bar(scenarios, net_costs, color=['#D62828', '#06A77D'])
-ax2.set_ylabel('Annual Net Cost (₹)', fontsize=12)
-ax2.set_title(f'Cost-Benefit: {roi:.0f}% ROI with {payback_months:.0f}mo Payback', fontsize=13, fontweight='bold')
-ax2.grid(True, alpha=0.3, axis='y')
-
-plt.tight_layout()
-plt.savefig('PHASE2_04_cost_benefit.png', dpi=300, bbox_inches='tight')
-print(f"\n✓ Saved: PHASE2_04_cost_benefit.png")
-plt.close()
-
-# ============================================================================
-# ENHANCEMENT 7: UPDATED INSIGHTS TABLE
-# ============================================================================
-
-print(f"\n{'='*80}")
-print("ENHANCEMENT 7: UPDATED INSIGHTS TABLE")
-print(f"{'='*80}\n")
-
-enhanced_insights = pd.DataFrame([
-    {
-        'Insight': 'Corrected Forecast Shows Cyclical Pattern',
-        'Evidence': 'PHASE2_01_ts_decomposition.png',
-        'Finding': f'Biometric updates NOT linearly declining. System oscillates around 2.4–2.8M/month with seasonal peaks in Aug/Dec and troughs in Sep.',
-        'UIDAI Value': 'Seasonal demand planning: Maintenance windows should avoid Aug/Dec. Capacity should be 8–9M/month (peak × 1.15).',
-        'Confidence': 'High'
-    },
-    {
-        'Insight': 'Biometric Infrastructure is Bottleneck (Confirmed)',
-        'Evidence': 'PHASE2_03_correlation_matrix.png',
-        'Finding': f'Correlation between bio_share and UER is strong: districts with >75% biometric load have 3x higher UER than demo-heavy districts.',
-        'UIDAI Value': 'Investment priority: Device procurement > Data systems. Technician specialization in device maintenance > Data entry.',
-        'Confidence': 'High'
-    },
-    {
-        'Insight': 'Adult Enrollments Drive Complexity (Root Cause)',
-        'Evidence': 'Segment analysis + Uttar Bastar Kanker deep dive',
-        'Finding': 'Districts with >10% adult enrollments have 5x higher UER. Adults require bio re-captures, demographic corrections (not just single registration).',
-        'UIDAI Value': 'Adult onboarding workflow needs separate process design. Consider mobile outreach for adults (reduces repeat visits).',
-        'Confidence': 'Medium'
-    },
-    {
-        'Insight': 'State-Level Stress Shows Geographic Pattern',
-        'Evidence': 'PHASE2_02_state_stress.png',
-        'Finding': 'Chhattisgarh (tribal zones), Maharashtra (Vidarbha), Himachal (hills) consistently high-stress. Correlation with infrastructure gap.',
-        'UIDAI Value': 'Regional hub model: Deploy mega-centers in metro + sub-centers in tribal/rural areas with monthly mobile outreach.',
-        'Confidence': 'High'
-    },
-    {
-        'Insight': 'Operational Stability Confirmed (No Crises)',
-        'Evidence': 'PHASE2_anomaly_table.csv',
-        'Finding': f'Only {len(elevated)} elevated cases detected (Z>1.5) out of {len(merged_df)} records. Most fluctuations are within seasonal norm.',
-        'UIDAI Value': 'System is stable enough for predictive planning. Focus on continuous improvement, not emergency firefighting.',
-        'Confidence': 'High'
-    },
-    {
-        'Insight': 'Cost-Benefit: 20–30% ROI on Targeted Support',
-        'Evidence': 'PHASE2_04_cost_benefit.png',
-        'Finding': f'₹{total_savings:,.0f} annual savings from {roi:.0f}% efficiency gain. ₹{intervention_cost:,} per-district intervention payback in {payback_months:.0f} months.',
-        'UIDAI Value': 'Business case is strong: Allocate ₹{50*15:,} for top-15 districts → ₹{total_savings*15/high_stress_enrol*sum(top_15_stressed)/15:,.0f} annual savings.',
-        'Confidence': 'Medium-High'
-    }
-])
-
-enhanced_insights.to_csv('PHASE2_insights_enhanced.csv', index=False)
-print("✓ Saved: PHASE2_insights_enhanced.csv")
-print("\nEnhanced insights:")
-print(enhanced_insights[['Insight', 'Confidence']].to_string(index=False))
-
-print(f"\n{'='*80}")
-print("PHASE 2 COMPLETE: Expert enhancements applied")
-print(f"{'='*80}")
-print("\nNew files generated:")
-print("  ✓ PHASE2_01_ts_decomposition.png (Corrected forecast)")
-print("  ✓ PHASE2_02_state_stress.png (State-level analysis)")
-print("  ✓ PHASE2_03_correlation_matrix.png (Root cause analysis)")
-print("  ✓ PHASE2_04_cost_benefit.png (Business case)")
-print("  ✓ PHASE2_anomaly_table.csv (Elevated cases)")
-print("  ✓ PHASE2_insights_enhanced.csv (Updated insights)")
-print("\nNext: Present these to judge with expert-level analysis")
+    district_costs = merged_df.groupby(['state', 'district'], observed=True).agg(
+        total_enrolments=('total_enrolments', 'sum'), mean_UER=('UER', 'mean')).reset_index()
+    district_costs = district_costs.sort_values('mean_UER', ascending=False).reset_index(drop=True)
+    cost_bands, portfolio_bands = simulate_cost_benefit(
+        district_costs, portfolio=np.arange(len(district_costs)) < 15, n_draws=args.draws, workers=args.workers)
+    print(f"\n  Top-15 portfolio (5th / 50th / 95th percentile):")
+    print(f"    Annual savings: ₹{portfolio_bands.loc['savings', 'p5']:,.0f} / ₹{portfolio_bands.loc['savings', 'p50']:,.0f} "
+          f"/ ₹{portfolio_bands.loc['savings', 'p95']:,.0f}")
+    print(f"    ROI: {portfolio_bands.loc['roi', 'p5']:.0f}% / {portfolio_bands.loc['roi', 'p50']:.0f}% "
+          f"/ {portfolio_bands.loc['roi', 'p95']:.0f}%")
+    print(f"    Payback: {portfolio_bands.loc['payback_months', 'p5']:.1f} / {portfolio_bands.loc['payback_months', 'p50']:.1f} "
+          f"/ {portfolio_bands.loc['payback_months', 'p95']:.1f} months")
+    print(f"\n  Districts with positive savings in ≥95% of draws: {(cost_bands['prob_positive'] >= 0.95).sum()}")
+    print(cost_bands.sort_values('savings_p50', ascending=False)
+          [['state', 'district', 'mean_UER', 'savings_p5', 'savings_p50', 'savings_p95', 'prob_positive']]
+          .head(10).to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+    cost_bands.to_csv('PHASE2_cost_benefit_districts.csv', index=False)
+    portfolio_bands.to_csv('PHASE2_cost_benefit_portfolio.csv')
+    print(f"✓ Saved: PHASE2_cost_benefit_districts.csv, PHASE2_cost_benefit_portfolio.csv")
+
+    # ============================================================================
+    # ENHANCEMENT 7: UPDATED INSIGHTS TABLE
+    # ============================================================================
+
+    print(f"\n{'='*80}")
+    print("ENHANCEMENT 7: UPDATED INSIGHTS TABLE")
+    print(f"{'='*80}\n")
+
+    enhanced_insights = pd.DataFrame([
+        {
+            'Insight': 'Corrected Forecast Shows Cyclical Pattern',
+            'Evidence': 'PHASE2_01_ts_decomposition.png',
+            'Finding': f'Biometric updates NOT linearly declining. System oscillates around 2.4–2.8M/month with seasonal peaks in Aug/Dec and troughs in Sep.',
+            'UIDAI Value': 'Seasonal demand planning: Maintenance windows should avoid Aug/Dec. Capacity should be 8–9M/month (peak × 1.15).',
+            'Confidence': 'High'
+        },
+        {
+            'Insight': 'Biometric Infrastructure is Bottleneck (Confirmed)',
+            'Evidence': 'PHASE2_03_correlation_matrix.png',
+            'Finding': f'Correlation between bio_share and UER is strong: districts with >75% biometric load have 3x higher UER than demo-heavy districts.',
+            'UIDAI Value': 'Investment priority: Device procurement > Data systems. Technician specialization in device maintenance > Data entry.',
+            'Confidence': 'High'
+        },
+        {
+            'Insight': 'Adult Enrollments Drive Complexity (Root Cause)',
+            'Evidence': 'Segment analysis + Uttar Bastar Kanker deep dive',
+            'Finding': 'Districts with >10% adult enrollments have 5x higher UER. Adults require bio re-captures, demographic corrections (not just single registration).',
+            'UIDAI Value': 'Adult onboarding workflow needs separate process design. Consider mobile outreach for adults (reduces repeat visits).',
+            'Confidence': 'Medium'
+        },
+        {
+            'Insight': 'State-Level Stress Shows Geographic Pattern',
+            'Evidence': 'PHASE2_02_state_stress.png',
+            'Finding': 'Chhattisgarh (tribal zones), Maharashtra (Vidarbha), Himachal (hills) consistently high-stress. Correlation with infrastructure gap.',
+            'UIDAI Value': 'Regional hub model: Deploy mega-centers in metro + sub-centers in tribal/rural areas with monthly mobile outreach.',
+            'Confidence': 'High'
+        },
+        {
+            'Insight': 'Operational Stability Confirmed (No Crises)',
+            'Evidence': 'PHASE2_anomaly_table.csv',
+            'Finding': f'Only {len(elevated)} elevated cases detected (Z>1.5) out of {len(merged_df)} records. Most fluctuations are within seasonal norm.',
+            'UIDAI Value': 'System is stable enough for predictive planning. Focus on continuous improvement, not emergency firefighting.',
+            'Confidence': 'High'
+        },
+        {
+            'Insight': 'Cost-Benefit: 20–30% ROI on Targeted Support',
+            'Evidence': 'PHASE2_04_cost_benefit.png',
+            'Finding': f'₹{total_savings:,.0f} annual savings from {roi:.0f}% efficiency gain. ₹{intervention_cost:,} per-district intervention payback in {payback_months:.0f} months.',
+            'UIDAI Value': 'Business case is strong: Allocate ₹{50*15:,} for top-15 districts → ₹{total_savings*15/high_stress_enrol*sum(top_15_stressed)/15:,.0f} annual savings.',
+            'Confidence': 'Medium-High'
+        }
+    ])
+
+    enhanced_insights.to_csv('PHASE2_insights_enhanced.csv', index=False)
+    print("✓ Saved: PHASE2_insights_enhanced.csv")
+    print("\nEnhanced insights:")
+    print(enhanced_insights[['Insight', 'Confidence']].to_string(index=False))
+
+    print(f"\n{'='*80}")
+    print("PHASE 2 COMPLETE: Expert enhancements applied")
+    print(f"{'='*80}")
+    print("\nNew files generated:")
+    print("  ✓ PHASE2_01_ts_decomposition.png (Corrected forecast)")
+    print("  ✓ PHASE2_02_state_stress.png (State-level analysis)")
+    print("  ✓ PHASE2_03_correlation_matrix.png (Root cause analysis)")
+    print("  ✓ PHASE2_04_cost_benefit.png (Business case)")
+    print("  ✓ PHASE2_anomaly_table.csv (Elevated cases)")
+    print("  ✓ PHASE2_insights_enhanced.csv (Updated insights)")
+    print("\nNext: Present these to judge with expert-level analysis")
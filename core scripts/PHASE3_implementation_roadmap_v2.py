@@ -1,507 +1,713 @@
+import argparse
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
 
+from queue_simulation import DEFAULT_TARGET_WAIT, WORKING_DAYS, simulate_staffing
+from resource_optimizer import DEFAULT_BUDGET, DEFAULT_TARGET_UER, optimize_resources
+
 # ============================================
 # PHASE 3: IMPLEMENTATION ROADMAP
 # STANDALONE VERSION (Direct from CSV data)
 # ============================================
 
-print("\n" + "="*80)
-print("PHASE 3: IMPLEMENTATION ROADMAP FOR HIGH-STRESS DISTRICTS")
-print("="*80)
-
-# Just identify top-5 from previous analysis
-# We know from PHASE 1 output these are the top districts
-top_districts = [
-    'Uttar Bastar Kanker',
-    'Mohla-Manpur-Ambagarh Chouki',
-    'Panchkula',
-    'Wardha',
-    'Balod'
-]
-
-uer_values = {
-    'Uttar Bastar Kanker': 1570.9,
-    'Mohla-Manpur-Ambagarh Chouki': 530.6,
-    'Panchkula': 518.8,
-    'Wardha': 474.3,
-    'Balod': 393.4
-}
-
-print(f"\n📍 TOP-5 DISTRICTS (by avg UER):")
-for i, district in enumerate(top_districts, 1):
-    print(f"  {i}. {district}: {uer_values[district]:.1f}x")
+# Pool workers started with spawn import this script; only the main process runs the analysis
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="PHASE 3 implementation roadmap for the high-stress districts")
+    parser.add_argument('--district-stress', default='district_stress.csv',
+                        help="District stress metrics written by res.py (default: district_stress.csv)")
+    parser.add_argument('--top', type=int, default=None,
+                        help="Only plan for the N highest-UER high-stress districts (default: all of them)")
+    parser.add_argument('--forecasts', default='district_forecasts.csv',
+                        help="Per-district forecasts written by res.py, used as the load to optimize for (default: district_forecasts.csv)")
+    parser.add_argument('--national-budget', type=float, default=DEFAULT_BUDGET,
+                        help=f"Annual budget (₹) for technicians, devices and mobile camps (default: {DEFAULT_BUDGET:,})")
+    parser.add_argument('--target-uer', type=float, default=DEFAULT_TARGET_UER,
+                        help=f"UER above which load counts as stress (default: {DEFAULT_TARGET_UER})")
+    parser.add_argument('--optimizer', choices=['milp', 'lp', 'greedy'], default='milp',
+                        help="Integer program, linear relaxation or greedy allocation (default: milp)")
+    parser.add_argument('--target-wait', type=float, default=DEFAULT_TARGET_WAIT,
+                        help=f"Mean wait (minutes) the simulated enrolment-centre staffing must meet (default: {DEFAULT_TARGET_WAIT})")
+    parser.add_argument('--queue-days', type=int, default=5, help="Days simulated per district and scenario (default: 5)")
+    parser.add_argument('--current-staffing', metavar='CSV', default=None,
+                        help="Today's enrolment officers per district (columns: state, district, officers); they are "
+                             "simulated on the same load as the recommended staffing (default: none, no current → target saving)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes for the queue simulation (default: all cores, 1 = serial)")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("PHASE 3: IMPLEMENTATION ROADMAP FOR HIGH-STRESS DISTRICTS")
+    print("="*80)
+
+    # Top-5 from the PHASE 1 output, used when res.py has not written district_stress.csv
+    FALLBACK_DISTRICTS = pd.DataFrame({
+        'district': ['Uttar Bastar Kanker', 'Mohla-Manpur-Ambagarh Chouki', 'Panchkula', 'Wardha', 'Balod'],
+        'UER': [1570.9, 530.6, 518.8, 474.3, 393.4],
+    })
+
+    high_stress = pd.DataFrame()
+    district_stress = None
+    if os.path.exists(args.district_stress):
+        district_stress = pd.read_csv(args.district_stress)
+        high_stress = district_stress[district_stress['stress_level'] == 'High'].sort_values('UER', ascending=False)
+        if args.top:
+            high_stress = high_stress.head(args.top)
+        print(f"\n✓ Loaded {args.district_stress}: {len(high_stress)} high-stress of {len(district_stress)} districts")
+    if len(high_stress) == 0:
+        print(f"\n⚠ No high-stress districts from {args.district_stress} (run res.py first); using the PHASE 1 top-5")
+        high_stress = FALLBACK_DISTRICTS.copy()
+    high_stress = high_stress.reset_index(drop=True)
+    n_districts = len(high_stress)
+    top_districts = high_stress['district'].tolist()
+
+    print(f"\n📍 TOP-{n_districts} DISTRICTS (by avg UER):")
+    for i, row in high_stress.head(10).iterrows():
+        print(f"  {i + 1}. {row['district']}: {row['UER']:.1f}x")
+    if n_districts > 10:
+        print(f"  ... (+{n_districts - 10} more)")
+
+    # ============================================
+    # ROADMAP STRUCTURE
+    # ============================================
+
+    start_date = datetime(2024, 2, 1)
+
+    # Cost of each roadmap phase per district (₹K), scaled to the number of districts
+    PHASE_BUDGET_PER_DISTRICT = [30, 40, 36, 20, 24, 16]
+    phase_budgets = [budget * n_districts for budget in PHASE_BUDGET_PER_DISTRICT]
+
+    weeks_data = {
+        # WEEK 0: Assessment Phase
+        0: {
+            'Phase': 'Assessment & Planning',
+            'Duration': '1 week',
+            'Start': start_date,
+            'Activities': [
+                'Site survey (each district)',
+                'Staff interview (current technicians)',
+                'Device inventory audit',
+                'Baseline metrics capture',
+                'Stakeholder workshop (UIDAI + state)'
+            ],
+            'Deliverables': [
+                'District readiness assessment',
+                'Current process documentation',
+                'Device failure root cause analysis',
+                'Budget approval (₹50K per district)'
+            ],
+            'Resources': '3 UIDAI field consultants, 1 data analyst',
+            'Budget': f'₹{phase_budgets[0]:,}K (travel + time)',
+            'Risk': 'Delays in stakeholder alignment'
+        },
+
+        # WEEK 1-2: Infrastructure Fix
+        1: {
+            'Phase': 'Infrastructure Setup',
+            'Duration': '2 weeks',
+            'Start': start_date + timedelta(days=7),
+            'Activities': [
+                'Device calibration (all enrollment stations)',
+                'Network redundancy deployment',
+                'Backup power system installation',
+                'Data sync protocol fix',
+                'Monitoring dashboard setup'
+            ],
+            'Deliverables': [
+                'Calibrated devices (100%)',
+                'Network latency <100ms',
+                'UPS backup for all sites',
+                'Live monitoring dashboard'
+            ],
+            'Resources': '2 device technicians, 1 network engineer',
+            'Budget': f'₹{phase_budgets[1]:,}K (equipment + labor)',
+            'Risk': 'Device procurement delays'
+        },
+
+        # WEEK 3-4: Staff Training
+        2: {
+            'Phase': 'Staff Training & Process',
+            'Duration': '2 weeks',
+            'Start': start_date + timedelta(days=21),
+            'Activities': [
+                'Error recovery SOP training (all staff)',
+                'Device troubleshooting workshop',
+                'Data quality review process',
+                'Shift rotation optimization',
+                'Performance incentive design'
+            ],
+            'Deliverables': [
+                '100% staff trained & certified',
+                'SOP documentation (3 languages)',
+                'Error recovery playbook',
+                'Shift schedule optimized for peak hours'
+            ],
+            'Resources': '1 training manager, 5 trainers (local)',
+            'Budget': f'₹{phase_budgets[2]:,}K (training + stipends)',
+            'Risk': 'Staff turnover during training'
+        },
+
+        # WEEK 5: Pilot & Stabilization
+        3: {
+            'Phase': 'Pilot Testing',
+            'Duration': '1 week',
+            'Start': start_date + timedelta(days=35),
+            'Activities': [
+                'Full system run with new processes',
+                'Monitor UER real-time',
+                'Capture metrics (baseline → new)',
+                'Identify edge cases',
+                'Adjust staffing if needed'
+            ],
+            'Deliverables': [
+                'Pilot UER measurement',
+                'Gap analysis report',
+                'Refined staffing model',
+                'Go-live readiness checklist'
+            ],
+            'Resources': '1 pilot manager, 2 support engineers',
+            'Budget': f'₹{phase_budgets[3]:,}K (monitoring + support)',
+            'Risk': 'Unforeseen technical issues'
+        },
+
+        # WEEK 6: Go-Live & Rollout
+        4: {
+            'Phase': 'Full Go-Live',
+            'Duration': '1 week',
+            'Start': start_date + timedelta(days=42),
+            'Activities': [
+                f'Activate new processes (all {n_districts} districts)',
+                '24/7 support hotline',
+                'Daily metrics review',
+                'Issue escalation protocol',
+                'Success celebration (staff morale)'
+            ],
+            'Deliverables': [
+                'New UER < 30x (target)',
+                'Incident response <1 hour',
+                'Staff satisfaction survey',
+                'Success metrics dashboard'
+            ],
+            'Resources': '1 program manager, 5 support staff',
+            'Budget': f'₹{phase_budgets[4]:,}K (support + contingency)',
+            'Risk': 'New issues post-launch'
+        },
+
+        # WEEK 7-12: Stabilization & Learning
+        5: {
+            'Phase': 'Stabilization & Optimization',
+            'Duration': '6 weeks',
+            'Start': start_date + timedelta(days=49),
+            'Activities': [
+                'Weekly performance reviews',
+                'Continuous optimization',
+                'Peer learning from best performers',
+                'Gradual reduction in support',
+                'Automation of routine tasks'
+            ],
+            'Deliverables': [
+                'UER stable at target <30x',
+                'Process optimization recommendations',
+                'Staff capability assessment',
+                'Handover to state operations'
+            ],
+            'Resources': '1 program manager (20% time)',
+            'Budget': f'₹{phase_budgets[5]:,}K (part-time support)',
+            'Risk': 'Regression if support withdrawn too early'
+        }
+    }
 
-# ============================================
-# ROADMAP STRUCTURE
-# ============================================
+    # ============================================
+    # DETAILED ROADMAP TABLE
+    # ============================================
+
+    print("\n" + "="*80)
+    print("DETAILED ROADMAP: 8-WEEK TRANSFORMATION")
+    print("="*80)
+
+    for week_num, week_data in weeks_data.items():
+        print(f"\n{'='*80}")
+        print(f"WEEK {week_num}: {week_data['Phase'].upper()}")
+        print(f"Duration: {week_data['Duration']} | Start: {week_data['Start'].strftime('%b %d, %Y')}")
+        print(f"{'='*80}")
+
+        print("\n📋 ACTIVITIES:")
+        for activity in week_data['Activities']:
+            print(f"   • {activity}")
+
+        print("\n✅ DELIVERABLES:")
+        for deliverable in week_data['Deliverables']:
+            print(f"   ✓ {deliverable}")
+
+        print(f"\n👥 RESOURCES: {week_data['Resources']}")
+        print(f"💰 BUDGET: {week_data['Budget']}")
+        print(f"⚠️  KEY RISK: {week_data['Risk']}")
+
+    # ============================================
+    # QUEUE SIMULATION (ENROLMENT CENTRE STAFFING)
+    # ============================================
+
+    print("\n\n" + "="*80)
+    print("QUEUE SIMULATION: OFFICERS NEEDED PER DISTRICT")
+    print("="*80 + "\n")
+
+    # Today's headcount is an input (--current-staffing); without it only the required staffing is simulated
+    current_staffing = None
+    if args.current_staffing:
+        if os.path.exists(args.current_staffing):
+            current_staffing = pd.read_csv(args.current_staffing)
+            if {'state', 'district', 'officers'} <= set(current_staffing.columns):
+                print(f"✓ Current officers from {args.current_staffing} ({len(current_staffing)} districts)")
+            else:
+                print(f"⚠ {args.current_staffing} needs state, district and officers columns; ignoring it")
+                current_staffing = None
+        else:
+            print(f"⚠ {args.current_staffing} not found; simulating the required staffing only")
+
+    queue_levels, queue_staffing = None, None
+    if {'total_enrolments', 'total_bio_updates', 'total_demo_updates', 'months'} <= set(high_stress.columns):
+        working_days = high_stress['months'].clip(lower=1) * WORKING_DAYS
+        queue_input = high_stress[['state', 'district']].assign(
+            daily_enrol=high_stress['total_enrolments'] / working_days,
+            daily_bio=high_stress['total_bio_updates'] / working_days,
+            daily_demo=high_stress['total_demo_updates'] / working_days)
+        if current_staffing is not None:
+            queue_input = queue_input.merge(current_staffing[['state', 'district', 'officers']].drop_duplicates(['state', 'district']),
+                                            on=['state', 'district'], how='left').rename(columns={'officers': 'current_servers'})
+        queue_levels, queue_staffing = simulate_staffing(queue_input, n_days=args.queue_days, target_wait=args.target_wait,
+                                                         workers=args.workers)
+        has_current = 'current_mean_wait' in queue_staffing
+        summary = {'officers': ('servers', 'sum'), 'mean_wait': ('mean_wait', 'mean'), 'utilization': ('utilization', 'mean'),
+                   'meeting_target': ('meets_target', 'sum')}
+        if has_current:
+            summary = {'current_officers': ('current_servers', 'sum'), 'current_wait': ('current_mean_wait', 'mean'),
+                       'current_utilization': ('current_utilization', 'mean'), **summary}
+        print(f"\n  Target: mean wait ≤ {args.target_wait:g} min")
+        print(queue_staffing.groupby('scenario', sort=False).agg(**summary).to_string(float_format=lambda v: f"{v:.2f}"))
+        print(f"\n  Busiest districts (baseline):")
+        print(queue_staffing[queue_staffing['scenario'] == 'baseline'].sort_values('served_per_day', ascending=False)
+              [['state', 'district', 'served_per_day']
+               + (['current_servers', 'current_mean_wait'] if has_current else [])
+               + ['servers', 'mean_wait', 'p90_wait', 'utilization']]
+              .head(10).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    else:
+        print(f"⚠ No enrolment/update volumes for the selected districts (run res.py first); staffing uses the PHASE 1 table")
+
+    # ============================================
+    # STAFFING MODEL
+    # ============================================
+
+    print("\n\n" + "="*80)
+    print("STAFFING MODEL: BEFORE vs AFTER")
+    print("="*80)
+
+    # Support staff per district from the enrolment officers (ratios from the PHASE 1 pilot model)
+    OFFICERS_PER_TECHNICIAN = 7.5     # reactive maintenance today
+    OFFICERS_PER_SUPERVISOR = 30
+    ANNUAL_COST_PER_FTE_K = 300
+    STAFF_ROLES = ['Enrollment Officers', 'Device Technicians', 'Supervisors']
+    # Program-wide roles, staffed once however many districts are in the program: role → (current, target)
+    PROGRAM_STAFF = {'Data Quality Checker': (0, 1), 'Support (HQ)': (2, 0)}
+
+    district_staffing = None
+    if queue_staffing is not None:
+        # Officers after the program are the queue-simulated level. Today's officers come from --current-staffing and
+        # are simulated on the same arrivals and service times; without a count for every district, there is no
+        # current officer total and the officers are left out of the saving.
+        keys = pd.MultiIndex.from_frame(high_stress[['state', 'district']])
+        baseline = queue_staffing[queue_staffing['scenario'] == 'baseline'].set_index(['state', 'district']).reindex(keys)
+        target_officers = baseline['servers'].to_numpy(dtype=np.float64)
+        current_officers = (baseline['current_servers'].to_numpy(dtype=np.float64) if 'current_servers' in baseline
+                            else np.full(n_districts, np.nan))
+        officers_known = bool((current_officers > 0).all())
+        if has_current and not officers_known:
+            print(f"⚠ {args.current_staffing} has no officers for {(~(current_officers > 0)).sum()} of {n_districts} districts; "
+                  f"reporting the required staffing only")
+        # Technicians and supervisors follow today's officers when known, else the required officers
+        staffed = current_officers if officers_known else target_officers
+        supervisors = np.ceil(staffed / OFFICERS_PER_SUPERVISOR)
+        current = np.column_stack([current_officers, np.ceil(staffed / OFFICERS_PER_TECHNICIAN), supervisors])
+        target = np.column_stack([target_officers, np.ceil(current[:, 1] / 2), supervisors])
+
+        weights = baseline['served_per_day'].fillna(0).to_numpy() + 1e-12
+        simulated_wait = np.average(baseline['mean_wait'].fillna(0), weights=weights)
+        officer_basis = (f'queue-simulated, wait ≤ {args.target_wait:g} min; simulated wait {simulated_wait:.0f} min, '
+                         f'{baseline["utilization"].mean():.0%} busy')
+        if officers_known:
+            current_wait = np.average(baseline['current_mean_wait'].fillna(0), weights=weights)
+            current_basis = (f'{args.current_staffing}; simulated wait {current_wait:.0f} min, '
+                             f'{baseline["current_utilization"].mean():.0%} busy')
+
+        district_staffing = high_stress[['state', 'district']].copy()
+        for j, role in enumerate(STAFF_ROLES):
+            if j > 0 or officers_known:
+                district_staffing[f'{role} (current)'] = current[:, j].astype(int)
+            district_staffing[f'{role} (target)'] = target[:, j].astype(int)
+        if officers_known:
+            district_staffing['Mean wait min (current)'] = baseline['current_mean_wait'].to_numpy()
+        district_staffing['Mean wait min (target)'] = baseline['mean_wait'].to_numpy()
+        for scenario, scenario_staffing in queue_staffing.groupby('scenario', sort=False):
+            if scenario != 'baseline':
+                district_staffing[f'Enrollment Officers ({scenario})'] = (
+                    scenario_staffing.set_index(['state', 'district'])['servers'].reindex(keys).to_numpy())
+
+        # District roles summed over the districts, then the program-wide roles added once; the totals and
+        # the saving only cover the roles with a known current headcount
+        current_fte = np.append(np.nan_to_num(current.sum(axis=0), nan=0), [c for c, _ in PROGRAM_STAFF.values()]).astype(int)
+        target_fte = np.append(target.sum(axis=0), [t for _, t in PROGRAM_STAFF.values()]).astype(int)
+        compared = np.ones(len(current_fte), dtype=bool)
+        compared[0] = officers_known
+        totals_note = '' if officers_known else ' (excl. officers)'
+        staffing_model = pd.DataFrame({
+            'Role': STAFF_ROLES + list(PROGRAM_STAFF) + ['TOTAL TEAM'],
+            'Current State': [f'{current_fte[0]} ({current_basis})' if officers_known else 'not provided (--current-staffing)',
+                              f'{current_fte[1]} (reactive maintenance)',
+                              f'{current_fte[2]} (oversee {OFFICERS_PER_SUPERVISOR}+ staff)', f'{current_fte[3]} (no QA)',
+                              f'{current_fte[4]} (firefighting)', f'{current_fte[compared].sum()} FTE{totals_note}'],
+            'Target State': [f'{target_fte[0]} ({officer_basis})', f'{target_fte[1]} (preventive maintenance)',
+                             f'{target_fte[2]} (same, better trained)', f'{target_fte[3]} (real-time QA)',
+                             f'{target_fte[4]} (automated monitoring)', f'{target_fte[compared].sum()} FTE{totals_note}'],
+            'Annual Cost (₹K)': [f'{c * ANNUAL_COST_PER_FTE_K if known else "—"} → {t * ANNUAL_COST_PER_FTE_K}'
+                                 for c, t, known in zip(current_fte, target_fte, compared)]
+                                + [f'{current_fte[compared].sum() * ANNUAL_COST_PER_FTE_K} → '
+                                   f'{target_fte[compared].sum() * ANNUAL_COST_PER_FTE_K}'],
+        })
+        current_cost = current_fte[compared].sum() * ANNUAL_COST_PER_FTE_K * 1000
+        staffing_savings = (current_fte[compared].sum() - target_fte[compared].sum()) * ANNUAL_COST_PER_FTE_K * 1000
+    else:
+        staffing_model = pd.DataFrame({
+            'Role': STAFF_ROLES + list(PROGRAM_STAFF) + ['TOTAL TEAM'],
+            'Current State': [
+                '60 (1 per 138 enrollments)',
+                '8 (reactive maintenance)',
+                '2 (oversee 30+ staff)',
+                '0 (no QA)',
+                '2 (firefighting)',
+                '72 FTE'
+            ],
+            'Target State': [
+                '45 (optimized shift)',
+                '4 (preventive maintenance)',
+                '2 (same, better trained)',
+                '1 (real-time QA)',
+                '0 (automated monitoring)',
+                '52 FTE'
+            ],
+            'Annual Cost (₹K)': [
+                '18000 → 13500',
+                '2400 → 1200',
+                '600 → 600',
+                '0 → 300',
+                '600 → 0',
+                '21600 → 15600'
+            ]
+        })
+        current_cost, staffing_savings = 21600000, 6000000
+
+    print("\n", staffing_model.to_string(index=False))
+
+    print(f"\n💰 ANNUAL SAVINGS: ₹{staffing_savings:,.0f} ({staffing_savings / max(current_cost, 1) * 100:.1f}% cost reduction)"
+          + ("" if district_staffing is None or officers_known
+             else "; enrolment officers not compared (--current-staffing does not cover every district)"))
+
+    # ============================================
+    # BUDGET BREAKDOWN
+    # ============================================
+
+    print("\n\n" + "="*80)
+    print("BUDGET BREAKDOWN: 8-WEEK PROGRAM")
+    print("="*80)
+
+    # Base cost per district (₹K) by category
+    BUDGET_CATEGORIES = {
+        'Infrastructure (devices, network)': 40,
+        'Staff Training & Certification': 36,
+        'Process Documentation': 8,
+        'Monitoring & Testing': 20,
+        'Support & Contingency': 24,
+        'Program Management': 12,
+    }
 
-start_date = datetime(2024, 2, 1)
-
-weeks_data = {
-    # WEEK 0: Assessment Phase
-    0: {
-        'Phase': 'Assessment & Planning',
-        'Duration': '1 week',
-        'Start': start_date,
-        'Activities': [
-            'Site survey (each district)',
-            'Staff interview (current technicians)',
-            'Device inventory audit',
-            'Baseline metrics capture',
-            'Stakeholder workshop (UIDAI + state)'
-        ],
-        'Deliverables': [
-            'District readiness assessment',
-            'Current process documentation',
-            'Device failure root cause analysis',
-            'Budget approval (₹50K per district)'
+    # Adaptation per focus: budget adjustment (₹K) and the category it goes to, timeline and weeks
+    ADAPTATION_RULES = pd.DataFrame([
+        ('Complete infrastructure rebuild', 25, 'Infrastructure (devices, network)', 'extra resources', 'Baseline extended to 2 weeks', 9),
+        ('Device stability & staff rotation', 15, 'Monitoring & Testing', 'monitoring', 'Standard 8 weeks', 8),
+        ('Training emphasis (skill gaps)', 10, 'Staff Training & Certification', 'training', 'Training phase extended', 9),
+        ('Process optimization', 0, None, 'standard', 'Can run in 7 weeks', 7),
+        ('Rapid rollout', -5, 'Support & Contingency', 'faster', 'Pilot week can compress', 7),
+    ], columns=['Focus', 'Adjustment_₹K', 'Adjusted_Category', 'Reason', 'Timeline', 'Weeks']).set_index('Focus')
+
+    # Volatility tier from UER relative to the cohort median; bio-heavy HIGH districts get device
+    # work, the others training; the milder MEDIUM-HIGH districts can roll out faster. Without a BSI
+    # (the PHASE 1 fallback rows), the HIGH districts above the median UER get the device work, as in PHASE 1.
+    uer_ratio = high_stress['UER'] / high_stress['UER'].median()
+    bsi = high_stress['BSI'] if 'BSI' in high_stress else pd.Series(np.nan, index=high_stress.index)
+    bio_heavy = (bsi >= bsi.median()).where(bsi.notna(), uer_ratio > 1) if bsi.notna().any() else uer_ratio > 1
+    volatility = np.select([uer_ratio >= 2, uer_ratio >= 1], ['CRITICAL', 'HIGH'], 'MEDIUM-HIGH')
+    focus = np.select(
+        [volatility == 'CRITICAL', (volatility == 'HIGH') & bio_heavy, volatility == 'HIGH', uer_ratio >= 0.85],
+        ['Complete infrastructure rebuild', 'Device stability & staff rotation', 'Training emphasis (skill gaps)',
+         'Process optimization'], 'Rapid rollout')
+
+    district_plan = high_stress.assign(Volatility=volatility, Focus=focus).join(ADAPTATION_RULES, on='Focus')
+    adjustment = district_plan['Adjustment_₹K']
+    district_plan['Budget Adjustment'] = (np.select([adjustment > 0, adjustment < 0], ['+', '-'], '') + '₹'
+                                          + np.where(adjustment != 0, adjustment.abs().astype(str) + 'K', '0')
+                                          + ' (' + district_plan['Reason'] + ')')
+    district_plan['Volatility'] = district_plan['Volatility'] + ' (UER ' + district_plan['UER'].map(lambda v: f'{v:,.0f}' if v >= 100 else f'{v:.1f}') + 'x)'
+
+    district_budget = district_plan[[c for c in ['state', 'district'] if c in district_plan]].copy()
+    for category, base in BUDGET_CATEGORIES.items():
+        district_budget[category] = base + np.where(district_plan['Adjusted_Category'] == category, adjustment, 0)
+    district_budget['TOTAL'] = district_budget[list(BUDGET_CATEGORIES)].sum(axis=1)
+
+    budget_breakdown = pd.DataFrame({
+        'Category': list(BUDGET_CATEGORIES) + ['TOTAL'],
+        'Per District (₹K)': list(BUDGET_CATEGORIES.values()) + [sum(BUDGET_CATEGORIES.values())],
+        'Adaptations (₹K)': (district_budget[list(BUDGET_CATEGORIES) + ['TOTAL']].sum()
+                             - n_districts * pd.Series(list(BUDGET_CATEGORIES.values()) + [sum(BUDGET_CATEGORIES.values())],
+                                                       index=list(BUDGET_CATEGORIES) + ['TOTAL'])).to_numpy(),
+        f'For {n_districts} Districts (₹K)': district_budget[list(BUDGET_CATEGORIES) + ['TOTAL']].sum().to_numpy(),
+    })
+
+    print("\n", budget_breakdown.to_string(index=False))
+
+    # ============================================
+    # SUCCESS METRICS
+    # ============================================
+
+    print("\n\n" + "="*80)
+    print("SUCCESS METRICS & TARGETS")
+    print("="*80)
+
+    metrics = pd.DataFrame({
+        'Metric': [
+            'UER (User Error Rate)',
+            'System Availability',
+            'Device Calibration Status',
+            'Staff Utilization',
+            'Data Quality Score',
+            'Customer Satisfaction',
+            'Issue Resolution Time'
         ],
-        'Resources': '3 UIDAI field consultants, 1 data analyst',
-        'Budget': '₹150K (travel + time)',
-        'Risk': 'Delays in stakeholder alignment'
-    },
-    
-    # WEEK 1-2: Infrastructure Fix
-    1: {
-        'Phase': 'Infrastructure Setup',
-        'Duration': '2 weeks',
-        'Start': start_date + timedelta(days=7),
-        'Activities': [
-            'Device calibration (all enrollment stations)',
-            'Network redundancy deployment',
-            'Backup power system installation',
-            'Data sync protocol fix',
-            'Monitoring dashboard setup'
+        'Current (Baseline)': [
+            f"{high_stress['UER'].mean():,.0f}x",
+            '82%',
+            '65%',
+            '45%',
+            '73%',
+            '4.2/10',
+            '8-12 hours'
         ],
-        'Deliverables': [
-            'Calibrated devices (100%)',
-            'Network latency <100ms',
-            'UPS backup for all sites',
-            'Live monitoring dashboard'
+        'Target (Week 6)': [
+            '30x',
+            '98%',
+            '100%',
+            '85%',
+            '96%',
+            '8.5/10',
+            '<1 hour'
         ],
-        'Resources': '2 device technicians, 1 network engineer',
-        'Budget': '₹200K (equipment + labor)',
-        'Risk': 'Device procurement delays'
-    },
-    
-    # WEEK 3-4: Staff Training
-    2: {
-        'Phase': 'Staff Training & Process',
-        'Duration': '2 weeks',
-        'Start': start_date + timedelta(days=21),
-        'Activities': [
-            'Error recovery SOP training (all staff)',
-            'Device troubleshooting workshop',
-            'Data quality review process',
-            'Shift rotation optimization',
-            'Performance incentive design'
+        'Measurement': [
+            'Daily avg UER tracking',
+            'Uptime monitoring',
+            'Device calibration audit',
+            'Time tracking logs',
+            'QA sample audit',
+            'Staff survey',
+            'Incident ticket timestamps'
+        ]
+    })
+
+    print("\n", metrics.to_string(index=False))
+
+    # ============================================
+    # DISTRICT-SPECIFIC VARIATIONS
+    # ============================================
+
+    print("\n\n" + "="*80)
+    print("DISTRICT-SPECIFIC ADAPTATIONS")
+    print("="*80)
+
+    for i, adapt in district_plan.head(10).iterrows():
+        print(f"\n{i + 1}. {adapt['district']}")
+        print(f"   • Volatility: {adapt['Volatility']}")
+        print(f"   • Focus: {adapt['Focus']}")
+        print(f"   • Budget: {adapt['Budget Adjustment']}")
+        print(f"   • Timeline: {adapt['Timeline']}")
+    if n_districts > 10:
+        print(f"\n... (+{n_districts - 10} more districts in PHASE3_district_adaptations.csv)")
+    print(f"\nDistricts per focus:")
+    print(district_plan['Focus'].value_counts().to_string())
+
+    # ============================================
+    # RESOURCE OPTIMIZATION (ALL DISTRICTS, NATIONAL BUDGET)
+    # ============================================
+
+    print("\n\n" + "="*80)
+    print("RESOURCE ALLOCATION: NATIONAL BUDGET OPTIMIZATION")
+    print("="*80 + "\n")
+
+    # Monthly load per district: res.py's forecasts (mean over the horizon), else the observed averages
+    district_load = None
+    if os.path.exists(args.forecasts):
+        forecasts = pd.read_csv(args.forecasts)
+        forecast_means = forecasts.pivot_table(index=['state', 'district'], columns='metric', values='forecast', aggfunc='mean')
+        district_load = pd.DataFrame({
+            'forecast_updates': forecast_means['total_bio_updates'] + forecast_means['total_demo_updates'],
+            'forecast_enrolments': forecast_means['total_enrolments'],
+        }).reset_index()
+        print(f"✓ Load from {args.forecasts} ({len(district_load)} districts)")
+    elif district_stress is not None:
+        months = district_stress['months'].clip(lower=1)
+        district_load = district_stress[['state', 'district']].assign(
+            forecast_updates=district_stress['total_updates'] / months,
+            forecast_enrolments=district_stress['total_enrolments'] / months)
+        print(f"⚠ {args.forecasts} not found; using the observed monthly averages from {args.district_stress}")
+
+    resource_allocation = None
+    if district_load is not None:
+        resource_allocation, allocation_info = optimize_resources(
+            district_load, budget=args.national_budget, target_uer=args.target_uer, method=args.optimizer)
+        funded = resource_allocation[resource_allocation['cost'] > 0]
+        print(f"\n  Districts above UER {args.target_uer:g}x: {(resource_allocation['excess_before'] > 0).sum()}")
+        print(f"  Districts funded: {len(funded)}")
+        print(f"  Technicians: {resource_allocation['technicians'].sum():,} | Devices: {resource_allocation['devices'].sum():,} "
+              f"| Mobile camps: {resource_allocation['mobile_camps'].sum():,}")
+        print(f"  Spend: ₹{allocation_info['spent']:,.0f} of ₹{args.national_budget:,.0f}")
+        if len(funded) > 0:
+            print(f"\n  Largest allocations:")
+            print(funded.sort_values('cost', ascending=False)
+                  [['state', 'district', 'UER_before', 'UER_after', 'technicians', 'devices', 'mobile_camps', 'cost']]
+                  .head(10).to_string(index=False, float_format=lambda v: f"{v:,.1f}"))
+    else:
+        print(f"⚠ No district load available (run res.py first); skipping the optimization")
+
+    # ============================================
+    # RISK MATRIX
+    # ============================================
+
+    print("\n\n" + "="*80)
+    print("RISK MITIGATION MATRIX")
+    print("="*80)
+
+    risks = pd.DataFrame({
+        'Risk': [
+            'Device procurement delays',
+            'Staff resistance to change',
+            'Stakeholder misalignment',
+            'Technical integration issues',
+            'Poor baseline metrics',
+            'Unexpected UER spike post-launch'
         ],
-        'Deliverables': [
-            '100% staff trained & certified',
-            'SOP documentation (3 languages)',
-            'Error recovery playbook',
-            'Shift schedule optimized for peak hours'
+        'Probability': ['High', 'Medium', 'Low', 'Medium', 'Low', 'Medium'],
+        'Impact': ['High', 'Medium', 'High', 'High', 'Medium', 'High'],
+        'Mitigation': [
+            'Pre-order equipment (week -2)',
+            'Change management training (week 0)',
+            'Kickoff meeting with all stakeholders',
+            'Parallel testing in week 4',
+            'Capture detailed baseline week 0',
+            'Rollback plan + 24/7 support standing by'
+        ]
+    })
+
+    print("\n", risks.to_string(index=False))
+
+    # ============================================
+    # PHASE GATES
+    # ============================================
+
+    print("\n\n" + "="*80)
+    print("GO/NO-GO DECISION GATES")
+    print("="*80)
+
+    gates = {
+        'End of Week 0 (Assessment)': [
+            '✓ All sites surveyed & documented',
+            '✓ Staff interviews completed',
+            '✓ Budget approved by stakeholders',
+            '✓ No show-stoppers identified'
         ],
-        'Resources': '1 training manager, 5 trainers (local)',
-        'Budget': '₹180K (training + stipends)',
-        'Risk': 'Staff turnover during training'
-    },
-    
-    # WEEK 5: Pilot & Stabilization
-    3: {
-        'Phase': 'Pilot Testing',
-        'Duration': '1 week',
-        'Start': start_date + timedelta(days=35),
-        'Activities': [
-            'Full system run with new processes',
-            'Monitor UER real-time',
-            'Capture metrics (baseline → new)',
-            'Identify edge cases',
-            'Adjust staffing if needed'
+        'End of Week 2 (Infrastructure)': [
+            '✓ All devices installed & calibrated',
+            '✓ Network latency <100ms confirmed',
+            '✓ UPS systems functional',
+            '✓ Monitoring dashboard live'
         ],
-        'Deliverables': [
-            'Pilot UER measurement',
-            'Gap analysis report',
-            'Refined staffing model',
-            'Go-live readiness checklist'
+        'End of Week 4 (Training + Pilot)': [
+            '✓ 100% staff trained & passed assessment',
+            '✓ Pilot UER < 100x (70% improvement)',
+            '✓ No critical bugs in new SOP',
+            '✓ Staff confidence >7/10'
         ],
-        'Resources': '1 pilot manager, 2 support engineers',
-        'Budget': '₹100K (monitoring + support)',
-        'Risk': 'Unforeseen technical issues'
-    },
-    
-    # WEEK 6: Go-Live & Rollout
-    4: {
-        'Phase': 'Full Go-Live',
-        'Duration': '1 week',
-        'Start': start_date + timedelta(days=42),
-        'Activities': [
-            'Activate new processes (all 5 districts)',
-            '24/7 support hotline',
-            'Daily metrics review',
-            'Issue escalation protocol',
-            'Success celebration (staff morale)'
-        ],
-        'Deliverables': [
-            'New UER < 30x (target)',
-            'Incident response <1 hour',
-            'Staff satisfaction survey',
-            'Success metrics dashboard'
-        ],
-        'Resources': '1 program manager, 5 support staff',
-        'Budget': '₹120K (support + contingency)',
-        'Risk': 'New issues post-launch'
-    },
-    
-    # WEEK 7-12: Stabilization & Learning
-    5: {
-        'Phase': 'Stabilization & Optimization',
-        'Duration': '6 weeks',
-        'Start': start_date + timedelta(days=49),
-        'Activities': [
-            'Weekly performance reviews',
-            'Continuous optimization',
-            'Peer learning from best performers',
-            'Gradual reduction in support',
-            'Automation of routine tasks'
-        ],
-        'Deliverables': [
-            'UER stable at target <30x',
-            'Process optimization recommendations',
-            'Staff capability assessment',
-            'Handover to state operations'
-        ],
-        'Resources': '1 program manager (20% time)',
-        'Budget': '₹80K (part-time support)',
-        'Risk': 'Regression if support withdrawn too early'
+        'End of Week 6 (Go-Live)': [
+            '✓ Full rollout UER < 30x (target achieved)',
+            '✓ System stability >98%',
+            '✓ Issue resolution <1 hour',
+            '✓ Staff satisfaction >8/10'
+        ]
     }
-}
-
-# ============================================
-# DETAILED ROADMAP TABLE
-# ============================================
-
-print("\n" + "="*80)
-print("DETAILED ROADMAP: 8-WEEK TRANSFORMATION")
-print("="*80)
-
-for week_num, week_data in weeks_data.items():
-    print(f"\n{'='*80}")
-    print(f"WEEK {week_num}: {week_data['Phase'].upper()}")
-    print(f"Duration: {week_data['Duration']} | Start: {week_data['Start'].strftime('%b %d, %Y')}")
-    print(f"{'='*80}")
-    
-    print("\n📋 ACTIVITIES:")
-    for activity in week_data['Activities']:
-        print(f"   • {activity}")
-    
-    print("\n✅ DELIVERABLES:")
-    for deliverable in week_data['Deliverables']:
-        print(f"   ✓ {deliverable}")
-    
-    print(f"\n👥 RESOURCES: {week_data['Resources']}")
-    print(f"💰 BUDGET: {week_data['Budget']}")
-    print(f"⚠️  KEY RISK: {week_data['Risk']}")
-
-# ============================================
-# STAFFING MODEL
-# ============================================
-
-print("\n\n" + "="*80)
-print("STAFFING MODEL: BEFORE vs AFTER")
-print("="*80)
-
-staffing_model = pd.DataFrame({
-    'Role': [
-        'Enrollment Officers',
-        'Device Technicians',
-        'Supervisors',
-        'Data Quality Checker',
-        'Support (HQ)',
-        'TOTAL TEAM'
-    ],
-    'Current State': [
-        '60 (1 per 138 enrollments)',
-        '8 (reactive maintenance)',
-        '2 (oversee 30+ staff)',
-        '0 (no QA)',
-        '2 (firefighting)',
-        '72 FTE'
-    ],
-    'Target State': [
-        '45 (optimized shift)',
-        '4 (preventive maintenance)',
-        '2 (same, better trained)',
-        '1 (real-time QA)',
-        '0 (automated monitoring)',
-        '52 FTE'
-    ],
-    'Annual Cost (₹K)': [
-        '18000 → 13500',
-        '2400 → 1200',
-        '600 → 600',
-        '0 → 300',
-        '600 → 0',
-        '21600 → 15600'
-    ]
-})
-
-print("\n", staffing_model.to_string(index=False))
-
-print(f"\n💰 ANNUAL SAVINGS: ₹6,000,000 (27.8% cost reduction)")
-
-# ============================================
-# BUDGET BREAKDOWN
-# ============================================
-
-print("\n\n" + "="*80)
-print("BUDGET BREAKDOWN: 8-WEEK PROGRAM")
-print("="*80)
-
-budget_breakdown = pd.DataFrame({
-    'Category': [
-        'Infrastructure (devices, network)',
-        'Staff Training & Certification',
-        'Process Documentation',
-        'Monitoring & Testing',
-        'Support & Contingency',
-        'Program Management',
-        'TOTAL'
-    ],
-    'Per District (₹K)': [
-        40,
-        36,
-        8,
-        20,
-        24,
-        12,
-        140
-    ],
-    'For 5 Districts (₹K)': [
-        200,
-        180,
-        40,
-        100,
-        120,
-        60,
-        700
-    ]
-})
-
-print("\n", budget_breakdown.to_string(index=False))
-
-# ============================================
-# SUCCESS METRICS
-# ============================================
-
-print("\n\n" + "="*80)
-print("SUCCESS METRICS & TARGETS")
-print("="*80)
-
-metrics = pd.DataFrame({
-    'Metric': [
-        'UER (User Error Rate)',
-        'System Availability',
-        'Device Calibration Status',
-        'Staff Utilization',
-        'Data Quality Score',
-        'Customer Satisfaction',
-        'Issue Resolution Time'
-    ],
-    'Current (Baseline)': [
-        '435x',
-        '82%',
-        '65%',
-        '45%',
-        '73%',
-        '4.2/10',
-        '8-12 hours'
-    ],
-    'Target (Week 6)': [
-        '30x',
-        '98%',
-        '100%',
-        '85%',
-        '96%',
-        '8.5/10',
-        '<1 hour'
-    ],
-    'Measurement': [
-        'Daily avg UER tracking',
-        'Uptime monitoring',
-        'Device calibration audit',
-        'Time tracking logs',
-        'QA sample audit',
-        'Staff survey',
-        'Incident ticket timestamps'
-    ]
-})
-
-print("\n", metrics.to_string(index=False))
-
-# ============================================
-# DISTRICT-SPECIFIC VARIATIONS
-# ============================================
-
-print("\n\n" + "="*80)
-print("DISTRICT-SPECIFIC ADAPTATIONS")
-print("="*80)
-
-adaptations = {
-    'Uttar Bastar Kanker': {
-        'Volatility': 'CRITICAL (UER 1,570x)',
-        'Focus': 'Complete infrastructure rebuild',
-        'Budget Adjustment': '+₹25K (extra resources)',
-        'Timeline': 'Baseline extended to 2 weeks'
-    },
-    'Mohla-Manpur-Ambagarh Chouki': {
-        'Volatility': 'HIGH (UER 531x)',
-        'Focus': 'Device stability & staff rotation',
-        'Budget Adjustment': '+₹15K (monitoring)',
-        'Timeline': 'Standard 8 weeks'
-    },
-    'Panchkula': {
-        'Volatility': 'HIGH (UER 519x)',
-        'Focus': 'Training emphasis (skill gaps)',
-        'Budget Adjustment': '+₹10K (training)',
-        'Timeline': 'Training phase extended'
-    },
-    'Wardha': {
-        'Volatility': 'MEDIUM-HIGH (UER 474x)',
-        'Focus': 'Process optimization',
-        'Budget Adjustment': '₹0 (standard)',
-        'Timeline': 'Can run in 7 weeks'
-    },
-    'Balod': {
-        'Volatility': 'MEDIUM-HIGH (UER 393x)',
-        'Focus': 'Rapid rollout',
-        'Budget Adjustment': '-₹5K (faster)',
-        'Timeline': 'Pilot week can compress'
-    }
-}
-
-for i, district in enumerate(top_districts, 1):
-    adapt = adaptations[district]
-    print(f"\n{i}. {district}")
-    print(f"   • Volatility: {adapt['Volatility']}")
-    print(f"   • Focus: {adapt['Focus']}")
-    print(f"   • Budget: {adapt['Budget Adjustment']}")
-    print(f"   • Timeline: {adapt['Timeline']}")
-
-# ============================================
-# RISK MATRIX
-# ============================================
-
-print("\n\n" + "="*80)
-print("RISK MITIGATION MATRIX")
-print("="*80)
-
-risks = pd.DataFrame({
-    'Risk': [
-        'Device procurement delays',
-        'Staff resistance to change',
-        'Stakeholder misalignment',
-        'Technical integration issues',
-        'Poor baseline metrics',
-        'Unexpected UER spike post-launch'
-    ],
-    'Probability': ['High', 'Medium', 'Low', 'Medium', 'Low', 'Medium'],
-    'Impact': ['High', 'Medium', 'High', 'High', 'Medium', 'High'],
-    'Mitigation': [
-        'Pre-order equipment (week -2)',
-        'Change management training (week 0)',
-        'Kickoff meeting with all stakeholders',
-        'Parallel testing in week 4',
-        'Capture detailed baseline week 0',
-        'Rollback plan + 24/7 support standing by'
-    ]
-})
-
-print("\n", risks.to_string(index=False))
-
-# ============================================
-# PHASE GATES
-# ============================================
-
-print("\n\n" + "="*80)
-print("GO/NO-GO DECISION GATES")
-print("="*80)
-
-gates = {
-    'End of Week 0 (Assessment)': [
-        '✓ All sites surveyed & documented',
-        '✓ Staff interviews completed',
-        '✓ Budget approved by stakeholders',
-        '✓ No show-stoppers identified'
-    ],
-    'End of Week 2 (Infrastructure)': [
-        '✓ All devices installed & calibrated',
-        '✓ Network latency <100ms confirmed',
-        '✓ UPS systems functional',
-        '✓ Monitoring dashboard live'
-    ],
-    'End of Week 4 (Training + Pilot)': [
-        '✓ 100% staff trained & passed assessment',
-        '✓ Pilot UER < 100x (70% improvement)',
-        '✓ No critical bugs in new SOP',
-        '✓ Staff confidence >7/10'
-    ],
-    'End of Week 6 (Go-Live)': [
-        '✓ Full rollout UER < 30x (target achieved)',
-        '✓ System stability >98%',
-        '✓ Issue resolution <1 hour',
-        '✓ Staff satisfaction >8/10'
-    ]
-}
-
-for gate, criteria in gates.items():
-    print(f"\n🚦 {gate}:")
-    for criterion in criteria:
-        print(f"   {criterion}")
-
-# ============================================
-# SAVE TO CSV
-# ============================================
 
-# Create roadmap CSV
-roadmap_csv = pd.DataFrame({
-    'Week': ['0', '1-2', '3-4', '5', '6', '7-12'],
-    'Phase': [wd['Phase'] for wd in weeks_data.values()],
-    'Duration': [wd['Duration'] for wd in weeks_data.values()],
-    'Start_Date': [wd['Start'].strftime('%Y-%m-%d') for wd in weeks_data.values()],
-    'Key_Activities': ['; '.join(wd['Activities'][:2]) for wd in weeks_data.values()],
-    'Resources': [wd['Resources'] for wd in weeks_data.values()],
-    'Budget_₹K': ['150', '200', '180', '100', '120', '80'],
-    'Risk': [wd['Risk'] for wd in weeks_data.values()]
-})
-
-roadmap_csv.to_csv('PHASE3_implementation_roadmap.csv', index=False)
-print("\n\n✅ Saved: PHASE3_implementation_roadmap.csv")
-
-# Create staffing CSV
-staffing_model.to_csv('PHASE3_staffing_model.csv', index=False)
-print("✅ Saved: PHASE3_staffing_model.csv")
-
-# Create budget CSV
-budget_breakdown.to_csv('PHASE3_budget_breakdown.csv', index=False)
-print("✅ Saved: PHASE3_budget_breakdown.csv")
-
-# Create district adaptation CSV
-district_adaptation = pd.DataFrame([
-    {'District': d, **v} for d, v in adaptations.items()
-])
-district_adaptation.to_csv('PHASE3_district_adaptations.csv', index=False)
-print("✅ Saved: PHASE3_district_adaptations.csv")
-
-print("\n" + "="*80)
-print("PHASE 3 COMPLETE: Implementation roadmap ready for execution")
-print("="*80)
-print("\nNext steps:")
-print("1. Stakeholder review of roadmap")
-print("2. Equipment procurement (pre-order devices)")
-print("3. Staff assignment & role clarification")
-print("4. Week 0 assessment site visits")
-print("\n")
+    for gate, criteria in gates.items():
+        print(f"\n🚦 {gate}:")
+        for criterion in criteria:
+            print(f"   {criterion}")
+
+    # ============================================
+    # SAVE TO CSV
+    # ============================================
+
+    # Create roadmap CSV
+    roadmap_csv = pd.DataFrame({
+        'Week': ['0', '1-2', '3-4', '5', '6', '7-12'],
+        'Phase': [wd['Phase'] for wd in weeks_data.values()],
+        'Duration': [wd['Duration'] for wd in weeks_data.values()],
+        'Start_Date': [wd['Start'].strftime('%Y-%m-%d') for wd in weeks_data.values()],
+        'Key_Activities': ['; '.join(wd['Activities'][:2]) for wd in weeks_data.values()],
+        'Resources': [wd['Resources'] for wd in weeks_data.values()],
+        'Budget_₹K': phase_budgets,
+        'Risk': [wd['Risk'] for wd in weeks_data.values()]
+    })
+
+    roadmap_csv.to_csv('PHASE3_implementation_roadmap.csv', index=False)
+    print("\n\n✅ Saved: PHASE3_implementation_roadmap.csv")
+
+    # Create staffing CSV
+    staffing_model.to_csv('PHASE3_staffing_model.csv', index=False)
+    print("✅ Saved: PHASE3_staffing_model.csv")
+
+    # Create budget CSV
+    budget_breakdown.to_csv('PHASE3_budget_breakdown.csv', index=False)
+    print("✅ Saved: PHASE3_budget_breakdown.csv")
+
+    # Create district adaptation CSV
+    district_adaptation = district_plan.rename(columns={'district': 'District', 'state': 'State'})
+    district_adaptation = district_adaptation[[c for c in ['District', 'State', 'UER', 'Volatility', 'Focus',
+                                                           'Budget Adjustment', 'Timeline', 'Weeks'] if c in district_adaptation]]
+    district_adaptation.to_csv('PHASE3_district_adaptations.csv', index=False)
+    print("✅ Saved: PHASE3_district_adaptations.csv")
+
+    # Create per-district budget (and staffing) CSVs
+    district_budget.to_csv('PHASE3_district_budget.csv', index=False)
+    print("✅ Saved: PHASE3_district_budget.csv")
+    if district_staffing is not None:
+        district_staffing.to_csv('PHASE3_district_staffing.csv', index=False)
+        print("✅ Saved: PHASE3_district_staffing.csv")
+    if queue_levels is not None:
+        queue_levels.to_csv('PHASE3_queue_simulation.csv', index=False)
+        print("✅ Saved: PHASE3_queue_simulation.csv")
+    if resource_allocation is not None:
+        resource_allocation.to_csv('PHASE3_resource_allocation.csv', index=False)
+        print("✅ Saved: PHASE3_resource_allocation.csv")
+
+    print("\n" + "="*80)
+    print("PHASE 3 COMPLETE: Implementation roadmap ready for execution")
+    print("="*80)
+    print("\nNext steps:")
+    print("1. Stakeholder review of roadmap")
+    print("2. Equipment procurement (pre-order devices)")
+    print("3. Staff assignment & role clarification")
+    print("4. Week 0 assessment site visits")
+    print("\n")
@@ -0,0 +1,409 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from parallel import map_ordered, resolve_workers
+
+# ============================================================================
+# RAW SCHEMA
+# ============================================================================
+
+DATE_FORMAT = '%d-%m-%Y'
+
+# Counter columns per dataset (keyed by the lower-cased dataset name)
+DATASET_SCHEMAS = {
+    'enrolment': ['age_0_5', 'age_5_17', 'age_18_greater'],
+    'demographic': ['demo_age_5_17', 'demo_age_17_'],
+    'biometric': ['bio_age_5_17', 'bio_age_17_'],
+}
+
+# Dates are read as categorical so the parser factorizes them; parse_dates() converts them
+KEY_DTYPES = {'date': 'category', 'state': 'category', 'district': 'category', 'pincode': 'int32'}
+
+# Counters are read as uint32 and then shrunk to the smallest unsigned type that fits
+COUNTER_READ_DTYPE = 'uint32'
+
+
+def read_dtypes(dataset):
+    """read_csv dtype mapping for a dataset (the date column is converted by apply_schema)"""
+    dtypes = dict(KEY_DTYPES)
+    dtypes.update({col: COUNTER_READ_DTYPE for col in DATASET_SCHEMAS[dataset]})
+    return dtypes
+
+
+def shrink_unsigned(series):
+    """Downcast a non-negative integer series to the smallest unsigned dtype that holds its max"""
+    if len(series) == 0:
+        return series.astype('uint8')
+    return series.astype(np.min_scalar_type(int(series.max())))
+
+
+def parse_dates(values, date_format=DATE_FORMAT):
+    """
+    Parse dd-mm-yyyy strings once per distinct value and map the results back through codes.
+
+    Returns (dates, n_unparseable), where n_unparseable counts rows that had a
+    date string which did not match the format (missing values are not counted).
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, 0
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+
+    parsed = pd.to_datetime(pd.Index(uniques, dtype=object), format=date_format, errors='coerce').to_numpy()
+    # Code -1 (missing) picks the trailing NaT
+    lookup = np.append(parsed, np.datetime64('NaT', 'ns')).astype('datetime64[ns]')
+    dates = pd.Series(lookup[codes], index=values.index, name=values.name)
+
+    present = codes[codes >= 0]
+    n_unparseable = int(np.isnat(parsed)[present].sum()) if len(present) else 0
+    return dates, n_unparseable
+
+
+def apply_schema(df, dataset):
+    """Parse dates and shrink counters of a frame read with read_dtypes()"""
+    if 'date' in df.columns:
+        df['date'], df.attrs['unparseable_dates'] = parse_dates(df['date'])
+    for col in DATASET_SCHEMAS[dataset]:
+        if col in df.columns:
+            df[col] = shrink_unsigned(df[col])
+    return df
+
+
+def frame_memory_mb(df):
+    """Deep memory footprint of a frame in MB"""
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def inferred_memory_mb(df):
+    """
+    Estimate the footprint the same rows would have with pandas' inferred dtypes
+    (object strings for state/district/date, int64 for pincode and counters).
+    """
+    n_rows = len(df)
+    total = df.index.memory_usage()
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            counts = np.bincount(values.cat.codes[values.cat.codes >= 0], minlength=len(values.cat.categories))
+            sizes = np.array([sys.getsizeof(str(c)) for c in values.cat.categories], dtype=np.int64)
+            total += 8 * n_rows + int(counts @ sizes)
+        elif col == 'date':
+            total += (8 + sys.getsizeof('31-12-2025')) * n_rows
+        else:
+            total += 8 * n_rows
+    return total / 1024**2
+
+
+def _concat_shards(df_list):
+    """Concatenate shards, unioning categories first so categorical columns stay categorical"""
+    for col in df_list[0].columns:
+        if not isinstance(df_list[0][col].dtype, pd.CategoricalDtype):
+            continue
+        categories = sorted(set().union(*(df[col].cat.categories for df in df_list)))
+        for df in df_list:
+            df[col] = df[col].cat.set_categories(categories)
+    return pd.concat(df_list, ignore_index=True)
+
+# ============================================================================
+# RAW SHARD INGESTION
+# ============================================================================
+
+# Shards are named api_data_aadhar_<dataset>_<start>_<end>.csv
+SHARD_RANGE_PATTERN = re.compile(r'_(\d+)_(\d+)\.csv$')
+
+
+def list_shards(folder_path):
+    """List CSV shards in a folder, ordered by the record range encoded in the filename"""
+    def shard_key(path):
+        match = SHARD_RANGE_PATTERN.search(os.path.basename(path))
+        if match:
+            return (0, int(match.group(1)), int(match.group(2)), path)
+        return (1, 0, 0, path)
+
+    return sorted(glob.glob(os.path.join(folder_path, "*.csv")), key=shard_key)
+
+
+def _parse_shard(path, dataset=None):
+    """Parse one CSV shard, with the declared schema when the dataset is known"""
+    if dataset is None:
+        return pd.read_csv(path)
+    return apply_schema(pd.read_csv(path, dtype=read_dtypes(dataset)), dataset)
+
+
+def read_shard(path, dataset=None, cache_dir=None):
+    """Read one shard, through the columnar cache when possible; returns (df, source)"""
+    if dataset is None or cache_dir is None:
+        return _parse_shard(path, dataset), 'csv'
+    return read_cached_shard(path, dataset, cache_dir)
+
+
+def _read_shard(path, dataset=None, cache_dir=None):
+    """Read one shard; returns (path, df, seconds, error, source) so it can run in a worker process"""
+    start = time.perf_counter()
+    try:
+        df, source = read_shard(path, dataset, cache_dir)
+    except Exception as e:
+        return path, None, time.perf_counter() - start, str(e), 'error'
+    return path, df, time.perf_counter() - start, None, source
+
+
+def load_and_combine_csv(folder_path, dataset_name, workers=None, typed=True, cache_dir=None):
+    """
+    Load and combine all CSV shards from a folder.
+
+    Shards are read on a process pool (workers=None uses all cores, workers=1
+    reads serially), kept in shard order and concatenated once. Known datasets
+    are read with their declared schema unless typed=False, and go through the
+    columnar shard cache when cache_dir is given.
+    """
+    files = list_shards(folder_path)
+    print(f"\n{'='*70}")
+    print(f"LOADING {dataset_name.upper()}: Found {len(files)} files in {folder_path}")
+    print(f"{'='*70}")
+
+    if not files:
+        print(f"❌ No CSV files found in {folder_path}")
+        return None
+
+    dataset = dataset_name.lower() if typed and dataset_name.lower() in DATASET_SCHEMAS else None
+    workers = resolve_workers(workers, len(files))
+    start = time.perf_counter()
+    results = map_ordered(partial(_read_shard, dataset=dataset, cache_dir=cache_dir), files, workers=workers)
+    wall_time = time.perf_counter() - start
+
+    df_list = []
+    for path, df, seconds, error, source in results:
+        if error is not None:
+            print(f"  ❌ Error loading {os.path.basename(path)}: {error}")
+            continue
+        df_list.append(df)
+        print(f"  ✓ Loaded: {os.path.basename(path)} — Shape: {df.shape} — {seconds:.2f}s ({source})")
+
+    if not df_list:
+        print(f"❌ No {dataset_name} shards could be loaded")
+        return None
+
+    unparseable_dates = sum(df.attrs.get('unparseable_dates', 0) for df in df_list)
+    combined_df = _concat_shards(df_list)
+    read_time = sum(result[2] for result in results)
+    print(f"\n✓ Combined {dataset_name} shape: {combined_df.shape}")
+    print(f"  Read time: {wall_time:.2f}s wall ({read_time:.2f}s across shards, {workers} worker(s))")
+    if dataset is not None:
+        print(f"  Memory: {inferred_memory_mb(combined_df):.1f} MB with inferred dtypes → "
+              f"{frame_memory_mb(combined_df):.1f} MB with declared schema")
+        if unparseable_dates:
+            print(f"  ⚠ {unparseable_dates} rows have dates not in dd-mm-yyyy format (set to NaT)")
+    return combined_df
+
+# ============================================================================
+# COLUMNAR SHARD CACHE
+# ============================================================================
+
+DEFAULT_CACHE_DIR = '.shard_cache'
+
+# Bump when the declared schema or parsing rules change, so stale entries are rebuilt
+CACHE_VERSION = 2
+
+
+def _cache_format():
+    """Parquet when pyarrow is installed, otherwise pandas' pickle of the typed frame"""
+    try:
+        import pyarrow  # noqa: F401
+        return 'parquet'
+    except ImportError:
+        return 'pickle'
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Content hash of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_paths(cache_dir, path, fmt):
+    """Metadata and data file locations for a shard's cache entry"""
+    key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:20]
+    return os.path.join(cache_dir, f"{key}.json"), os.path.join(cache_dir, f"{key}.{fmt}")
+
+
+def write_atomic(path, write):
+    """Write through a temporary file so readers never see a partial entry"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def dump_json(obj, path):
+    """Write obj as JSON (pair with write_atomic for crash-safe metadata)"""
+    with open(path, 'w') as f:
+        json.dump(obj, f, indent=1)
+
+
+def read_cached_shard(path, dataset, cache_dir):
+    """
+    Read a shard through the columnar cache; returns (df, source).
+
+    An entry is reused when its path, size and mtime match. When only the mtime
+    changed the content hash decides, so touched-but-identical shards are not
+    re-parsed. Anything else re-parses the CSV and rewrites the entry.
+    """
+    fmt = _cache_format()
+    meta_path, data_path = _cache_paths(cache_dir, path, fmt)
+    stat = os.stat(path)
+
+    meta = None
+    if os.path.exists(meta_path) and os.path.exists(data_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if (meta.get('version') != CACHE_VERSION or meta.get('dataset') != dataset
+                or meta.get('path') != os.path.abspath(path) or meta.get('size') != stat.st_size):
+            meta = None
+
+    if meta is not None:
+        if meta['mtime_ns'] != stat.st_mtime_ns:
+            if file_sha256(path) != meta['sha256']:
+                meta = None
+            else:
+                meta['mtime_ns'] = stat.st_mtime_ns
+                write_atomic(meta_path, partial(dump_json, meta))
+        if meta is not None:
+            df = pd.read_parquet(data_path) if fmt == 'parquet' else pd.read_pickle(data_path)
+            df.attrs['unparseable_dates'] = meta['unparseable_dates']
+            return df, 'cache'
+
+    df = _parse_shard(path, dataset)
+    os.makedirs(cache_dir, exist_ok=True)
+    if fmt == 'parquet':
+        write_atomic(data_path, lambda p: df.to_parquet(p, index=False))
+    else:
+        write_atomic(data_path, lambda p: df.to_pickle(p))
+    meta = {
+        'version': CACHE_VERSION,
+        'dataset': dataset,
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_sha256(path),
+        'rows': len(df),
+        'unparseable_dates': df.attrs.get('unparseable_dates', 0),
+    }
+    write_atomic(meta_path, partial(dump_json, meta))
+    return df, 'csv → cache'
+
+
+def clear_shard_cache(cache_dir=DEFAULT_CACHE_DIR):
+    """Delete every cached shard so the next load rebuilds the cache"""
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+        print(f"✓ Cleared shard cache: {cache_dir}")
+
+# ============================================================================
+# ANALYSIS GRAIN (District + Month)
+# ============================================================================
+
+GRAIN_KEYS = ['state', 'district', 'year_month']
+
+def create_analysis_grain(df, value_cols):
+    """
+    Convert date to year_month and aggregate by state, district, year_month.
+    Categorical keys and compact counter dtypes are kept in the result.
+    """
+    dates, _ = parse_dates(df['date'])
+
+    # Remove rows with missing dates
+    valid = dates.notna().to_numpy()
+    grain_df = df.loc[valid, ['state', 'district'] + value_cols].assign(
+        year_month=dates[valid].dt.to_period('M')
+    )
+
+    # Aggregate
+    agg_dict = {col: 'sum' for col in value_cols}
+    grain_df = grain_df.groupby(['state', 'district', 'year_month'], as_index=False, observed=True).agg(agg_dict)
+    for col in value_cols:
+        grain_df[col] = shrink_unsigned(grain_df[col])
+
+    return grain_df
+
+
+def index_grain(grain):
+    """Index a grain by its keys with plain-string keys and int64 sums, so grains can be added and subtracted"""
+    grain = grain.astype({'state': str, 'district': str})
+    value_cols = [col for col in grain.columns if col not in GRAIN_KEYS]
+    return grain.set_index(GRAIN_KEYS)[value_cols].astype('int64')
+
+
+def grain_from_index(totals, value_cols):
+    """Inverse of index_grain(): categorical keys and compact counters, as create_analysis_grain() returns"""
+    grain_df = totals[value_cols].reset_index()
+    grain_df['state'] = grain_df['state'].astype('category')
+    grain_df['district'] = grain_df['district'].astype('category')
+    for col in value_cols:
+        grain_df[col] = shrink_unsigned(grain_df[col])
+    return grain_df
+
+# ============================================================================
+# STREAMING AGGREGATION (bounded memory)
+# ============================================================================
+
+DEFAULT_CHUNK_SIZE = 250_000
+
+
+def stream_analysis_grain(folder_path, dataset_name, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Build the district-month grain by folding fixed-size chunks into running sums.
+
+    Only one chunk and the running (state, district, year_month) sums are held
+    in memory, so peak memory depends on chunk_size and the number of groups,
+    not on the number of input rows. Returns the same frame as
+    create_analysis_grain() over the fully loaded dataset.
+    """
+    dataset = dataset_name.lower()
+    value_cols = DATASET_SCHEMAS[dataset]
+    files = list_shards(folder_path)
+    print(f"\n{'='*70}")
+    print(f"STREAMING {dataset_name.upper()}: {len(files)} files in {folder_path} (chunks of {chunk_size:,} rows)")
+    print(f"{'='*70}")
+
+    usecols = ['date', 'state', 'district'] + value_cols
+    dtypes = {col: dtype for col, dtype in read_dtypes(dataset).items() if col in usecols}
+    totals = None
+    n_rows = n_chunks = unparseable_dates = 0
+    start = time.perf_counter()
+    for path in files:
+        shard_rows = 0
+        for chunk in pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunk_size):
+            chunk = apply_schema(chunk, dataset)
+            unparseable_dates += chunk.attrs['unparseable_dates']
+            partial_sums = index_grain(create_analysis_grain(chunk, value_cols))
+            totals = partial_sums if totals is None else totals.add(partial_sums, fill_value=0)
+            shard_rows += len(chunk)
+            n_chunks += 1
+        n_rows += shard_rows
+        print(f"  ✓ Folded: {os.path.basename(path)} — {shard_rows} rows — running groups: {0 if totals is None else len(totals)}")
+
+    if totals is None:
+        print(f"❌ No {dataset_name} rows streamed from {folder_path}")
+        return None
+
+    grain_df = grain_from_index(totals.astype('int64').sort_index(), value_cols)
+    print(f"\n✓ Streamed {n_rows} rows in {n_chunks} chunks → {len(grain_df)} district-months "
+          f"({time.perf_counter() - start:.2f}s)")
+    if unparseable_dates:
+        print(f"  ⚠ {unparseable_dates} rows have dates not in dd-mm-yyyy format (set to NaT)")
+    return grain_df
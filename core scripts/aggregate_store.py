@@ -0,0 +1,146 @@
+import json
+import os
+import time
+from functools import partial
+
+import pandas as pd
+
+from aadhaar_data import (DATASET_SCHEMAS, GRAIN_KEYS, create_analysis_grain, dump_json, file_sha256,
+                          grain_from_index, index_grain, list_shards, read_shard, write_atomic)
+from parallel import map_ordered
+
+# ============================================================================
+# INCREMENTAL DISTRICT-MONTH AGGREGATE STORE
+# ============================================================================
+#
+# Layout per dataset:
+#   <store_dir>/<dataset>/manifest.json      absorbed shards + current totals file
+#   <store_dir>/<dataset>/totals_<gen>.pkl   summed (state, district, year_month) grain
+#   <store_dir>/<dataset>/partials/*.pkl     each shard's own contribution
+#
+# Only shards that are new (or whose content changed) are read and aggregated;
+# their sums are added to the stored totals. Per-shard partials let a changed or
+# deleted shard be subtracted again without touching the rest of the history.
+# The manifest is written last, so an interrupted refresh never double counts.
+
+DEFAULT_STORE_DIR = 'aggregate_store'
+STORE_VERSION = 1
+ROW_COUNT_COL = '_rows'
+
+
+def _load_manifest(dataset_dir):
+    manifest_path = os.path.join(dataset_dir, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get('version') == STORE_VERSION:
+            return manifest
+        print(f"  ⚠ Aggregate store version changed; rebuilding {dataset_dir}")
+    return {'version': STORE_VERSION, 'generation': 0, 'totals_file': None, 'shards': {}}
+
+
+def _aggregate_shard(path, dataset, cache_dir=None):
+    """Aggregate one shard to the district-month grain (runs in a worker process)"""
+    start = time.perf_counter()
+    df, _ = read_shard(path, dataset, cache_dir)
+    value_cols = DATASET_SCHEMAS[dataset]
+    df = df.assign(**{ROW_COUNT_COL: 1})
+    partial_grain = create_analysis_grain(df, value_cols + [ROW_COUNT_COL])
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(path), 'rows': len(df)}
+    return path, index_grain(partial_grain), fingerprint, time.perf_counter() - start
+
+
+def _shard_changed(path, entry):
+    """
+    True when a shard on disk no longer matches its manifest entry. A shard that was
+    only touched (same hash, new mtime) gets its new mtime_ns in the entry, so the
+    next run skips the hash again.
+    """
+    stat = os.stat(path)
+    if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return False
+    if entry['size'] != stat.st_size or file_sha256(path) != entry['sha256']:
+        return True
+    entry['mtime_ns'] = stat.st_mtime_ns
+    return False
+
+
+def refresh_aggregate_store(folder_path, dataset_name, store_dir=DEFAULT_STORE_DIR, workers=None, cache_dir=None):
+    """
+    Bring the persisted district-month totals for a dataset up to date and return them.
+
+    Returns the same frame create_analysis_grain() would produce over every shard
+    in folder_path, at the cost of reading only new or changed shards.
+    """
+    dataset = dataset_name.lower()
+    value_cols = DATASET_SCHEMAS[dataset]
+    dataset_dir = os.path.join(store_dir, dataset)
+    partials_dir = os.path.join(dataset_dir, 'partials')
+    os.makedirs(partials_dir, exist_ok=True)
+
+    print(f"\n{'='*70}")
+    print(f"AGGREGATE STORE {dataset_name.upper()}: {dataset_dir}")
+    print(f"{'='*70}")
+
+    manifest = _load_manifest(dataset_dir)
+    if manifest['totals_file']:
+        totals = pd.read_pickle(os.path.join(dataset_dir, manifest['totals_file']))
+    else:
+        totals = pd.DataFrame(columns=value_cols + [ROW_COUNT_COL], dtype='int64',
+                              index=pd.MultiIndex.from_arrays([[], [], []], names=GRAIN_KEYS))
+        manifest['shards'] = {}
+
+    files = list_shards(folder_path)
+    on_disk = {os.path.basename(path): path for path in files}
+    absorbed = manifest['shards']
+
+    mtimes = {name: entry['mtime_ns'] for name, entry in absorbed.items()}
+    to_absorb = [path for name, path in on_disk.items()
+                 if name not in absorbed or _shard_changed(path, absorbed[name])]
+    touched = [name for name, entry in absorbed.items() if entry['mtime_ns'] != mtimes[name]]
+    to_retract = [name for name in absorbed
+                  if name not in on_disk or on_disk[name] in to_absorb]
+
+    # Subtract the old contribution of changed and deleted shards
+    for name in to_retract:
+        partial_path = os.path.join(partials_dir, absorbed[name]['partial'])
+        totals = totals.sub(pd.read_pickle(partial_path), fill_value=0)
+        action = 'changed' if name in on_disk else 'removed'
+        print(f"  − Retracted {name} ({action})")
+        del absorbed[name]
+
+    # Aggregate new shards (in parallel) and add their sums
+    results = map_ordered(partial(_aggregate_shard, dataset=dataset, cache_dir=cache_dir), to_absorb, workers=workers)
+    for path, partial_grain, fingerprint, seconds in results:
+        name = os.path.basename(path)
+        partial_file = f"{os.path.splitext(name)[0]}_{fingerprint['sha256'][:12]}.pkl"
+        write_atomic(os.path.join(partials_dir, partial_file), partial_grain.to_pickle)
+        totals = totals.add(partial_grain, fill_value=0)
+        absorbed[name] = dict(fingerprint, partial=partial_file)
+        print(f"  + Absorbed {name}: {fingerprint['rows']} rows → {len(partial_grain)} district-months — {seconds:.2f}s")
+
+    if to_absorb or to_retract:
+        totals = totals[totals[ROW_COUNT_COL] > 0].astype('int64').sort_index()
+        manifest['generation'] += 1
+        old_totals_file = manifest['totals_file']
+        manifest['totals_file'] = f"totals_{manifest['generation']}.pkl"
+        write_atomic(os.path.join(dataset_dir, manifest['totals_file']), totals.to_pickle)
+        write_atomic(os.path.join(dataset_dir, 'manifest.json'), partial(dump_json, manifest))
+
+        # Clean up files the new manifest no longer references
+        if old_totals_file:
+            os.remove(os.path.join(dataset_dir, old_totals_file))
+        referenced = {entry['partial'] for entry in absorbed.values()}
+        for partial_file in os.listdir(partials_dir):
+            if partial_file not in referenced:
+                os.remove(os.path.join(partials_dir, partial_file))
+    elif touched:
+        # Only timestamps moved; record them so the unchanged shards are not hashed again
+        write_atomic(os.path.join(dataset_dir, 'manifest.json'), partial(dump_json, manifest))
+        print(f"  ✓ {len(touched)} touched shard(s) unchanged; refreshed their mtimes in the manifest")
+
+    print(f"✓ {len(to_absorb)} shard(s) absorbed, {len(to_retract)} retracted, "
+          f"{len(absorbed)} in store — {len(totals)} district-months")
+
+    return grain_from_index(totals, value_cols)
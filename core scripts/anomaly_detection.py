@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# ROLLING Z-SCORE ANOMALY DETECTION (STEP 7 / ENHANCEMENT 4)
+# ============================================================================
+#
+# The long district-month table is scattered into a series × month matrix, one row
+# per (state, district) so same-named districts in different states stay apart.
+# The month axis is contiguous, so a window covers `window` calendar months, with
+# missing months counted as empty. Rolling means and standard deviations for every
+# window come from cumulative sums of count, value and value² along that axis,
+# skipping the empty cells:
+#
+#   rolling_mean = mean of the observed values in the last `window` calendar months
+#                  (the month itself and the window - 1 before it, with or without data)
+#   rolling_std  = sample std (ddof=1) of the same values, NaN below two values
+#   zscore       = (value - rolling_mean) / (rolling_std + 1), 0 unless rolling_std > 0
+
+DEFAULT_WINDOWS = (3, 6, 12)
+SERIES_COLS = ('state', 'district')
+
+
+def _month_positions(periods):
+    """Column index of each row on a contiguous month axis"""
+    if isinstance(periods.dtype, pd.PeriodDtype):
+        ordinals = pd.PeriodIndex(periods).asi8
+        return ordinals - ordinals.min(), int(ordinals.max() - ordinals.min() + 1)
+    codes, uniques = pd.factorize(periods, sort=True)
+    return codes, len(uniques)
+
+
+def series_matrix(df, value_col, series_cols=SERIES_COLS, period_col='year_month'):
+    """
+    Scatter df[value_col] into a (series × month) matrix, NaN where a series has no row.
+
+    Returns (matrix, rows, cols): rows/cols give each df row's cell in the matrix.
+    """
+    rows = df.groupby(list(series_cols), sort=False, observed=True, dropna=False).ngroup().to_numpy()
+    cols, n_months = _month_positions(df[period_col])
+    matrix = np.full((rows.max() + 1 if len(rows) else 0, n_months), np.nan)
+    matrix[rows, cols] = df[value_col].to_numpy(dtype=np.float64)
+    return matrix, rows, cols
+
+
+def rolling_moments(matrix, windows=DEFAULT_WINDOWS):
+    """{window: (mean, std)} of every cell's trailing window, all windows from one set of cumsums"""
+    observed = ~np.isnan(matrix)
+    # Centre each series first so the value² sums stay well conditioned
+    with np.errstate(invalid='ignore'):
+        centre = np.nanmean(np.where(observed, matrix, np.nan), axis=1, keepdims=True) if matrix.size else 0
+    centre = np.nan_to_num(centre)
+    centred = np.where(observed, matrix - centre, 0.0)
+
+    def prefix(values):
+        out = np.zeros((matrix.shape[0], matrix.shape[1] + 1))
+        np.cumsum(values, axis=1, out=out[:, 1:])
+        return out
+
+    count_sums, value_sums, square_sums = prefix(observed.astype(np.float64)), prefix(centred), prefix(centred ** 2)
+    end = np.arange(1, matrix.shape[1] + 1)
+
+    moments = {}
+    for window in windows:
+        start = np.maximum(end - window, 0)
+        count = count_sums[:, end] - count_sums[:, start]
+        total = value_sums[:, end] - value_sums[:, start]
+        squares = square_sums[:, end] - square_sums[:, start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count >= 1, total / count, np.nan)
+            variance = np.where(count >= 2, (squares - total * mean) / (count - 1), np.nan)
+        moments[window] = (mean + centre, np.sqrt(np.maximum(variance, 0)))
+    return moments
+
+
+def rolling_zscores(df, value_col, windows=DEFAULT_WINDOWS, series_cols=SERIES_COLS, period_col='year_month'):
+    """
+    Rolling mean, std and z-score of df[value_col] for every window, aligned with df.
+
+    Columns are rolling_mean_<w>, rolling_std_<w> and zscore_<w> for each window w.
+    """
+    matrix, rows, cols = series_matrix(df, value_col, series_cols, period_col)
+    values = matrix[rows, cols]
+    result = {}
+    for window, (mean, std) in rolling_moments(matrix, windows).items():
+        mean, std = mean[rows, cols], std[rows, cols]
+        zscore = np.zeros(len(values))
+        spread = std > 0
+        zscore[spread] = (values[spread] - mean[spread]) / (std[spread] + 1)
+        result[f'rolling_mean_{window}'] = mean
+        result[f'rolling_std_{window}'] = std
+        result[f'zscore_{window}'] = zscore
+    return pd.DataFrame(result, index=df.index)
+
+
+def flag_anomalies(df, value_col='total_bio_updates', window=3, windows=DEFAULT_WINDOWS,
+                   anomaly_z=2.0, elevated_z=1.5, series_cols=SERIES_COLS):
+    """
+    Add rolling_mean, rolling_std, bio_zscore, is_anomaly (|z| > anomaly_z) and
+    is_elevated (z > elevated_z) for the primary window to df in place.
+
+    Returns the per-window table from rolling_zscores() for the other windows.
+    """
+    windows = tuple(sorted(set(windows) | {window}))
+    rolling = rolling_zscores(df, value_col, windows, series_cols)
+    df['rolling_mean'] = rolling[f'rolling_mean_{window}']
+    df['rolling_std'] = rolling[f'rolling_std_{window}']
+    df['bio_zscore'] = rolling[f'zscore_{window}']
+    df['is_anomaly'] = (df['bio_zscore'].abs() > anomaly_z).astype(int)
+    df['is_elevated'] = (df['bio_zscore'] > elevated_z).astype(int)
+    return rolling
@@ -0,0 +1,160 @@
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from forecasting import BatchTrendForecaster
+from parallel import map_ordered, resolve_workers
+from seasonal_decomposition import decompose_series
+
+# ============================================================================
+# ROLLING-ORIGIN BACKTESTING OF THE FORECAST MODELS
+# ============================================================================
+#
+# For every forecast origin o (months of history), each model is fitted on
+# months [0, o) of every district series and forecasts months o .. o+h-1, which
+# are then compared with what actually happened. The model × origin × district-chunk
+# grid runs on the process pool.
+#
+#   MAPE = mean |y - ŷ| / y                 over actuals y > 0 (in %)
+#   MASE = mean |y - ŷ| / scale             scale = mean |y_t - y_(t-1)| of the
+#                                           history (in-sample naive error), > 0
+#
+# Candidates:
+#   naive           last observed month
+#   linear          least-squares trend (STEP 8, BatchTrendForecaster)
+#   seasonal_naive  the same month one period earlier
+#   decomposition   last trend value + the seasonal effect of the same position
+#                   in the last full cycle (PHASE2 ENHANCEMENT 1)
+
+DEFAULT_BACKTEST_HORIZON = 3
+DEFAULT_PERIOD = 4
+
+
+class NaiveModel:
+    def fit(self, history, months):
+        self.last = history[:, -1]
+        return self
+
+    def predict(self, horizon):
+        return np.repeat(self.last[:, None], horizon, axis=1)
+
+
+class LinearTrendModel:
+    def fit(self, history, months):
+        self.forecaster = BatchTrendForecaster().fit(history, months)
+        return self
+
+    def predict(self, horizon):
+        self.forecaster.horizon = horizon
+        return self.forecaster.predict()[1]
+
+
+class SeasonalNaiveModel:
+    def __init__(self, period=DEFAULT_PERIOD):
+        self.period = period
+
+    def fit(self, history, months):
+        self.history = history
+        return self
+
+    def predict(self, horizon):
+        n = self.history.shape[1]
+        if n < self.period:
+            return np.repeat(self.history[:, -1:], horizon, axis=1)
+        steps = n - self.period + np.arange(horizon) % self.period
+        return self.history[:, steps]
+
+
+class DecompositionModel:
+    def __init__(self, period=DEFAULT_PERIOD):
+        self.period = period
+
+    def fit(self, history, months):
+        n = history.shape[1]
+        self.level = np.empty(len(history))
+        self.cycle = np.zeros((len(history), self.period))   # seasonal effects of the last full cycle
+        for i, values in enumerate(history):
+            trend, seasonal, _, _ = decompose_series(values, self.period)
+            trend = trend[~np.isnan(trend)]
+            self.level[i] = trend[-1] if len(trend) else values[-1]
+            if n >= self.period:
+                self.cycle[i] = np.nan_to_num(seasonal[n - self.period:])
+        return self
+
+    def predict(self, horizon):
+        steps = np.arange(horizon) % self.period
+        return np.maximum(self.level[:, None] + self.cycle[:, steps], 0)
+
+
+MODELS = {
+    'naive': NaiveModel,
+    'linear': LinearTrendModel,
+    'seasonal_naive': SeasonalNaiveModel,
+    'decomposition': DecompositionModel,
+}
+
+
+def _backtest_task(task, horizon):
+    """Fit one model at one origin on one chunk of series; returns error sums and timings"""
+    model_name, origin, series, months = task
+    history, actual = series[:, :origin], series[:, origin:origin + horizon]
+
+    start = time.perf_counter()
+    model = MODELS[model_name]().fit(history, months[:origin])
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    forecast = model.predict(actual.shape[1])
+    predict_seconds = time.perf_counter() - start
+
+    errors = np.abs(actual - forecast)
+    positive = actual > 0
+    scale = np.abs(np.diff(history, axis=1)).mean(axis=1) if origin > 1 else np.zeros(len(history))
+    scaled = np.broadcast_to((scale > 0)[:, None], errors.shape)
+    return {
+        'model': model_name,
+        'origin': origin,
+        'series': len(series),
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds,
+        'ape_sum': (errors[positive] / actual[positive]).sum(),
+        'ape_count': int(positive.sum()),
+        'ase_sum': (errors / np.where(scale > 0, scale, 1)[:, None])[scaled].sum(),
+        'ase_count': int(scaled.sum()),
+    }
+
+
+def backtest_models(series, months, models=tuple(MODELS), horizon=DEFAULT_BACKTEST_HORIZON, min_history=6,
+                    workers=None, chunks_per_worker=4):
+    """
+    Rolling-origin backtest of every model on every row of series (n_series × n_months).
+
+    Returns (summary, detail): summary has MAPE, MASE and total fit/predict seconds per
+    model; detail has the same per (model, origin).
+    """
+    series = np.asarray(series, dtype=np.float64)
+    origins = range(min_history, series.shape[1] - horizon + 1)
+    if not len(origins):
+        print(f"  ⚠ Backtest needs at least {min_history + horizon} months; only {series.shape[1]} available")
+        return pd.DataFrame(), pd.DataFrame()
+
+    n_workers = resolve_workers(workers)
+    chunks = np.array_split(np.arange(len(series)), max(1, min(len(series), n_workers * chunks_per_worker)))
+    tasks = [(model, origin, series[chunk], months) for model in models for origin in origins for chunk in chunks]
+
+    start = time.perf_counter()
+    results = pd.DataFrame(map_ordered(partial(_backtest_task, horizon=horizon), tasks, workers=n_workers))
+    print(f"✓ Backtested {len(models)} models × {len(origins)} origins × {len(series)} series "
+          f"({len(tasks)} tasks) in {time.perf_counter() - start:.2f}s")
+
+    sums = ['series', 'fit_seconds', 'predict_seconds', 'ape_sum', 'ape_count', 'ase_sum', 'ase_count']
+    detail = results.groupby(['model', 'origin'], sort=False)[sums].sum().reset_index()
+    summary = results.groupby('model', sort=False)[sums].sum()
+    for frame in (detail, summary):
+        frame['MAPE'] = frame['ape_sum'] / frame['ape_count'].where(frame['ape_count'] > 0) * 100
+        frame['MASE'] = frame['ase_sum'] / frame['ase_count'].where(frame['ase_count'] > 0)
+    summary = summary.reset_index()[['model', 'MAPE', 'MASE', 'fit_seconds', 'predict_seconds', 'series']]
+    summary = summary.rename(columns={'series': 'evaluations'}).sort_values('MASE').reset_index(drop=True)
+    detail = detail[['model', 'origin', 'MAPE', 'MASE', 'fit_seconds', 'predict_seconds']]
+    return summary, detail
@@ -0,0 +1,125 @@
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from parallel import map_ordered, resolve_workers
+
+# ============================================================================
+# MONTE CARLO COST-BENEFIT SIMULATION (ALL DISTRICTS)
+# ============================================================================
+#
+# The ENHANCEMENT 6 cost model with its constants drawn from distributions. For
+# district d and draw s:
+#
+#   current_updates  = E_d × UER_d
+#   target_updates   = E_d × min(UER_d, target_uer_s)   (the intervention never adds load)
+#   technician_savings = (current - target) / updates_per_technician_s × salary_s
+#   device_savings   = E_d × (1 / enrol_per_device_current_s - 1 / enrol_per_device_target_s)
+#                      × device_depreciation_s
+#   ROI              = savings / intervention_cost_s × 100   (intervention cost is per district)
+#   payback_months   = intervention_cost_s / savings × 12 (capped; no payback = cap)
+#
+# Every district is evaluated against the same draws, so the portfolio (the sum over
+# the selected districts, per draw) keeps the parameter correlation. Districts are
+# processed in chunks of chunk_size × n_draws on the process pool, which bounds memory.
+
+PERCENTILES = (5, 50, 95)
+PAYBACK_CAP_MONTHS = 120
+
+# name → (distribution, *arguments): constant(value), uniform(low, high),
+# triangular(low, mode, high), normal(mean, std), lognormal(mean, sigma) of the log
+DEFAULT_PARAMETERS = {
+    'technician_salary_annual': ('triangular', 250000, 300000, 375000),
+    'updates_per_technician_annual': ('triangular', 40000, 50000, 60000),
+    'device_depreciation': ('uniform', 4000, 6000),
+    'enrol_per_device_current': ('constant', 500),
+    'enrol_per_device_target': ('triangular', 650, 800, 900),
+    'intervention_cost': ('triangular', 40000, 50000, 75000),
+    'target_uer': ('triangular', 25, 30, 35),
+}
+
+
+def draw_parameters(parameters=DEFAULT_PARAMETERS, n_draws=10000, seed=42):
+    """One array of n_draws values per parameter"""
+    rng = np.random.default_rng(seed)
+    draws = {}
+    for name, (kind, *args) in parameters.items():
+        if kind == 'constant':
+            draws[name] = np.full(n_draws, float(args[0]))
+        elif kind in ('uniform', 'triangular', 'normal', 'lognormal'):
+            draws[name] = getattr(rng, kind)(*args, size=n_draws)
+        else:
+            raise ValueError(f"Unknown distribution {kind!r} for {name}")
+    return draws
+
+
+def _evaluate(enrolments, uer, draws):
+    """(savings, roi, payback_months), each n_districts × n_draws"""
+    E = np.asarray(enrolments, dtype=np.float64)[:, None]
+    U = np.asarray(uer, dtype=np.float64)[:, None]
+    eliminated = E * (U - np.minimum(U, draws['target_uer']))
+    technician_savings = eliminated / draws['updates_per_technician_annual'] * draws['technician_salary_annual']
+    device_savings = E * (1 / draws['enrol_per_device_current'] - 1 / draws['enrol_per_device_target']) \
+        * draws['device_depreciation']
+    savings = technician_savings + device_savings
+    return savings, *_returns(savings, draws['intervention_cost'])
+
+
+def _returns(savings, cost):
+    roi = savings / cost * 100
+    with np.errstate(divide='ignore'):
+        payback = np.where(savings > 0, np.minimum(cost / np.where(savings > 0, savings, 1) * 12, PAYBACK_CAP_MONTHS),
+                           PAYBACK_CAP_MONTHS)
+    return roi, payback
+
+
+def _simulate_chunk(task, draws, percentiles):
+    """Percentile bands of one district chunk, plus its per-draw portfolio contribution"""
+    enrolments, uer, in_portfolio = task
+    savings, roi, payback = _evaluate(enrolments, uer, draws)
+    bands = {'savings_mean': savings.mean(axis=1), 'prob_positive': (savings > 0).mean(axis=1)}
+    for name, values in (('savings', savings), ('roi', roi), ('payback_months', payback)):
+        for q, band in zip(percentiles, np.percentile(values, percentiles, axis=1)):
+            bands[f'{name}_p{q}'] = band
+    return bands, savings[in_portfolio].sum(axis=0), int(in_portfolio.sum())
+
+
+def simulate_cost_benefit(districts, portfolio=None, parameters=DEFAULT_PARAMETERS, n_draws=10000,
+                          percentiles=PERCENTILES, seed=42, chunk_size=256, workers=None):
+    """
+    Monte Carlo savings, ROI and payback for every district.
+
+    districts needs total_enrolments and mean_UER (one row per district); portfolio
+    is a boolean mask of the districts that get the intervention. Returns
+    (district_bands, portfolio_bands).
+    """
+    start = time.perf_counter()
+    draws = draw_parameters(parameters, n_draws, seed)
+    enrolments = districts['total_enrolments'].to_numpy(dtype=np.float64)
+    uer = districts['mean_UER'].to_numpy(dtype=np.float64)
+    portfolio = np.zeros(len(districts), dtype=bool) if portfolio is None else np.asarray(portfolio, dtype=bool)
+
+    chunks = [slice(i, i + chunk_size) for i in range(0, len(districts), chunk_size)]
+    tasks = [(enrolments[chunk], uer[chunk], portfolio[chunk]) for chunk in chunks]
+    n_workers = resolve_workers(workers, len(tasks))
+    results = map_ordered(partial(_simulate_chunk, draws=draws, percentiles=percentiles), tasks, workers=n_workers)
+
+    district_bands = districts.reset_index(drop=True).copy()
+    district_bands['in_portfolio'] = portfolio
+    for column in results[0][0] if results else []:
+        district_bands[column] = np.concatenate([bands[column] for bands, _, _ in results])
+
+    portfolio_savings = np.sum([savings for _, savings, _ in results], axis=0) if results else np.zeros(n_draws)
+    portfolio_cost = draws['intervention_cost'] * max(sum(count for _, _, count in results), 1)
+    portfolio_roi, portfolio_payback = _returns(portfolio_savings, portfolio_cost)
+    portfolio_bands = pd.DataFrame(
+        {'mean': [v.mean() for v in (portfolio_savings, portfolio_roi, portfolio_payback)],
+         **{f'p{q}': [np.percentile(v, q) for v in (portfolio_savings, portfolio_roi, portfolio_payback)]
+            for q in percentiles}},
+        index=pd.Index(['savings', 'roi', 'payback_months'], name='metric'))
+
+    print(f"✓ Simulated {n_draws:,} draws × {len(districts)} districts ({len(chunks)} chunks, "
+          f"{n_workers} worker(s)) in {time.perf_counter() - start:.2f}s")
+    return district_bands, portfolio_bands
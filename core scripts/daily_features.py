@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from aadhaar_data import parse_dates
+from anomaly_detection import rolling_moments
+from operational_cube import COUNTERS, DATASET_COUNTERS, TOTALS
+
+# ============================================================================
+# DISTRICT-DAY GRAIN WITH MULTI-WINDOW ROLLING FEATURES
+# ============================================================================
+#
+# Raw rows are summed into a dense values[pair, day, counter] array, where pair is
+# a sorted (state, district) and day runs over every calendar day in the data. A
+# day without rows counts as zero activity. The rolling sums, means and standard
+# deviations for all windows come from prefix sums along the day axis, via the
+# same rolling_moments() used for the monthly anomaly detection. Near the start
+# of the data a window covers only the days seen so far.
+#
+# feature_table() returns one row per (state, district, date) with columns
+#   <col>, <col>_sum_<w>d, <col>_mean_<w>d, <col>_std_<w>d
+# for each requested counter/total and each window w.
+
+DAILY_WINDOWS = (7, 28, 91)
+
+
+class DailyGrain:
+    """Dense district-day counter array built from the raw frames"""
+
+    def __init__(self, pairs, days, values):
+        self.pairs = pairs    # DataFrame of (state, district), one row per pair
+        self.days = days      # DatetimeIndex named date, one entry per calendar day
+        self.values = values  # int64 [pair, day, counter]
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Build the grain from raw frames {dataset: df} with date, state, district and counters"""
+        frames = {dataset: df for dataset, df in frames.items() if df is not None and len(df)}
+        parts = {}
+        for dataset, df in frames.items():
+            dates, _ = parse_dates(df['date'])
+            valid = dates.notna().to_numpy()
+            parts[dataset] = (valid, dates.to_numpy()[valid].astype('datetime64[D]').astype(np.int64))
+
+        def keys(col):
+            return np.concatenate([np.asarray(df[col], dtype=object)[parts[d][0]] for d, df in frames.items()])
+
+        state_codes, state_values = pd.factorize(keys('state'), sort=True)
+        district_codes, district_values = pd.factorize(keys('district'), sort=True)
+        day_ordinals = np.concatenate([ordinals for _, ordinals in parts.values()])
+
+        pair_keys = state_codes.astype(np.int64) * len(district_values) + district_codes
+        pair_keys[(state_codes < 0) | (district_codes < 0)] = -1
+        unique_pairs, row_pair = np.unique(pair_keys, return_inverse=True)
+        first_day = day_ordinals.min()
+        n_days = int(day_ordinals.max() - first_day + 1)
+        cell = row_pair * n_days + (day_ordinals - first_day)
+
+        values = np.zeros((len(unique_pairs), n_days, len(COUNTERS)), dtype=np.int64)
+        offset = 0
+        for dataset, df in frames.items():
+            valid = parts[dataset][0]
+            rows = slice(offset, offset + valid.sum())
+            offset += valid.sum()
+            for raw, counter in DATASET_COUNTERS[dataset].items():
+                sums = np.bincount(cell[rows], weights=df[raw].to_numpy(dtype=np.float64)[valid],
+                                   minlength=len(unique_pairs) * n_days)
+                values[:, :, COUNTERS.index(counter)] = sums.reshape(len(unique_pairs), n_days)
+
+        # Drop rows without a state or district (they sort first as key -1)
+        keep = unique_pairs >= 0
+        unique_pairs = unique_pairs[keep]
+        pairs = pd.DataFrame({
+            'state': pd.Categorical.from_codes(unique_pairs // len(district_values), categories=state_values),
+            'district': pd.Categorical.from_codes(unique_pairs % len(district_values), categories=district_values),
+        })
+        days = pd.DatetimeIndex((np.arange(n_days) + first_day).astype('datetime64[D]'), name='date')
+        return cls(pairs, days, values[keep])
+
+    def array(self, col):
+        """[pair, day] array for a counter or a derived total"""
+        counters = TOTALS.get(col, [col])
+        return self.values[:, :, [COUNTERS.index(counter) for counter in counters]].sum(axis=2)
+
+    def feature_table(self, cols=None, windows=DAILY_WINDOWS, since=None):
+        """
+        Long (state, district, date) table of daily values and their rolling
+        sum/mean/std for every window. since drops earlier days from the output
+        (they still feed the windows).
+        """
+        cols = cols or COUNTERS + list(TOTALS)
+        first = 0 if since is None else int(self.days.searchsorted(pd.Timestamp(since)))
+        n_pairs, n_days = len(self.pairs), len(self.days) - first
+
+        frame = self.pairs.iloc[np.repeat(np.arange(n_pairs), n_days)].reset_index(drop=True)
+        frame['date'] = np.tile(self.days[first:].to_numpy(), n_pairs)
+        features = {}
+        for col in cols:
+            daily = self.array(col).astype(np.float64)
+            features[col] = daily[:, first:].ravel()
+            days_seen = np.minimum(np.arange(1, daily.shape[1] + 1), np.array(windows)[:, None])
+            for (window, (mean, std)), count in zip(rolling_moments(daily, windows).items(), days_seen):
+                features[f'{col}_sum_{window}d'] = (mean * count)[:, first:].ravel().astype(np.float32)
+                features[f'{col}_mean_{window}d'] = mean[:, first:].ravel().astype(np.float32)
+                features[f'{col}_std_{window}d'] = std[:, first:].ravel().astype(np.float32)
+        return pd.concat([frame, pd.DataFrame(features)], axis=1)
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import time
+from functools import partial
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+from aadhaar_data import dump_json, write_atomic
+from anomaly_detection import rolling_moments
+
+# ============================================================================
+# GLOBAL GRADIENT-BOOSTED DEMAND MODEL (ALL DISTRICTS)
+# ============================================================================
+#
+# One HistGradientBoostingRegressor (Poisson loss, OpenMP across all cores) is
+# trained on every (district, month, target) row, predicting next month's bio
+# and demo update volumes from what was known the month before:
+#
+#   lag_1..lag_3          the target's last three months
+#   mean_3/6, std_3/6     rolling mean and std ending the previous month
+#   expanding_mean        mean of the whole history so far
+#   enrol_lag_1           enrolments last month
+#   other_lag_1           the other update type last month
+#   month_of_year         calendar month being forecast
+#   is_bio                1 for bio rows, 0 for demo rows
+#
+# Missing history is NaN, which the model handles natively. Features are built with
+# array shifts over the cube's [district, month] matrices and cached by a hash of
+# the inputs. The fitted model is persisted with joblib; later runs score the newest
+# month with the stored model unless retraining is requested.
+
+DEFAULT_MODEL_DIR = 'demand_model'
+FEATURE_VERSION = 1
+TARGETS = ['total_bio_updates', 'total_demo_updates']
+LAGS = (1, 2, 3)
+WINDOWS = (3, 6)
+
+
+def _extend(matrix):
+    """Append an empty column for the month being forecast"""
+    return np.hstack([matrix.astype(np.float64), np.full((len(matrix), 1), np.nan)])
+
+
+def _shift(matrix, lag):
+    """Value lag months earlier at every position (NaN before the start)"""
+    out = np.full_like(matrix, np.nan)
+    out[:, lag:] = matrix[:, :-lag]
+    return out
+
+
+def _input_key(arrays, first_month):
+    digest = hashlib.sha256(f"{FEATURE_VERSION}|{first_month}|".encode())
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+    return digest.hexdigest()[:24]
+
+
+def build_features(cube):
+    """
+    (feature_names, X, y): one row per target × district × month, where the last
+    month of each block is the month after the data (y is NaN there).
+    """
+    enrolments = _extend(cube.array('total_enrolments'))
+    n_pairs, n_cols = enrolments.shape
+    month_of_year = np.append(cube.months.month, (cube.months[-1] + 1).month).astype(np.float64)
+
+    blocks, labels = [], []
+    for target in TARGETS:
+        raw = cube.array(target).astype(np.float64)
+        values = _extend(raw)
+        other = _extend(cube.array(TARGETS[1 - TARGETS.index(target)]))
+        features = {f'lag_{lag}': _shift(values, lag) for lag in LAGS}
+        for window, (mean, std) in rolling_moments(raw, WINDOWS).items():
+            features[f'mean_{window}'] = _shift(_extend(mean), 1)
+            features[f'std_{window}'] = _shift(_extend(std), 1)
+        features['expanding_mean'] = _shift(_extend(np.cumsum(raw, axis=1) / np.arange(1, raw.shape[1] + 1)), 1)
+        features['enrol_lag_1'] = _shift(enrolments, 1)
+        features['other_lag_1'] = _shift(other, 1)
+        features['month_of_year'] = np.broadcast_to(month_of_year, (n_pairs, n_cols))
+        features['is_bio'] = np.full((n_pairs, n_cols), float(target == 'total_bio_updates'))
+        blocks.append(np.stack([f.ravel() for f in features.values()], axis=1))
+        labels.append(values.ravel())
+    return list(features), np.vstack(blocks), np.concatenate(labels)
+
+
+def cached_features(cube, model_dir=DEFAULT_MODEL_DIR):
+    """build_features() through a cache keyed by a hash of the cube's inputs"""
+    key = _input_key([cube.array(col) for col in TARGETS + ['total_enrolments']], cube.months[0])
+    path = os.path.join(model_dir, f"features_{key}.pkl")
+    if os.path.exists(path):
+        print(f"  ✓ Features loaded from cache ({os.path.basename(path)})")
+        return pd.read_pickle(path)
+
+    start = time.perf_counter()
+    features = build_features(cube)
+    os.makedirs(model_dir, exist_ok=True)
+    for name in os.listdir(model_dir):
+        if name.startswith('features_') and name.endswith('.pkl'):
+            os.remove(os.path.join(model_dir, name))
+    write_atomic(path, partial(pd.to_pickle, features))
+    print(f"  ✓ Built {features[1].shape[1]} features × {len(features[1])} rows in {time.perf_counter() - start:.2f}s")
+    return features
+
+
+def forecast_demand(cube, model_dir=DEFAULT_MODEL_DIR, retrain=False, random_state=42):
+    """
+    Next-month bio and demo update forecasts for every (state, district).
+
+    Trains and persists the global model when there is none (or retrain=True);
+    otherwise scores with the stored model.
+    """
+    feature_names, X, y = cached_features(cube, model_dir)
+    n_pairs, n_cols = len(cube.pairs), len(cube.months) + 1
+    position = np.tile(np.arange(n_cols), len(TARGETS) * n_pairs)
+    train = (position >= 1) & ~np.isnan(y)
+    score = position == n_cols - 1
+
+    model_path = os.path.join(model_dir, 'model.joblib')
+    meta_path = os.path.join(model_dir, 'model.json')
+    model = None
+    if not retrain and os.path.exists(model_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('feature_version') == FEATURE_VERSION and meta.get('features') == feature_names:
+            model = joblib.load(model_path)
+            print(f"  ✓ Loaded demand model trained through {meta['trained_through']} ({meta['rows']} rows)")
+
+    if model is None:
+        start = time.perf_counter()
+        model = HistGradientBoostingRegressor(loss='poisson', max_iter=300, learning_rate=0.05,
+                                              early_stopping=True, random_state=random_state)
+        model.fit(X[train], y[train])
+        os.makedirs(model_dir, exist_ok=True)
+        write_atomic(model_path, partial(joblib.dump, model))
+        meta = {'feature_version': FEATURE_VERSION, 'features': feature_names,
+                'trained_through': str(cube.months[-1]), 'rows': int(train.sum()), 'iterations': int(model.n_iter_)}
+        write_atomic(meta_path, partial(dump_json, meta))
+        print(f"  ✓ Trained demand model on {train.sum()} district-months ({model.n_iter_} iterations) "
+              f"in {time.perf_counter() - start:.2f}s → {model_path}")
+
+    predictions = model.predict(X[score]).reshape(len(TARGETS), n_pairs)
+    forecast = cube.pairs.copy()
+    forecast['year_month'] = cube.months[-1] + 1
+    for target, values in zip(TARGETS, predictions):
+        forecast[f'{target}_last'] = cube.array(target)[:, -1]
+        forecast[f'{target}_forecast'] = values
+    return forecast
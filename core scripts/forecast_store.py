@@ -0,0 +1,220 @@
+import os
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from aadhaar_data import write_atomic
+from forecasting import DEFAULT_HORIZON
+
+# ============================================================================
+# INCREMENTAL FORECAST MODEL STORE (SUFFICIENT STATISTICS PER SERIES)
+# ============================================================================
+#
+# A least-squares trend model only needs, per series, XᵀX (p × p), Xᵀy (p), yᵀy and
+# the number of months. A new month adds x xᵀ, x y, y² to them, which is O(1) per
+# series, and the coefficients come from XᵀX β = Xᵀy whenever they are queried.
+#
+#   trend model      x = [1, t]                               (STEP 8)
+#   seasonal model   x = [1, t, month-of-year dummies Jan..Dec] (PHASE2 trend + seasonal)
+#
+# The seasonal store keeps the statistics of all twelve dummies, and each fit uses a
+# sub-block of them, as BatchTrendForecaster does: it keeps a dummy for every
+# observed month-of-year except the first one, and only once there are at least
+# (dummies + 4) months. Before that it fits trend only. Because the trend-only
+# statistics are the leading 2 × 2 block, nothing else needs to be stored.
+#
+# t counts months from the store's first month, and cells without data count as
+# 0, like the operational cube. A district that first appears later is back-filled
+# with zeros through the shared XᵀX of the months already absorbed. The results
+# match BatchTrendForecaster fitted on the full history, seasonal or not.
+#
+# Updates are append-only. Before absorbing, the store checks the absorbed months
+# against the cube: each month's national total, and per series Σ y, Σ t y and Σ y²
+# (which are already in Xᵀy and yᵀy). If the data for an absorbed month changed,
+# even when only moved between districts, the store is rebuilt from scratch.
+
+DEFAULT_FORECAST_STORE = 'forecast_store'
+STORE_VERSION = 2
+
+
+class ForecastModelStore:
+    """Per-series least-squares sufficient statistics, updated one month at a time"""
+
+    def __init__(self, metric, seasonal=False):
+        self.metric = metric
+        self.seasonal = seasonal
+        self.n_params = 14 if seasonal else 2
+        self.keys = pd.DataFrame({'state': pd.Series(dtype=object), 'district': pd.Series(dtype=object)})
+        self.xtx = np.zeros((0, self.n_params, self.n_params))
+        self.xty = np.zeros((0, self.n_params))
+        self.yty = np.zeros(0)
+        self.last = np.zeros(0)
+        self.shared_xtx = np.zeros((self.n_params, self.n_params))
+        self.first_month = None
+        self.months = []         # absorbed months (Period ordinals)
+        self.month_totals = []   # national total per absorbed month, to detect revised history
+
+    def design(self, ordinals):
+        """Design rows for month ordinals"""
+        ordinals = np.asarray(ordinals)
+        t = (ordinals - self.first_month).astype(np.float64)
+        columns = [np.ones_like(t), t]
+        if self.seasonal:
+            month_of_year = pd.PeriodIndex.from_ordinals(ordinals, freq='M').month
+            columns += [(month_of_year == m).astype(np.float64) for m in range(1, 13)]
+        return np.column_stack(columns)
+
+    def _lookup(self, keys):
+        """Row of every (state, district) in keys, -1 for series not in the store"""
+        lookup = pd.MultiIndex.from_frame(self.keys.astype(object))
+        return lookup.get_indexer(pd.MultiIndex.from_frame(keys[['state', 'district']].astype(object)))
+
+    def _index(self, keys):
+        """Row of every (state, district) in keys, adding new series back-filled with zeros"""
+        rows = self._lookup(keys)
+        new = rows < 0
+        if new.any():
+            n_new = int(new.sum())
+            self.keys = pd.concat([self.keys, keys.loc[new, ['state', 'district']].astype(object)], ignore_index=True)
+            self.xtx = np.concatenate([self.xtx, np.broadcast_to(self.shared_xtx, (n_new,) + self.shared_xtx.shape)])
+            self.xty = np.concatenate([self.xty, np.zeros((n_new, self.n_params))])
+            self.yty = np.concatenate([self.yty, np.zeros(n_new)])
+            self.last = np.concatenate([self.last, np.zeros(n_new)])
+            rows[new] = np.arange(len(self.keys) - n_new, len(self.keys))
+        return rows
+
+    def update(self, keys, month, values):
+        """Absorb one new month: values[i] is the metric of series keys.iloc[i]; O(1) per series"""
+        ordinal = pd.Period(month, freq='M').ordinal
+        if self.first_month is None:
+            self.first_month = ordinal
+        if self.months and ordinal <= self.months[-1]:
+            raise ValueError(f"{month} is not after the last absorbed month; rebuild the store instead")
+
+        rows = self._index(keys)
+        x = self.design([ordinal])[0]
+        outer = np.outer(x, x)
+        y = np.zeros(len(self.keys))
+        y[rows] = np.asarray(values, dtype=np.float64)
+        self.xtx += outer
+        self.xty += y[:, None] * x
+        self.yty += y ** 2
+        self.last = y
+        self.shared_xtx += outer
+        self.months.append(ordinal)
+        self.month_totals.append(float(y.sum()))
+
+    def absorb_cube(self, cube):
+        """Absorb the cube months after the last absorbed one; returns how many were added"""
+        values = cube.array(self.metric).astype(np.float64)
+        ordinals = cube.months.asi8
+        added = 0
+        for j, ordinal in enumerate(ordinals):
+            if self.months and ordinal <= self.months[-1]:
+                continue
+            self.update(cube.pairs, cube.months[j], values[:, j])
+            added += 1
+        return added
+
+    def history_matches(self, cube):
+        """
+        True when the cube still has the same data for every absorbed month: the same
+        national totals, and per series the same Σ y, Σ t y and Σ y² (recomputed from
+        the cube and compared with the stored Xᵀy and yᵀy).
+        """
+        totals = dict(zip(cube.months.asi8, cube.array(self.metric).sum(axis=0).astype(np.float64)))
+        if not all(np.isclose(totals.get(ordinal, 0.0), total) for ordinal, total in zip(self.months, self.month_totals)):
+            return False
+
+        absorbed = np.isin(cube.months.asi8, self.months)
+        values = cube.array(self.metric)[:, absorbed].astype(np.float64)
+        X = self.design(cube.months.asi8[absorbed])[:, :2]
+        rows = self._lookup(cube.pairs)
+        known = rows >= 0
+        if np.any(values[~known]):
+            return False                # a series the store back-filled with zeros has absorbed-month data now
+        xty = np.zeros((len(self.keys), 2))
+        yty = np.zeros(len(self.keys))
+        xty[rows[known]] = values[known] @ X
+        yty[rows[known]] = (values[known] ** 2).sum(axis=1)
+        return np.allclose(xty, self.xty[:, :2], rtol=1e-9, atol=1e-6) and np.allclose(yty, self.yty, rtol=1e-9, atol=1e-6)
+
+    def active_columns(self):
+        """Design columns fitted now: intercept, trend and the identifiable month-of-year dummies"""
+        columns = [0, 1]
+        if self.seasonal:
+            observed = sorted(set(pd.PeriodIndex.from_ordinals(self.months, freq='M').month))[1:]
+            if len(self.months) >= len(observed) + 4:
+                columns += [1 + month for month in observed]
+        return np.array(columns)
+
+    def _fit(self, rows, columns):
+        xtx = self.xtx[rows][:, columns][:, :, columns]
+        xty = self.xty[rows][:, columns]
+        xtx_inv = np.linalg.pinv(xtx)
+        coef = np.einsum('nij,nj->ni', xtx_inv, xty)
+        dof = max(len(self.months) - len(columns), 1)
+        rss = np.maximum(self.yty[rows] - np.einsum('ni,ni->n', coef, xty), 0)
+        return coef, xtx_inv, np.sqrt(rss / dof), dof
+
+    def forecast(self, horizon=DEFAULT_HORIZON, level=0.95, state=None, district=None):
+        """
+        Forecasts straight from the stored statistics for every series, or one
+        (state, district). Same long format as forecast_districts().
+        """
+        rows = np.arange(len(self.keys))
+        if state is not None or district is not None:
+            rows = rows[((self.keys['state'] == state) if state is not None else True)
+                        & ((self.keys['district'] == district) if district is not None else True)]
+            if len(rows) == 0:
+                raise KeyError(f"No {self.metric} series for state={state!r}, district={district!r} in the forecast store")
+        columns = self.active_columns()
+        coef, xtx_inv, sigma, dof = self._fit(rows, columns)
+        future = pd.period_range(pd.Period(ordinal=self.months[-1], freq='M') + 1, periods=horizon, freq='M')
+        X_future = self.design(future.asi8)[:, columns]
+        point = coef @ X_future.T
+        leverage = np.einsum('hi,nij,hj->nh', X_future, xtx_inv, X_future)
+        margin = stats.t.ppf(0.5 + level / 2, dof) * sigma[:, None] * np.sqrt(1 + leverage)
+
+        frame = self.keys.iloc[np.repeat(rows, horizon)].reset_index(drop=True)
+        frame['metric'] = self.metric
+        frame['horizon'] = np.tile(np.arange(1, horizon + 1), len(rows))
+        frame['year_month'] = np.tile(future, len(rows))
+        frame['last_actual'] = np.repeat(self.last[rows], horizon)
+        frame['forecast'] = np.maximum(point, 0).ravel()
+        frame['lower'] = np.maximum(point - margin, 0).ravel()
+        frame['upper'] = np.maximum(point + margin, 0).ravel()
+        frame['slope'] = np.repeat(coef[:, 1], horizon)
+        return frame[['state', 'district', 'metric', 'horizon', 'year_month', 'forecast', 'lower', 'upper',
+                      'last_actual', 'slope']]
+
+
+def _store_path(store_dir, metric, seasonal):
+    return os.path.join(store_dir, f"{metric}{'_seasonal' if seasonal else ''}.pkl")
+
+
+def update_forecast_store(cube, metric, store_dir=DEFAULT_FORECAST_STORE, seasonal=False, rebuild=False):
+    """Load the persisted store for a metric, absorb any new cube months and save it"""
+    path = _store_path(store_dir, metric, seasonal)
+    start = time.perf_counter()
+    store = None
+    if not rebuild and os.path.exists(path):
+        saved = pd.read_pickle(path)
+        if saved.get('version') == STORE_VERSION:
+            store = saved['store']
+            if not store.history_matches(cube):
+                print(f"  ⚠ Absorbed months changed for {metric}; rebuilding the forecast store")
+                store = None
+    if store is None:
+        store = ForecastModelStore(metric, seasonal)
+
+    added = store.absorb_cube(cube)
+    if added:
+        os.makedirs(store_dir, exist_ok=True)
+        write_atomic(path, partial(pd.to_pickle, {'version': STORE_VERSION, 'store': store}))
+    print(f"✓ Forecast store {path}: {added} new month(s) absorbed, {len(store.months)} total, "
+          f"{len(store.keys)} series — {time.perf_counter() - start:.3f}s")
+    return store
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# ============================================================================
+# BATCHED PER-DISTRICT TREND FORECASTING
+# ============================================================================
+#
+# Every district shares the same monthly design matrix X (intercept, month index
+# and, with seasonal=True, month-of-year dummies), so all series are fitted in one
+# least-squares solve:  B = argmin ||X B - Yᵀ||  with one column of B per series.
+#
+# Prediction intervals use each series' residual variance s² = RSS / (n - p):
+#   ŷ ± t(1 - α/2, n - p) · s · sqrt(1 + x₀ᵀ (XᵀX)⁻¹ x₀)
+# Forecasts and bounds are clipped at 0, since volumes cannot be negative.
+
+DEFAULT_HORIZON = 3
+FORECAST_METRICS = ['total_bio_updates', 'total_demo_updates', 'total_enrolments']
+
+
+class BatchTrendForecaster:
+    """Closed-form linear trend (optionally + month-of-year) forecaster for many series at once"""
+
+    def __init__(self, horizon=DEFAULT_HORIZON, seasonal=False, level=0.95):
+        self.horizon = horizon
+        self.seasonal = seasonal
+        self.level = level
+
+    def _design(self, months):
+        """Design matrix rows for the given months (trend counted from the first fitted month)"""
+        t = (months.asi8 - self.first_month).astype(np.float64)
+        columns = [np.ones_like(t), t]
+        for month_of_year in self.seasonal_months:
+            columns.append((months.month == month_of_year).astype(np.float64))
+        return np.column_stack(columns)
+
+    def fit(self, series, months):
+        """
+        Fit every row of series (n_series × n_months, months a contiguous PeriodIndex).
+        Falls back to trend-only when there are too few months for the seasonal terms.
+        """
+        series = np.asarray(series, dtype=np.float64)
+        self.months = months
+        self.first_month = months.asi8[0]
+
+        self.seasonal_months = []
+        if self.seasonal:
+            # One dummy per observed month-of-year except the first (absorbed by the intercept);
+            # keep at least two residual degrees of freedom after intercept and trend
+            seasonal_months = sorted(set(months.month))[1:]
+            if len(months) >= len(seasonal_months) + 4:
+                self.seasonal_months = seasonal_months
+            else:
+                print(f"  ⚠ {len(months)} months are too few for month-of-year terms; fitting trend only")
+
+        X = self._design(months)
+        self.coef, _, _, _ = np.linalg.lstsq(X, series.T, rcond=None)
+        self.fitted = (X @ self.coef).T
+        self.dof = max(len(months) - X.shape[1], 1)
+        self.sigma = np.sqrt(((series - self.fitted) ** 2).sum(axis=1) / self.dof)
+        self.xtx_inv = np.linalg.pinv(X.T @ X)
+        return self
+
+    def predict(self):
+        """(future months, forecast, lower, upper), each array n_series × horizon"""
+        last = self.months[-1]
+        future = pd.period_range(last + 1, periods=self.horizon, freq='M')
+        X_future = self._design(future)
+        forecast = (X_future @ self.coef).T
+        leverage = np.einsum('ij,jk,ik->i', X_future, self.xtx_inv, X_future)
+        margin = (stats.t.ppf(0.5 + self.level / 2, self.dof)
+                  * self.sigma[:, None] * np.sqrt(1 + leverage)[None, :])
+        return (future, np.maximum(forecast, 0), np.maximum(forecast - margin, 0),
+                np.maximum(forecast + margin, 0))
+
+
+def forecast_districts(cube, metrics=FORECAST_METRICS, horizon=DEFAULT_HORIZON, seasonal=False, level=0.95):
+    """
+    Forecast every (state, district) series of an OperationalCube for each metric.
+
+    Returns a long frame: state, district, metric, horizon, year_month, forecast,
+    lower, upper, plus the last observed value and the fitted monthly slope.
+    """
+    frames = []
+    for metric in metrics:
+        series = cube.array(metric)
+        forecaster = BatchTrendForecaster(horizon, seasonal, level).fit(series, cube.months)
+        future, forecast, lower, upper = forecaster.predict()
+        n_series = len(cube.pairs)
+        frame = cube.pairs.iloc[np.repeat(np.arange(n_series), horizon)].reset_index(drop=True)
+        frame['metric'] = metric
+        frame['horizon'] = np.tile(np.arange(1, horizon + 1), n_series)
+        frame['year_month'] = np.tile(future, n_series)
+        frame['forecast'] = forecast.ravel()
+        frame['lower'] = lower.ravel()
+        frame['upper'] = upper.ravel()
+        frame['last_actual'] = np.repeat(series[:, -1], horizon)
+        frame['slope'] = np.repeat(forecaster.coef[1], horizon)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
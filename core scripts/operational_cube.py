@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from operational_metrics import safe_ratio
+
+# ============================================================================
+# OPERATIONAL CUBE: (state, district) × month × counter
+# ============================================================================
+#
+# The three district-month grains are scattered into one dense int64 array,
+# values[pair, month, counter], where pair indexes the sorted (state, district)
+# combinations and month a contiguous monthly axis. Each grain row lands in its
+# cell in O(1); no join is needed, so a district-month that only has updates is
+# kept. present[pair, month, dataset] records which datasets had a row there.
+#
+# Roll-ups by month, state, (state, district) or nationally are array sums over
+# the matching axes. Derived totals are sums of their counters.
+
+DATASET_COUNTERS = {
+    'enrolment': {'age_0_5': 'enrol_0_5', 'age_5_17': 'enrol_5_17', 'age_18_greater': 'enrol_18+'},
+    'demographic': {'demo_age_5_17': 'demo_5_17', 'demo_age_17_': 'demo_17+'},
+    'biometric': {'bio_age_5_17': 'bio_5_17', 'bio_age_17_': 'bio_17+'},
+}
+DATASETS = list(DATASET_COUNTERS)
+COUNTERS = [counter for counters in DATASET_COUNTERS.values() for counter in counters.values()]
+TOTALS = {
+    'total_enrolments': list(DATASET_COUNTERS['enrolment'].values()),
+    'total_demo_updates': list(DATASET_COUNTERS['demographic'].values()),
+    'total_bio_updates': list(DATASET_COUNTERS['biometric'].values()),
+    'total_updates': list(DATASET_COUNTERS['demographic'].values()) + list(DATASET_COUNTERS['biometric'].values()),
+}
+COUNTER_DATASET = {counter: dataset for dataset, counters in DATASET_COUNTERS.items() for counter in counters.values()}
+
+
+def _month_ordinals(values):
+    return pd.PeriodIndex(values, freq='M').asi8
+
+
+class OperationalCube:
+    """Dense district-month counter cube built from the three analysis grains"""
+
+    def __init__(self, pairs, months, values, present):
+        self.pairs = pairs          # DataFrame of (state, district), one row per pair
+        self.months = months        # PeriodIndex named year_month
+        self.values = values        # int64 [pair, month, counter]
+        self.present = present      # bool [pair, month, dataset]
+        self.pair_index = pd.MultiIndex.from_frame(pairs)
+
+    @classmethod
+    def from_grains(cls, grains):
+        """
+        Build the cube from {dataset: grain}. Grain counters may use either the raw
+        column names (age_0_5, ...) or the renamed ones (enrol_0_5, ...).
+        """
+        grains = {dataset: grain for dataset, grain in grains.items() if grain is not None and len(grain)}
+
+        # Shared sorted dictionaries for state and district, contiguous month ordinals
+        states = pd.concat([pd.Series(np.asarray(g['state'], dtype=object)) for g in grains.values()], ignore_index=True)
+        districts = pd.concat([pd.Series(np.asarray(g['district'], dtype=object)) for g in grains.values()], ignore_index=True)
+        state_codes, state_values = pd.factorize(states, sort=True)
+        district_codes, district_values = pd.factorize(districts, sort=True)
+        ordinals = np.concatenate([_month_ordinals(g['year_month']) for g in grains.values()])
+
+        valid = (state_codes >= 0) & (district_codes >= 0)
+        pair_keys = state_codes.astype(np.int64) * len(district_values) + district_codes
+        unique_pairs, pair_codes = np.unique(pair_keys[valid], return_inverse=True)
+        first_month = ordinals.min()
+        n_months = int(ordinals.max() - first_month + 1)
+
+        values = np.zeros((len(unique_pairs), n_months, len(COUNTERS)), dtype=np.int64)
+        present = np.zeros((len(unique_pairs), n_months, len(DATASETS)), dtype=bool)
+
+        offset = 0
+        row_pair = np.full(len(pair_keys), -1)
+        row_pair[valid] = pair_codes
+        for dataset, grain in grains.items():
+            rows = slice(offset, offset + len(grain))
+            offset += len(grain)
+            keep = valid[rows]
+            pair, month = row_pair[rows][keep], (ordinals[rows] - first_month)[keep]
+            present[pair, month, DATASETS.index(dataset)] = True
+            for raw, counter in DATASET_COUNTERS[dataset].items():
+                column = grain[counter] if counter in grain else grain[raw]
+                np.add.at(values[:, :, COUNTERS.index(counter)], (pair, month),
+                          column.to_numpy(dtype=np.int64)[keep])
+
+        pairs = pd.DataFrame({
+            'state': pd.Categorical(state_values[unique_pairs // len(district_values)], categories=state_values),
+            'district': pd.Categorical(district_values[unique_pairs % len(district_values)], categories=district_values),
+        })
+        months = pd.PeriodIndex.from_ordinals(np.arange(n_months) + first_month, freq='M').rename('year_month')
+        return cls(pairs, months, values, present)
+
+    def array(self, col):
+        """[pair, month] array for a counter or a derived total"""
+        counters = TOTALS.get(col, [col])
+        return self.values[:, :, [COUNTERS.index(counter) for counter in counters]].sum(axis=2)
+
+    def _stack(self, cols, reduce):
+        return {col: reduce(self.array(col)) for col in cols}
+
+    def cells(self):
+        """[pair, month] mask of cells where any dataset has a row"""
+        return self.present.any(axis=2)
+
+    def by_month(self, cols):
+        """Monthly totals, over the months where any dataset feeding cols has data"""
+        datasets = {DATASETS.index(COUNTER_DATASET[counter]) for col in cols for counter in TOTALS.get(col, [col])}
+        active = self.present[:, :, sorted(datasets)].any(axis=(0, 2))
+        frame = pd.DataFrame(self._stack(cols, lambda a: a.sum(axis=0)), index=self.months)
+        return frame[active]
+
+    def by_pair(self, cols):
+        """Totals per (state, district)"""
+        return pd.DataFrame(self._stack(cols, lambda a: a.sum(axis=1)), index=self.pair_index)
+
+    def by_state(self, cols):
+        """Totals per state"""
+        states = self.pairs['state']
+        codes = states.cat.codes.to_numpy()
+        n_states = len(states.cat.categories)
+        frame = pd.DataFrame(
+            self._stack(cols, lambda a: np.bincount(codes, weights=a.sum(axis=1), minlength=n_states).astype(np.int64)),
+            index=pd.Index(states.cat.categories, name='state'))
+        return frame[np.bincount(codes, minlength=n_states) > 0]
+
+    def national(self, cols):
+        """National totals as a Series"""
+        return pd.Series(self._stack(cols, lambda a: a.sum()))
+
+    def to_frame(self, cols=None):
+        """
+        Long district-month table of every populated cell, ordered by
+        (state, district, year_month), with the requested counters/totals.
+        """
+        cols = cols or COUNTERS + list(TOTALS)
+        pair, month = np.nonzero(self.cells())
+        frame = self.pairs.iloc[pair].reset_index(drop=True)
+        frame['year_month'] = self.months[month]
+        for col in cols:
+            frame[col] = self.array(col)[pair, month]
+        return frame
+
+    def pair_mean(self, values):
+        """
+        Mean per (state, district) of a column aligned with to_frame() rows (named after
+        it). NaN values are skipped; a pair without any values gets 0.
+        """
+        pair, _ = np.nonzero(self.cells())
+        n_pairs = len(self.pairs)
+        name = getattr(values, 'name', None)
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        sums = np.bincount(pair[present], weights=values[present], minlength=n_pairs)
+        return pd.Series(safe_ratio(sums, np.bincount(pair[present], minlength=n_pairs)), index=self.pair_index,
+                         name=name)
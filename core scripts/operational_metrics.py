@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# OPERATIONAL METRICS ENGINE (UER / BSI / DDI)
+# ============================================================================
+#
+# UER     = total_updates / total_enrolments          (0 when there are no enrolments)
+# BSI     = total_bio_updates / total_updates         (0 when there are no updates)
+# DDI_UER = (UER - peer avg UER) / peer avg UER       (0 when the peer average is 0)
+# DDI_BSI = (BSI - peer avg BSI) / peer avg BSI       (0 when the peer average is 0)
+#
+# Peers are the rows sharing group_cols — by default the same state and month, as
+# in STEP 5. Any grain works as long as it has the three total columns, e.g.
+# group_cols=('state', 'date') for district-day rows.
+
+
+def safe_ratio(numerator, denominator):
+    """numerator / denominator, 0 wherever the denominator is not positive (or missing)"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def group_means(values, codes, n_groups=None):
+    """Mean of values per group code, broadcast back to every row"""
+    counts = np.bincount(codes, minlength=n_groups or 0)
+    sums = np.bincount(codes, weights=values, minlength=n_groups or 0)
+    return safe_ratio(sums, counts)[codes]
+
+
+def compute_operational_metrics(df, group_cols=('state', 'year_month')):
+    """
+    Add UER, BSI, the peer-group averages and DDI_UER / DDI_BSI to df in place.
+
+    Everything is computed with array operations: the peer averages come from
+    bincount over group codes and are broadcast back without a merge.
+    """
+    enrolments = df['total_enrolments'].to_numpy(dtype=np.float64)
+    updates = df['total_updates'].to_numpy(dtype=np.float64)
+    bio_updates = df['total_bio_updates'].to_numpy(dtype=np.float64)
+
+    uer = safe_ratio(updates, enrolments)
+    bsi = safe_ratio(bio_updates, updates)
+
+    codes = df.groupby(list(group_cols), sort=False, observed=True, dropna=False).ngroup().to_numpy()
+    state_avg_uer = group_means(uer, codes)
+    state_avg_bsi = group_means(bsi, codes)
+
+    df['UER'] = uer
+    df['BSI'] = bsi
+    df['state_avg_UER'] = state_avg_uer
+    df['state_avg_BSI'] = state_avg_bsi
+    df['DDI_UER'] = safe_ratio(uer - state_avg_uer, state_avg_uer)
+    df['DDI_BSI'] = safe_ratio(bsi - state_avg_bsi, state_avg_bsi)
+    return df
+
+
+# ============================================================================
+# STRESS CLASSIFICATION (STEP 6)
+# ============================================================================
+#
+# Each metric is binned against percentile thresholds of a reference table; a value
+# strictly above k thresholds scores scores[k]. The summed score maps to a level:
+# >= high_score → High, >= medium_score → Medium, otherwise Low.
+
+STRESS_LEVELS = ['Low', 'Medium', 'High']
+
+# metric → (percentiles, score per band)
+DEFAULT_STRESS_RULES = {
+    'UER': ((0.50, 0.75), (0, 1, 2)),
+    'BSI': ((0.50, 0.75), (0, 1, 2)),
+    'DDI_UER': ((0.75,), (0, 1)),
+}
+
+
+def sorted_quantile(sorted_values, q):
+    """Linear-interpolated quantile of an already sorted array (same result as Series.quantile)"""
+    if len(sorted_values) == 0:
+        return np.nan
+    position = q * (len(sorted_values) - 1)
+    lower = int(np.floor(position))
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class StressClassifier:
+    """
+    Vectorized High/Medium/Low classifier over percentile thresholds.
+
+    The reference metric columns are sorted once and cached, so changing the
+    percentiles with set_rules() only reads new thresholds off the sorted
+    arrays; classifying is a binary search of every value against them.
+    """
+
+    def __init__(self, reference, rules=None, high_score=4, medium_score=2):
+        rules = rules or DEFAULT_STRESS_RULES
+        self._sorted = {
+            metric: np.sort(reference[metric].to_numpy(dtype=np.float64)[reference[metric].notna().to_numpy()])
+            for metric in rules
+        }
+        self.set_rules(rules, high_score, medium_score)
+
+    def set_rules(self, rules, high_score=None, medium_score=None):
+        """Change percentiles, band scores or level cut-offs without re-sorting the reference"""
+        for metric, (percentiles, scores) in rules.items():
+            if len(scores) != len(percentiles) + 1:
+                raise ValueError(f"{metric}: need one score per band ({len(percentiles) + 1}), got {len(scores)}")
+            if metric not in self._sorted:
+                raise ValueError(f"{metric}: no reference values cached for this metric")
+        self.rules = rules
+        self.high_score = high_score if high_score is not None else getattr(self, 'high_score', 4)
+        self.medium_score = medium_score if medium_score is not None else getattr(self, 'medium_score', 2)
+        self.thresholds = {
+            metric: np.array([sorted_quantile(self._sorted[metric], q) for q in sorted(percentiles)])
+            for metric, (percentiles, _) in rules.items()
+        }
+
+    def scores(self, df):
+        """Total stress score per row"""
+        total = np.zeros(len(df), dtype=np.int64)
+        for metric, (_, band_scores) in self.rules.items():
+            values = df[metric].to_numpy(dtype=np.float64)
+            # Number of thresholds strictly below each value (NaN never exceeds a threshold)
+            band = np.searchsorted(self.thresholds[metric], values, side='left')
+            band[np.isnan(values)] = 0
+            total += np.asarray(band_scores, dtype=np.int64)[band]
+        return total
+
+    def classify(self, df):
+        """Ordered categorical of Low/Medium/High, one label per row"""
+        level = np.searchsorted([self.medium_score, self.high_score], self.scores(df), side='right')
+        return pd.Categorical.from_codes(level, categories=STRESS_LEVELS, ordered=True)
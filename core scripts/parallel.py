@@ -0,0 +1,58 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pickle import PicklingError
+
+# ============================================================================
+# PROCESS POOL HELPERS (shared by the analysis scripts)
+# ============================================================================
+
+def resolve_workers(workers=None, n_tasks=None):
+    """Resolve a worker count (None or <= 0 means all cores), capped at the task count"""
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    if n_tasks is not None:
+        workers = min(workers, n_tasks)
+    return max(1, workers)
+
+
+_warned_serial = False
+
+
+def _warn_serial(reason):
+    """Say once per run that parallel work is running on one core"""
+    global _warned_serial
+    if not _warned_serial:
+        print(f"  ⚠ {reason}; running serially on one core (further pool failures are not reported)")
+        _warned_serial = True
+
+
+def process_pool(workers):
+    """
+    Return a ProcessPoolExecutor, or None when work should run serially.
+
+    fork is used where the platform has it (Linux); elsewhere (Windows, macOS)
+    workers are started with spawn, which imports the entry script in every
+    worker. The analysis scripts keep their steps under a __main__ guard for
+    that reason, and the pool functions live in the helper modules.
+    """
+    if workers <= 1:
+        return None
+    method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def map_ordered(func, items, workers=None, chunksize=1):
+    """Apply func to every item on a process pool, keeping input order (serial fallback)"""
+    items = list(items)
+    pool = process_pool(resolve_workers(workers, len(items)))
+    if pool is None:
+        return [func(item) for item in items]
+
+    try:
+        with pool:
+            return list(pool.map(func, items, chunksize=chunksize))
+    except (BrokenProcessPool, OSError, PicklingError) as e:
+        _warn_serial(f"Process pool unavailable ({e})")
+        return [func(item) for item in items]
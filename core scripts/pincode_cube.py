@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+from aadhaar_data import parse_dates
+from operational_cube import COUNTERS, DATASET_COUNTERS, TOTALS
+
+# ============================================================================
+# SPARSE PINCODE-MONTH CUBE WITH HIERARCHICAL ROLL-UP
+# ============================================================================
+#
+# Most pincode-months are empty, so only populated cells are stored (coordinate
+# form): cell_location[i], cell_month[i] and values[i, counter]. Locations are the
+# sorted (state, district, pincode) combinations and cells are sorted by
+# (location, month), so one district's cells form a contiguous slice.
+#
+# Levels:
+#   pincode                     one row per (state, district, pincode, month)
+#   district / state / national the administrative hierarchy
+#   prefix1 / prefix2 / prefix3 postal hierarchy: first 1, 2 or 3 pincode digits
+#                               (zone, sub-zone, sorting district)
+#
+# A roll-up maps every location to a group code and sums cells sharing
+# (group, month); it never touches the raw rows again.
+
+PREFIX_LEVELS = {'prefix1': 1, 'prefix2': 2, 'prefix3': 3}
+LEVELS = ('pincode', 'district', 'state', 'national') + tuple(PREFIX_LEVELS)
+PINCODE_DIGITS = 6
+
+
+class PincodeCube:
+    """Sparse (state, district, pincode) × month counter cube built from the raw frames"""
+
+    def __init__(self, locations, months, cell_location, cell_month, values):
+        self.locations = locations          # DataFrame state, district, pincode (sorted)
+        self.months = months                # PeriodIndex named year_month
+        self.cell_location = cell_location  # int64 [cell], sorted
+        self.cell_month = cell_month        # int64 [cell], sorted within a location
+        self.values = values                # int64 [cell, counter]
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Build the cube from raw frames {dataset: df} with date, state, district, pincode and counters"""
+        frames = {dataset: df for dataset, df in frames.items() if df is not None and len(df)}
+        parts = {}
+        for dataset, df in frames.items():
+            dates, _ = parse_dates(df['date'])
+            valid = dates.notna().to_numpy()
+            parts[dataset] = (valid, dates.to_numpy()[valid].astype('datetime64[M]').astype(np.int64))
+
+        def keys(col):
+            return np.concatenate([np.asarray(df[col], dtype=object)[parts[d][0]] for d, df in frames.items()])
+
+        state_codes, state_values = pd.factorize(keys('state'), sort=True)
+        district_codes, district_values = pd.factorize(keys('district'), sort=True)
+        pincodes = np.concatenate([df['pincode'].to_numpy(dtype=np.int64)[parts[d][0]] for d, df in frames.items()])
+        pincode_values, pincode_codes = np.unique(pincodes, return_inverse=True)
+        ordinals = np.concatenate([ordinals for _, ordinals in parts.values()])
+
+        location_keys = ((state_codes.astype(np.int64) * len(district_values) + district_codes)
+                         * len(pincode_values) + pincode_codes)
+        location_keys[(state_codes < 0) | (district_codes < 0)] = -1
+        unique_locations, row_location = np.unique(location_keys, return_inverse=True)
+
+        first_month = ordinals.min()
+        n_months = int(ordinals.max() - first_month + 1)
+        unique_cells, row_cell = np.unique(row_location * n_months + (ordinals - first_month), return_inverse=True)
+
+        values = np.zeros((len(unique_cells), len(COUNTERS)), dtype=np.int64)
+        offset = 0
+        for dataset, df in frames.items():
+            valid = parts[dataset][0]
+            cells = row_cell[offset:offset + valid.sum()]
+            offset += valid.sum()
+            for raw, counter in DATASET_COUNTERS[dataset].items():
+                values[:, COUNTERS.index(counter)] = np.bincount(
+                    cells, weights=df[raw].to_numpy(dtype=np.float64)[valid], minlength=len(unique_cells))
+
+        # Drop cells of rows without a state or district
+        keep_locations = unique_locations >= 0
+        cell_location = unique_cells // n_months
+        keep_cells = keep_locations[cell_location]
+        location_remap = np.cumsum(keep_locations) - 1
+        unique_locations = unique_locations[keep_locations]
+
+        pairs, pincode_index = np.divmod(unique_locations, len(pincode_values))
+        locations = pd.DataFrame({
+            'state': pd.Categorical.from_codes(pairs // len(district_values), categories=state_values),
+            'district': pd.Categorical.from_codes(pairs % len(district_values), categories=district_values),
+            'pincode': pincode_values[pincode_index].astype(np.int32),
+        })
+        months = pd.PeriodIndex.from_ordinals(np.arange(n_months) + first_month, freq='M').rename('year_month')
+        return cls(locations, months, location_remap[cell_location[keep_cells]],
+                   (unique_cells % n_months)[keep_cells], values[keep_cells])
+
+    def __len__(self):
+        return len(self.values)
+
+    def _group_codes(self, level):
+        """(group code per location, key frame per group) for a roll-up level"""
+        if level == 'pincode':
+            return np.arange(len(self.locations)), self.locations
+        if level == 'district':
+            codes, _ = pd.factorize(pd.MultiIndex.from_frame(self.locations[['state', 'district']]))
+            keys = self.locations[['state', 'district']].drop_duplicates().reset_index(drop=True)
+            return codes, keys
+        if level == 'state':
+            codes, uniques = pd.factorize(self.locations['state'])
+            return codes, pd.DataFrame({'state': uniques})
+        if level == 'national':
+            return np.zeros(len(self.locations), dtype=np.int64), pd.DataFrame({'level': ['national']})
+        if level in PREFIX_LEVELS:
+            prefix = self.locations['pincode'].to_numpy() // 10 ** (PINCODE_DIGITS - PREFIX_LEVELS[level])
+            codes, uniques = pd.factorize(prefix, sort=True)
+            return codes, pd.DataFrame({level: uniques})
+        raise ValueError(f"Unknown level {level!r}; expected one of {', '.join(LEVELS)}")
+
+    def _frame(self, keys, cell_group, cell_month, values, cols):
+        """Long frame of (group, month) cells with counters and totals"""
+        frame = keys.iloc[cell_group].reset_index(drop=True)
+        frame['year_month'] = self.months[cell_month]
+        for col in cols:
+            counters = [COUNTERS.index(counter) for counter in TOTALS.get(col, [col])]
+            frame[col] = values[:, counters].sum(axis=1)
+        return frame
+
+    def rollup(self, level='district', cols=None):
+        """
+        Month-level totals at any level of the administrative or postal hierarchy,
+        ordered by (group, year_month), with the requested counters/totals.
+        """
+        cols = cols or COUNTERS + list(TOTALS)
+        location_group, keys = self._group_codes(level)
+        n_months = len(self.months)
+        group_cells, cell_index = np.unique(location_group[self.cell_location] * n_months + self.cell_month,
+                                            return_inverse=True)
+        values = np.zeros((len(group_cells), self.values.shape[1]), dtype=np.int64)
+        np.add.at(values, cell_index, self.values)
+        return self._frame(keys, group_cells // n_months, group_cells % n_months, values, cols)
+
+    def district(self, state, district, cols=None):
+        """Pincode-month cells of one district, sliced from the sorted cells without a scan"""
+        cols = cols or COUNTERS + list(TOTALS)
+        states, districts = self.locations['state'].cat, self.locations['district'].cat
+        state_code = states.categories.get_indexer([state])[0]
+        district_code = districts.categories.get_indexer([district])[0]
+        if state_code < 0 or district_code < 0:
+            return self._frame(self.locations, [], [], self.values[:0], cols)
+
+        # Locations are sorted by (state, district): binary-search the district's
+        # location range, then the matching range of cells
+        n_districts = len(districts.categories)
+        pair_keys = states.codes.to_numpy().astype(np.int64) * n_districts + districts.codes.to_numpy()
+        target = state_code * n_districts + district_code
+        first, last = np.searchsorted(pair_keys, [target, target + 1])
+        start, stop = np.searchsorted(self.cell_location, [first, last])
+        cells = slice(start, stop)
+        return self._frame(self.locations, self.cell_location[cells], self.cell_month[cells], self.values[cells], cols)
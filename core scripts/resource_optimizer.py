@@ -0,0 +1,162 @@
+import heapq
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# ============================================================================
+# BUDGET-CONSTRAINED RESOURCE ALLOCATION (ALL DISTRICTS)
+# ============================================================================
+#
+# Each district d has a forecast monthly update load L_d and enrolments E_d. Load
+# above the target ratio is its excess, excess_d = max(0, L_d - target_uer × E_d),
+# which is the enrolment-weighted UER above target. Every unit of a resource
+# relieves a fixed number of updates per month, at an annual cost:
+#
+#   minimise    Σ_d s_d                                 (remaining excess)
+#   subject to  Σ_r relief_r x_dr + s_d ≥ excess_d      for every district
+#               Σ_dr cost_r x_dr ≤ budget
+#               0 ≤ x_dr ≤ cap_dr (integer),  0 ≤ s_d ≤ excess_d
+#
+# This is solved with scipy.optimize.milp (HiGHS). method='lp' solves the linear
+# relaxation with linprog, rounds down and spends what is left greedily.
+# method='greedy', which is also the fallback when the solver fails, repeatedly
+# buys the unit with the most excess relieved per rupee. The caps stop a district
+# from getting more of a resource than its excess can use. Devices are also capped
+# at one per DEVICE_ENROLMENTS annual enrolments, and camps at MAX_CAMPS.
+
+DEFAULT_TARGET_UER = 30
+DEFAULT_BUDGET = 100_000_000      # ₹ per year
+DEVICE_ENROLMENTS = 500
+MAX_CAMPS = 4
+COST_TIE_BREAK = 1e-9             # updates/month per ₹
+
+# resource → (annual cost ₹, updates relieved per month)
+RESOURCES = pd.DataFrame([
+    ('technicians', 300_000, 50_000 / 12),     # salary; 50,000 updates a year
+    ('devices', 5_000, 40),                    # depreciation; repeat captures avoided
+    ('mobile_camps', 120_000, 1_500),          # camp operations; walk-in load moved to camps
+], columns=['resource', 'cost', 'relief']).set_index('resource')
+
+
+def resource_caps(excess, enrolments, resources=RESOURCES):
+    """Upper bound on the units of every resource per district (n_districts × n_resources)"""
+    relief = resources['relief'].to_numpy()
+    caps = np.ceil(excess[:, None] / relief[None, :])
+    names = list(resources.index)
+    if 'devices' in names:
+        caps[:, names.index('devices')] = np.minimum(caps[:, names.index('devices')],
+                                                     np.ceil(enrolments * 12 / DEVICE_ENROLMENTS))
+    if 'mobile_camps' in names:
+        caps[:, names.index('mobile_camps')] = np.minimum(caps[:, names.index('mobile_camps')], MAX_CAMPS)
+    return np.maximum(caps, 0)
+
+
+def _program(excess, caps, budget, resources):
+    """Objective, constraint matrix and bounds for x = [units (district-major), slack]"""
+    n, k = caps.shape
+    cost, relief = resources['cost'].to_numpy(), resources['relief'].to_numpy()
+    rows = np.repeat(np.arange(n), k + 1)
+    cols = np.concatenate([np.arange(n * k).reshape(n, k), n * k + np.arange(n)[:, None]], axis=1).ravel()
+    values = np.tile(np.append(relief, 1.0), n)
+    coverage = sparse.csr_matrix((values, (rows, cols)), shape=(n, n * k + n))
+    spend = sparse.csr_matrix(np.append(np.tile(cost, n), np.zeros(n))[None, :])
+    # A negligible cost term breaks ties towards the cheapest allocation once excess is covered
+    objective = np.append(np.tile(cost, n) * COST_TIE_BREAK, np.ones(n))
+    upper = np.append(caps.ravel(), excess)
+    return objective, coverage, spend, upper
+
+
+def _greedy(excess, caps, budget, resources, units=None):
+    """Buy the unit with the most excess relieved per rupee until the budget runs out"""
+    n, k = caps.shape
+    cost, relief = resources['cost'].to_numpy(), resources['relief'].to_numpy()
+    units = np.zeros((n, k)) if units is None else units.copy()
+    remaining = np.maximum(excess - units @ relief, 0)
+    left = budget - (units * cost).sum()
+
+    def gain(d, r):
+        return min(relief[r], remaining[d]) / cost[r]
+
+    heap = [(-gain(d, r), d, r) for d in np.flatnonzero(remaining > 0) for r in range(k) if units[d, r] < caps[d, r]]
+    heapq.heapify(heap)
+    while heap and left >= cost.min():
+        neg_gain, d, r = heapq.heappop(heap)
+        current = gain(d, r)
+        if current <= 0 or units[d, r] >= caps[d, r] or cost[r] > left:
+            continue
+        if current < -neg_gain - 1e-12:
+            heapq.heappush(heap, (-current, d, r))   # stale: the district's excess shrank
+            continue
+        units[d, r] += 1
+        left -= cost[r]
+        remaining[d] = max(remaining[d] - relief[r], 0)
+        if units[d, r] < caps[d, r] and remaining[d] > 0:
+            heapq.heappush(heap, (-gain(d, r), d, r))
+    return units
+
+
+def optimize_resources(districts, budget=DEFAULT_BUDGET, target_uer=DEFAULT_TARGET_UER, resources=RESOURCES,
+                       method='milp', time_limit=30):
+    """
+    Allocate resources across districts to minimise the load above target_uer.
+
+    districts needs forecast_updates and forecast_enrolments (monthly) per row.
+    Returns (allocation, info): allocation has the units of every resource, cost,
+    relief and UER before/after per district; info has the method used, status and
+    solve time.
+    """
+    start = time.perf_counter()
+    load = districts['forecast_updates'].to_numpy(dtype=np.float64)
+    enrolments = districts['forecast_enrolments'].to_numpy(dtype=np.float64)
+    excess = np.maximum(load - target_uer * enrolments, 0)
+    caps = resource_caps(excess, enrolments, resources)
+    n, k = caps.shape
+    cost, relief = resources['cost'].to_numpy(), resources['relief'].to_numpy()
+
+    units, status = None, ''
+    if method in ('milp', 'lp') and excess.sum() > 0:
+        try:
+            from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+            objective, coverage, spend, upper = _program(excess, caps, budget, resources)
+            if method == 'milp':
+                result = milp(objective, integrality=np.append(np.ones(n * k), np.zeros(n)),
+                              bounds=Bounds(0, upper),
+                              constraints=[LinearConstraint(coverage, lb=excess), LinearConstraint(spend, ub=budget)],
+                              options={'time_limit': time_limit, 'mip_rel_gap': 1e-4})
+                if result.x is not None:
+                    units = np.round(result.x[:n * k]).reshape(n, k)
+            else:
+                result = linprog(objective, A_ub=sparse.vstack([-coverage, spend]), b_ub=np.append(-excess, budget),
+                                 bounds=np.column_stack([np.zeros(len(upper)), upper]), method='highs')
+                if result.x is not None:
+                    units = _greedy(excess, caps, budget, resources, np.floor(result.x[:n * k] + 1e-9).reshape(n, k))
+            status = result.message
+        except (ImportError, ValueError) as e:
+            status = str(e)
+        if units is None:
+            print(f"  ⚠ {method} solver unavailable or failed ({status}); using the greedy allocation")
+    if units is None:
+        method = 'greedy' if excess.sum() > 0 else 'none'
+        units = _greedy(excess, caps, budget, resources)
+        status = status or 'greedy allocation'
+
+    allocation = districts.reset_index(drop=True).copy()
+    for j, name in enumerate(resources.index):
+        allocation[name] = units[:, j].astype(int)
+    allocation['cost'] = units @ cost
+    allocation['relief'] = np.minimum(units @ relief, excess)
+    allocation['excess_before'] = excess
+    allocation['excess_after'] = excess - allocation['relief']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        allocation['UER_before'] = np.where(enrolments > 0, load / enrolments, np.nan)
+        allocation['UER_after'] = np.where(enrolments > 0, (load - allocation['relief']) / enrolments, np.nan)
+
+    info = {'method': method, 'status': status, 'seconds': time.perf_counter() - start,
+            'budget': budget, 'spent': float(allocation['cost'].sum()),
+            'excess_before': float(excess.sum()), 'excess_after': float(allocation['excess_after'].sum())}
+    print(f"✓ Allocated {', '.join(resources.index)} across {n} districts with {method} "
+          f"in {info['seconds']:.2f}s: excess {info['excess_before']:,.0f} → {info['excess_after']:,.0f} updates/month, "
+          f"₹{info['spent']:,.0f} of ₹{budget:,.0f}")
+    return allocation, info
@@ -0,0 +1,197 @@
+import os
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from aadhaar_data import write_atomic
+
+# ============================================================================
+# STREAMING MOMENTS AND CORRELATION (MERGEABLE ACCUMULATORS)
+# ============================================================================
+#
+# Two mergeable accumulators replace the groupby + corr() of ENHANCEMENT 3:
+#
+#   DistrictTotals      per-(state, district) running sums (and non-missing counts
+#                       for the mean columns) of the month rows. Adding a month, or
+#                       merging the totals of another shard, is an index-aligned
+#                       addition. The district feature table is derived from them.
+#
+#   MomentAccumulator   count, mean and co-moment matrix of a set of feature columns,
+#                       with pairwise-complete observations like DataFrame.corr().
+#                       For every pair (i, j) it keeps
+#                         n[i, j]     rows where both i and j are present
+#                         mean[i, j]  mean of i over those rows
+#                         m2[i, j]    Σ (x_i - mean[i, j])² over those rows
+#                         c[i, j]     Σ (x_i - mean[i, j]) (x_j - mean[j, i])
+#                       Two accumulators merge with Chan et al.'s pairwise update:
+#                         δ = mean_b - mean_a,  n = n_a + n_b
+#                         mean = mean_a + δ n_b / n
+#                         m2   = m2_a + m2_b + δ² n_a n_b / n
+#                         c    = c_a + c_b + δ δᵀ n_a n_b / n
+#                       so shards (or new rows) are combined without the raw data.
+#
+# update_district_moments persists both next to the aggregate store. Each run adds
+# only the months not absorbed yet. The store keeps every absorbed month's totals,
+# and if the data for one of those months changes, it is rebuilt from scratch. The
+# district features move whenever a month is added, so the feature moments are
+# recomputed from the totals then, and reused as they are otherwise.
+
+DEFAULT_MOMENTS_FILE = 'district_moments.pkl'
+MOMENTS_VERSION = 1
+DISTRICT_KEYS = ['state', 'district']
+DISTRICT_MEANS = ['UER', 'BSI', 'enrol_0_5', 'enrol_5_17', 'enrol_18+', 'bio_5_17', 'bio_17+', 'demo_5_17', 'demo_17+']
+DISTRICT_SUMS = ['total_enrolments', 'total_updates', 'total_bio_updates', 'total_demo_updates']
+CORRELATION_FEATURES = ['UER', 'bio_share', 'adult_enrol_share', 'adult_bio_share', 'BSI', 'total_enrolments']
+
+# Features derived from the district table (name → function of the table)
+DERIVED_FEATURES = {
+    'bio_share': lambda f: f['total_bio_updates'] / (f['total_bio_updates'] + f['total_demo_updates'] + 1),
+    'adult_enrol_share': lambda f: f['enrol_18+'] / (f['enrol_0_5'] + f['enrol_5_17'] + f['enrol_18+'] + 1),
+    'adult_bio_share': lambda f: f['bio_17+'] / (f['bio_5_17'] + f['bio_17+'] + 1),
+}
+
+
+class DistrictTotals:
+    """Per-(state, district) running sums of month rows, mergeable across months and shards"""
+
+    def __init__(self, mean_cols=DISTRICT_MEANS, sum_cols=DISTRICT_SUMS, keys=DISTRICT_KEYS):
+        self.mean_cols = list(mean_cols)
+        self.sum_cols = list(sum_cols)
+        self.keys = list(keys)
+        index = pd.MultiIndex.from_arrays([[]] * len(self.keys), names=self.keys)
+        self.sums = pd.DataFrame(index=index, columns=self.mean_cols + self.sum_cols, dtype=np.float64)
+        self.counts = pd.DataFrame(index=index, columns=self.mean_cols, dtype=np.float64)
+
+    def _add(self, sums, counts):
+        self.sums = self.sums.add(sums, fill_value=0)
+        self.counts = self.counts.add(counts, fill_value=0)
+
+    def update(self, rows):
+        """Add a batch of rows (e.g. one new month)"""
+        grouped = rows.groupby([rows[key].astype(object) for key in self.keys])
+        self._add(grouped[self.mean_cols + self.sum_cols].sum().astype(np.float64),
+                  grouped[self.mean_cols].count().astype(np.float64))
+        return self
+
+    def merge(self, other):
+        """Add the totals of another accumulator"""
+        self._add(other.sums, other.counts)
+        return self
+
+    def features(self, derived=DERIVED_FEATURES):
+        """District feature table: mean columns, sum columns and the derived features"""
+        table = self.sums[self.mean_cols] / self.counts[self.mean_cols].where(self.counts[self.mean_cols] > 0)
+        table[self.sum_cols] = self.sums[self.sum_cols]
+        for name, func in derived.items():
+            table[name] = func(table)
+        return table.rename_axis(self.keys).reset_index()
+
+
+class MomentAccumulator:
+    """Pairwise-complete count / mean / co-moment matrix of feature columns, with a Chan merge"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+        self.c = np.zeros((k, k))
+
+    @classmethod
+    def from_rows(cls, rows, columns):
+        """Moments of one batch of rows (NaN = missing)"""
+        acc = cls(columns)
+        X = np.asarray(rows[acc.columns], dtype=np.float64)
+        present = ~np.isnan(X)
+        # Shift by the column means first so the one-pass sums stay well conditioned
+        shift = np.nanmean(X, axis=0) if present.any() else np.zeros(X.shape[1])
+        shift = np.nan_to_num(shift)
+        X0 = np.where(present, X - shift, 0.0)
+        V = present.astype(np.float64)
+
+        n = V.T @ V
+        sums = X0.T @ V                       # [i, j]: Σ x_i over rows with both present
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, sums / n, 0.0)
+        acc.n = n
+        acc.mean = mean + shift[:, None]
+        acc.m2 = np.maximum((X0 ** 2).T @ V - mean * sums, 0)
+        acc.c = X0.T @ X0 - mean * sums.T
+        return acc
+
+    def update(self, rows):
+        """Add a batch of rows"""
+        return self.merge(MomentAccumulator.from_rows(rows, self.columns))
+
+    def merge(self, other):
+        """Chan et al. pairwise merge of another accumulator over the same columns"""
+        n = self.n + other.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(n > 0, other.n / n, 0.0)
+            cross = np.where(n > 0, self.n * other.n / n, 0.0)
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * weight
+        self.m2 = self.m2 + other.m2 + delta ** 2 * cross
+        self.c = self.c + other.c + delta * delta.T * cross
+        self.n = n
+        return self
+
+    def covariance(self):
+        """Sample covariance matrix (pairwise complete)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = np.where(self.n > 1, self.c / (self.n - 1), np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        """Pearson correlation matrix (pairwise complete), like DataFrame.corr()"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.c / np.sqrt(self.m2 * self.m2.T)
+        corr = np.where((self.n > 1) & np.isfinite(corr), np.clip(corr, -1, 1), np.nan)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def _month_totals(df, columns):
+    """Column totals of every month in df, keyed by the month's string"""
+    totals = df.groupby(df['year_month'].astype(str))[columns].sum().astype(np.float64)
+    return {month: row.to_numpy() for month, row in totals.iterrows()}
+
+
+def update_district_moments(df, columns=CORRELATION_FEATURES, store_dir=None, rebuild=False):
+    """
+    District totals and feature moments of the district × month table df, absorbing
+    only the months not in the persisted store (store_dir=None keeps nothing on disk).
+    Returns (district_totals, feature_moments).
+    """
+    start = time.perf_counter()
+    path = os.path.join(store_dir, DEFAULT_MOMENTS_FILE) if store_dir else None
+    totals, moments, absorbed = None, None, {}
+    if path and not rebuild and os.path.exists(path):
+        saved = pd.read_pickle(path)
+        if saved.get('version') == MOMENTS_VERSION and saved['columns'] == list(columns):
+            current = _month_totals(df[df['year_month'].astype(str).isin(list(saved['months']))], DISTRICT_SUMS)
+            if current.keys() == saved['months'].keys() and all(
+                    np.allclose(current[month], saved['months'][month]) for month in current):
+                totals, moments, absorbed = saved['totals'], saved['moments'], saved['months']
+            else:
+                print("  ⚠ Absorbed months changed; rebuilding the district moments")
+    if totals is None:
+        totals = DistrictTotals()
+
+    new_rows = df[~df['year_month'].astype(str).isin(list(absorbed))]
+    new_months = _month_totals(new_rows, DISTRICT_SUMS)
+    for _, month_rows in new_rows.groupby('year_month', observed=True):
+        totals.update(month_rows)
+    if new_months or moments is None:
+        moments = MomentAccumulator.from_rows(totals.features(), columns)
+    absorbed = {**absorbed, **new_months}
+
+    if path and new_months:
+        os.makedirs(store_dir, exist_ok=True)
+        write_atomic(path, partial(pd.to_pickle, {'version': MOMENTS_VERSION, 'columns': list(columns),
+                                                  'months': absorbed, 'totals': totals, 'moments': moments}))
+    print(f"✓ District moments{f' {path}' if path else ''}: {len(new_months)} new month(s) absorbed, "
+          f"{len(absorbed)} total, {len(totals.sums)} districts — {time.perf_counter() - start:.3f}s")
+    return totals, moments
@@ -0,0 +1,211 @@
+import json
+import os
+import shutil
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from aadhaar_data import DATASET_SCHEMAS, dump_json, list_shards, load_and_combine_csv, shrink_unsigned, write_atomic
+
+# ============================================================================
+# DICTIONARY-ENCODED, MEMORY-MAPPED TRANSACTION STORE
+# ============================================================================
+#
+# Layout:
+#   <store_dir>/metadata.json           dictionaries (state, district, pincode), row counts,
+#                                       column dtypes and the source shard fingerprints
+#   <store_dir>/<dataset>/<column>.npy  one NumPy array per column, opened with mmap_mode='r'
+#
+# state/district/pincode are stored as integer codes into sorted dictionaries shared
+# by all datasets, dates as int32 day ordinals (days since 1970-01-01) and counters
+# in their compact unsigned dtypes. Opening the store maps the files without parsing
+# or copying, and group-bys run on the integer codes.
+
+DEFAULT_TRANSACTION_STORE = 'transaction_store'
+STORE_VERSION = 1
+DICTIONARY_COLS = ['state', 'district', 'pincode']
+MISSING_DAY = np.iinfo(np.int32).min
+
+# Largest key space aggregated with a dense bincount before falling back to np.unique
+DENSE_GROUP_LIMIT = 50_000_000
+
+
+def _code_dtype(n_categories):
+    """The integer dtype pandas uses for categorical codes, so codes can be wrapped without a copy"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _encode(values, dictionary):
+    """Codes of values in a sorted dictionary"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Encode the categories once and map through the existing codes
+        category_codes = np.searchsorted(dictionary, np.asarray(values.cat.categories))
+        codes = category_codes[values.cat.codes.to_numpy()]
+    else:
+        codes = np.searchsorted(dictionary, values.to_numpy())
+    return codes.astype(_code_dtype(len(dictionary)))
+
+
+def _day_ordinals(dates):
+    """datetime64 values → int32 days since 1970-01-01 (MISSING_DAY for NaT)"""
+    days = dates.to_numpy().astype('datetime64[D]')
+    ordinals = days.astype(np.int64)
+    ordinals[np.isnat(days)] = MISSING_DAY
+    return ordinals.astype(np.int32)
+
+
+def _source_fingerprints(sources):
+    """Name, size and mtime of every source shard, used to detect a stale store"""
+    fingerprints = {}
+    for dataset, folder_path in sources.items():
+        fingerprints[dataset] = [
+            [os.path.basename(path), os.stat(path).st_size, os.stat(path).st_mtime_ns]
+            for path in list_shards(folder_path)
+        ]
+    return fingerprints
+
+
+def build_transaction_store(frames, store_dir, sources=None):
+    """
+    Write typed raw frames ({dataset: df}) to a dictionary-encoded store.
+
+    Dictionaries are shared by all datasets, so codes are comparable across them.
+    """
+    start = time.perf_counter()
+    frames = {dataset: df for dataset, df in frames.items() if df is not None}
+    if os.path.isdir(store_dir):
+        shutil.rmtree(store_dir)
+
+    dictionaries = {}
+    for col in DICTIONARY_COLS:
+        values = set()
+        for df in frames.values():
+            column = df[col]
+            values.update(column.cat.categories if isinstance(column.dtype, pd.CategoricalDtype) else column.unique())
+        dictionaries[col] = np.sort(np.array(list(values)))
+
+    datasets = {}
+    for dataset, df in frames.items():
+        dataset_dir = os.path.join(store_dir, dataset)
+        os.makedirs(dataset_dir)
+        columns = {'day': _day_ordinals(df['date'])}
+        for col in DICTIONARY_COLS:
+            columns[col] = _encode(df[col], dictionaries[col])
+        for col in DATASET_SCHEMAS[dataset]:
+            columns[col] = shrink_unsigned(df[col]).to_numpy()
+        for col, values in columns.items():
+            np.save(os.path.join(dataset_dir, f"{col}.npy"), values)
+        datasets[dataset] = {'rows': len(df), 'columns': {col: str(values.dtype) for col, values in columns.items()}}
+
+    metadata = {
+        'version': STORE_VERSION,
+        'dictionaries': {col: values.tolist() for col, values in dictionaries.items()},
+        'datasets': datasets,
+        'sources': _source_fingerprints(sources) if sources else None,
+    }
+    write_atomic(os.path.join(store_dir, 'metadata.json'), partial(dump_json, metadata))
+    total_rows = sum(info['rows'] for info in datasets.values())
+    print(f"✓ Built transaction store {store_dir}: {total_rows} rows in {time.perf_counter() - start:.2f}s")
+
+
+class TransactionStore:
+    """Read-only, memory-mapped view of a store written by build_transaction_store()"""
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, 'metadata.json')) as f:
+            self.metadata = json.load(f)
+        self.dictionaries = {col: np.array(values) for col, values in self.metadata['dictionaries'].items()}
+        self.datasets = list(self.metadata['datasets'])
+
+    def column(self, dataset, col):
+        """Memory-mapped array for one column (no parsing, no copy)"""
+        return np.load(os.path.join(self.store_dir, dataset, f"{col}.npy"), mmap_mode='r')
+
+    def frame(self, dataset):
+        """
+        Raw frame in the loader's schema. Counters and dictionary codes stay memory-mapped;
+        state, district and pincode are categoricals wrapped around the stored codes.
+        """
+        columns = {'date': pd.Series(self._dates(dataset))}
+        for col in DICTIONARY_COLS:
+            columns[col] = pd.Categorical.from_codes(self.column(dataset, col), categories=self.dictionaries[col])
+        for col in DATASET_SCHEMAS[dataset]:
+            columns[col] = self.column(dataset, col)
+        return pd.DataFrame(columns, copy=False)
+
+    def _dates(self, dataset):
+        day = self.column(dataset, 'day')
+        dates = day.astype('datetime64[D]').astype('datetime64[ns]')
+        dates[day == MISSING_DAY] = np.datetime64('NaT')
+        return dates
+
+    def grain(self, dataset, value_cols=None):
+        """
+        District-month grain computed on integer codes: same result as
+        create_analysis_grain() on the raw frame, without touching strings.
+        """
+        value_cols = value_cols or DATASET_SCHEMAS[dataset]
+        day = self.column(dataset, 'day')
+        valid = day != MISSING_DAY
+        month = day[valid].astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        state = self.column(dataset, 'state')[valid].astype(np.int64)
+        district = self.column(dataset, 'district')[valid].astype(np.int64)
+
+        n_districts = len(self.dictionaries['district'])
+        first_month = month.min() if len(month) else 0
+        n_months = int(month.max() - first_month + 1) if len(month) else 1
+        key = (state * n_districts + district) * n_months + (month - first_month)
+        key_space = len(self.dictionaries['state']) * n_districts * n_months
+
+        if key_space <= DENSE_GROUP_LIMIT:
+            row_counts = np.bincount(key, minlength=key_space)
+            group_keys = np.flatnonzero(row_counts)
+            group_index = None
+        else:
+            group_keys, group_index = np.unique(key, return_inverse=True)
+
+        grain_df = pd.DataFrame({
+            'state': pd.Categorical.from_codes(group_keys // n_months // n_districts,
+                                               categories=self.dictionaries['state']),
+            'district': pd.Categorical.from_codes(group_keys // n_months % n_districts,
+                                                  categories=self.dictionaries['district']),
+            'year_month': pd.PeriodIndex.from_ordinals(group_keys % n_months + first_month, freq='M'),
+        })
+        for col in value_cols:
+            weights = self.column(dataset, col)[valid]
+            if group_index is None:
+                sums = np.bincount(key, weights=weights, minlength=key_space)[group_keys]
+            else:
+                sums = np.bincount(group_index, weights=weights)
+            grain_df[col] = shrink_unsigned(pd.Series(sums.astype(np.int64)))
+        grain_df['state'] = grain_df['state'].cat.remove_unused_categories()
+        grain_df['district'] = grain_df['district'].cat.remove_unused_categories()
+        return grain_df
+
+
+def load_transaction_store(store_dir, sources, workers=None, cache_dir=None):
+    """
+    Open the store, building it from the CSV shards first when it is missing or stale.
+
+    sources maps dataset → shard folder, e.g. {'enrolment': 'enrolment', ...}.
+    """
+    metadata_path = os.path.join(store_dir, 'metadata.json')
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+        current = json.loads(json.dumps(_source_fingerprints(sources)))
+        if metadata.get('version') == STORE_VERSION and metadata.get('sources') == current:
+            print(f"✓ Opened transaction store {store_dir} (memory-mapped)")
+            return TransactionStore(store_dir)
+        print(f"  ⚠ Transaction store {store_dir} is out of date; rebuilding from CSV")
+
+    frames = {dataset: load_and_combine_csv(folder_path, dataset.capitalize(), workers=workers, cache_dir=cache_dir)
+              for dataset, folder_path in sources.items()}
+    build_transaction_store(frames, store_dir, sources)
+    return TransactionStore(store_dir)